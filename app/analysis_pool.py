@@ -0,0 +1,189 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from .logger import logger
+
+# Worker processes for CPU-bound analysis charts (0 renders in the request thread)
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', str(min(2, os.cpu_count() or 1))))
+# Tasks allowed to wait or run at once; further requests are refused instead of piling up
+ANALYSIS_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', '16'))
+ANALYSIS_TIMEOUT_SECONDS = float(os.getenv('ANALYSIS_TIMEOUT_SECONDS', '120'))
+
+# Per worker process: the attached snapshot (path, frame)
+_attached = {}
+
+
+def _attach(snapshot_path: str):
+    """Memory-map the dataset snapshot once per worker process and version."""
+    from app.data_processing.snapshot import attach_snapshot
+
+    if _attached.get('path') != snapshot_path:
+        _attached.clear()
+        _attached.update(path=snapshot_path, df=attach_snapshot(snapshot_path))
+    return _attached['df']
+
+def _init_worker():
+    """Worker initializer: charts render in the workers, so each warms its own kaleido browser."""
+    from app.image_renderer import start_renderer_in_background
+
+    start_renderer_in_background()
+
+def _run_task(snapshot_path: str, version, task: str, args: tuple):
+    """Worker entry point: attach the snapshot, add derived metrics and render the chart."""
+    from app.callbacks.analysis import render_chart
+    from app.data_processing.derived import with_metrics
+
+    if task != 'render_chart':
+        raise ValueError(f"Unknown analysis task: {task}")
+    df = with_metrics(_attach(snapshot_path), ['YEAR'], version=version)
+    return render_chart(args[0], df, version, *args[1:])
+
+
+class AnalysisPool:
+    """
+    Bounded process pool for analysis charts. The web thread writes (once per dataset
+    version) a memory-mappable snapshot of the frame, submits the task with its path and
+    only waits for the result; workers attach the snapshot instead of unpickling a copy.
+    """
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, max_pending: int = ANALYSIS_MAX_PENDING,
+                 timeout: float = ANALYSIS_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        # Timed-out tasks that were already running: each keeps a worker busy until it ends
+        self._stuck = set()
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'rejected': 0,
+                      'pending': 0, 'queue_depth': 0, 'max_queue_depth': 0, 'stuck': 0, 'recycled': 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the web process runs threads (kaleido, Flask) that must not be forked
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_worker)
+            logger.info(f"[POOL] Started {self.workers} analysis workers")
+        return self._executor
+
+    def _snapshot_path(self, df, version) -> str:
+        """
+        Snapshot of df for version. A new version is written outside the pool lock (one writer
+        at a time), so requests for the current snapshot are not held up by the dump; only the
+        swap of the (version, path) entry is done under the lock.
+        """
+        from app.data_processing.snapshot import write_snapshot
+
+        with self._lock:
+            path = self._snapshots.get(version)
+        if path is not None:
+            return path
+        with self._snapshot_lock:
+            with self._lock:
+                path = self._snapshots.get(version)
+            if path is None:
+                path = write_snapshot(df, version)
+                with self._lock:
+                    self._snapshots = {version: path}
+        return path
+
+    def _check_capacity(self):
+        """Refuse the task when max_pending tasks are already waiting or running (caller holds the lock)."""
+        if self.stats['pending'] >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise RuntimeError("Analysis queue is full, please retry shortly")
+
+    def _update_depth(self, delta: int):
+        """Adjust the pending count (caller holds the lock); queue_depth = tasks waiting for a worker."""
+        self.stats['pending'] += delta
+        self.stats['queue_depth'] = max(0, self.stats['pending'] - self.workers)
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.stats['queue_depth'])
+
+    def _recycle(self):
+        """
+        Replace the executor once every worker is held by a stuck render (caller holds the
+        lock). Its processes are terminated, so their stuck tasks fail with BrokenProcessPool.
+        """
+        executor, self._executor = self._executor, None
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        self._stuck.clear()
+        self.stats['stuck'] = 0
+        self.stats['recycled'] += 1
+        logger.warning(f"[POOL] All {self.workers} workers were stuck on timed-out charts; restarted the pool")
+
+    def _timed_out(self, future):
+        """Count a timeout; a task already running is tracked as stuck (caller holds the lock)."""
+        self.stats['timeouts'] += 1
+        # A queued task is dropped; one already running cannot be cancelled
+        if future.cancel() or future.done():
+            return
+        self._stuck.add(future)
+        self.stats['stuck'] = len(self._stuck)
+        if len(self._stuck) >= self.workers and self._executor is not None:
+            self._recycle()
+
+    def _finished(self, future):
+        with self._lock:
+            self._stuck.discard(future)
+            self.stats['stuck'] = len(self._stuck)
+            self._update_depth(-1)
+            if not future.cancelled():
+                self.stats['failed' if future.exception() else 'completed'] += 1
+
+    def render_chart(self, df, version, selected_chart, start_date, end_date, year):
+        """Render an analysis chart (see callbacks.analysis.render_chart) in a worker process."""
+        if self.workers <= 0:
+            from app.callbacks.analysis import render_chart
+            return render_chart(selected_chart, df, version, start_date, end_date, year)
+
+        with self._lock:
+            self._check_capacity()
+        snapshot_path = self._snapshot_path(df, version)
+        with self._lock:
+            # Checked again: other requests may have been queued while the snapshot was written
+            self._check_capacity()
+            args = (snapshot_path, version, 'render_chart', (selected_chart, start_date, end_date, year))
+            try:
+                executor = self._get_executor()
+                future = executor.submit(_run_task, *args)
+            except BrokenProcessPool:
+                logger.warning("[POOL] Worker pool was broken, restarting it")
+                self._executor = None
+                executor = self._get_executor()
+                future = executor.submit(_run_task, *args)
+            self.stats['submitted'] += 1
+            self._update_depth(1)
+        future.add_done_callback(self._finished)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._timed_out(future)
+            raise TimeoutError(f"Chart took longer than {self.timeout:.0f}s")
+        except BrokenProcessPool:
+            with self._lock:
+                # Not when the pool was already replaced (e.g. recycled after stuck renders)
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        finally:
+            logger.info(f"[POOL] {self.stats}")
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+analysis_pool = AnalysisPool()
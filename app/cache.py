@@ -2,6 +2,7 @@ import pandas as pd
 import os
 from datetime import datetime, timedelta
 import hashlib
+from .data_processing.schema import apply_compact_dtypes
 from .logger import logger
 from .utils import get_latest_csv_filename
 
@@ -17,9 +18,13 @@ def get_cache_key(city_name: str, data_type: str) -> str:
     return hashlib.md5(key_str.encode()).hexdigest() + ".csv"
 
 
+def cache_file_path(city_name: str, data_type: str) -> str:
+    return os.path.join(CACHE_DIR, get_cache_key(city_name, data_type))
+
+
 def cache_exists(city_name: str, data_type: str) -> bool:
     """Check if valid cache exists."""
-    cache_file = os.path.join(CACHE_DIR, get_cache_key(city_name, data_type))
+    cache_file = cache_file_path(city_name, data_type)
     if not os.path.exists(cache_file):
         logger.info(f"[CACHE] No cache file found for: {city_name} ({data_type})")
         return False
@@ -36,14 +41,19 @@ def cache_exists(city_name: str, data_type: str) -> bool:
 
 def load_from_cache(city_name: str, data_type: str) -> pd.DataFrame:
     """Load cached CSV as DataFrame."""
-    cache_file = os.path.join(CACHE_DIR, get_cache_key(city_name, data_type))
+    return read_cache_file(cache_file_path(city_name, data_type), label=f"cache {city_name} ({data_type})")
+
+
+def read_cache_file(cache_file: str, label: str | None = None) -> pd.DataFrame:
+    """Read a cache CSV with the compact dtype policy."""
     logger.info(f"[CACHE] Loading cache from {cache_file}")
-    return pd.read_csv(cache_file, low_memory=False, keep_default_na=False)
+    df = pd.read_csv(cache_file, low_memory=False, keep_default_na=False)
+    return apply_compact_dtypes(df, label=label or f"cache {os.path.basename(cache_file)}")
 
 
 def save_to_cache(df: pd.DataFrame, city_name: str, data_type: str):
     """Store DataFrame as cached CSV."""
     os.makedirs(CACHE_DIR, exist_ok=True)
-    cache_file = os.path.join(CACHE_DIR, get_cache_key(city_name, data_type))
+    cache_file = cache_file_path(city_name, data_type)
     df.to_csv(cache_file, index=False)
     logger.info(f"[CACHE] Data cached at: {cache_file}")
@@ -6,13 +6,12 @@ import matplotlib
 from app.utils import format_status_message, chart_options
 
 matplotlib.use('Agg')
-from matplotlib import pyplot as plt
 import pandas as pd
 from datetime import datetime
 
 
 from app.data_processing.data_analysis import (
-    get_weather_data,
+    get_weather_snapshot,
     aggregate_weather_conditions,
     aggregate_by_station_and_time,
     plot_max_temperature_trends,
@@ -20,12 +19,80 @@ from app.data_processing.data_analysis import (
     plot_snowfall_pie, plot_snowfall_bar,
     plot_snowfall_trends,
     label_map, plot_yearly_distributions,
-    plot_weather_correlation_heatmap, prepare_event_flags,
+    plot_weather_correlation_heatmap, yearly_event_counts, yearly_box_stats,
     plot_aggregated_weather_event_frequencies,
+    get_normals, yearly_anomaly_summary, plot_temperature_anomalies,
 )
 
+from app.analysis_pool import analysis_pool
+from app.chart_cache import chart_cache
+from app.data_processing.dataset_cache import weather_cache
+from app.data_processing.dataset_index import dataset_index, year_period_window
 from app.logger import logger
 
+def render_chart(selected_chart, df_weather, version, start_date, end_date, year):
+    """
+    Render one analysis chart from the cached dataset snapshot (df_weather, version).
+    Returns a PNG data URI, a list of them, or None when there is nothing to show.
+    """
+    logger.info(f"Loaded weather data: {len(df_weather)} records, cache stats: {weather_cache.stats}")
+
+    # Station/period aggregates are lookups into the cube cached for this dataset version,
+    # so they are taken from the full frame and sliced to the selected periods
+    df_all = df_weather
+    start = end = None
+    if start_date and end_date:
+        start = pd.to_datetime(start_date)
+        end = pd.to_datetime(end_date)
+        # Years starting within [start, end], found by binary search per station
+        df_weather = dataset_index(df_all, version=version).rows(None, *year_period_window(start, end))
+
+    df_agg = aggregate_weather_conditions(df_all, version=version, start=start, end=end)
+    logger.info(f"Aggregated data shape: {df_agg.shape}")
+
+    logger.info(f"Stations in filtered data: {df_agg['NAME'].nunique()}")
+    logger.info(f"Years in filtered data: {df_agg['YEAR_PERIOD'].dt.year.unique()}")
+
+    img_src = None
+    # Generate selected plot
+    if selected_chart == "Max Temp Trends":
+        df_agg_st = aggregate_by_station_and_time(df_all, date_freq='Y', version=version, start=start, end=end)
+        stations = df_agg_st['NAME'].unique()[:20]
+        img_src = plot_max_temperature_trends(df_agg_st, stations)
+    elif selected_chart == "Temp Boxplot":
+        img_src = plot_temperature_boxplot(df_agg)
+    elif selected_chart == "Snowfall Pie":
+        img_src = plot_snowfall_pie(df_agg, year)
+    elif selected_chart == "Snowfall Bar":
+        img_src = plot_snowfall_bar(df_agg, year)
+    elif selected_chart == "Snowfall Trends":
+        df_agg_st = aggregate_by_station_and_time(df_all, date_freq='Y', version=version, start=start, end=end)
+        stations = df_agg_st['NAME'].unique()[:20]
+        img_src = plot_snowfall_trends(df_agg_st, stations)
+    elif selected_chart == "Weather Events":
+        conditions = ['WT01', 'WT08', 'WT16', 'WSFG']
+        img_src = plot_aggregated_weather_event_frequencies(
+            df_weather,
+            conditions,
+            label_map,
+            counts=yearly_event_counts(df_all, conditions, version=version, start=start, end=end)
+        )
+    elif selected_chart == "Yearly Distributions":
+        conditions = ['TAVG', 'PRCP', 'SNOW']
+        stats = {col: yearly_box_stats(df_all, col, version=version, start=start, end=end) for col in conditions}
+        img_src = plot_yearly_distributions(df_weather, conditions, label_map, stats=stats)
+    elif selected_chart == "Correlation Heatmap":
+        conditions = [
+            'TMIN', 'TAVG', 'TMAX', 'PRCP', 'SNOW', 'TSUN',
+            'ACMH', 'WSFG', 'RHAV', 'WT01', 'WT08', 'WT16'
+        ]
+        img_src = plot_weather_correlation_heatmap(df_weather, conditions, df_agg=df_agg)
+    elif selected_chart == "Temp Anomalies":
+        # Baselines come from the precomputed normals table, not from the rows' own history
+        summary = yearly_anomaly_summary(df_weather, get_normals(version))
+        img_src = plot_temperature_anomalies(summary, start and start.year, end and end.year)
+    return img_src
+
 def register_callbacks(app):
     @app.callback(
         # Output("__dummy_output", "children"),  # Required dummy output
@@ -44,67 +111,22 @@ def register_callbacks(app):
         def run_visualization(selected_chart):
             try:
                 logger.info("Starting weather data analysis...")
-
-                df = None
-                df_weather = get_weather_data()
-                logger.info(f"Loaded weather data: {len(df_weather)} records")
-                logger.info("Checking for missing values:")
-                logger.info(f"\n{df_weather.isna().sum()}")
-
-                if start_date and end_date:
-                    start = pd.to_datetime(start_date)
-                    end = pd.to_datetime(end_date)
-                    df_weather = df_weather[
-                        (df_weather['YEAR_PERIOD'].dt.to_timestamp() >= start) &
-                        (df_weather['YEAR_PERIOD'].dt.to_timestamp() <= end)
-                        ]
-
-                df_agg = aggregate_weather_conditions(df_weather)
-                logger.info(f"Aggregated data shape: {df_agg.shape}")
-
-                logger.info(f"Stations in filtered data: {df_agg['NAME'].nunique()}")
-                logger.info(f"Years in filtered data: {df_agg['YEAR_PERIOD'].dt.year.unique()}")
-
+                # Derived columns come from the registry, cached for the loaded dataset
+                version, df_weather = get_weather_snapshot(['YEAR'])
                 year = pd.to_datetime(start_date).year if start_date else datetime.now().year
-                img_src = None
-                # Generate selected plot
-                if selected_chart == "Max Temp Trends":
-                    df_agg_st = aggregate_by_station_and_time(df_weather, date_freq='Y')
-                    stations = df_agg_st['NAME'].unique()[:20]
-                    img_src = plot_max_temperature_trends(df_agg_st, stations)
-                elif selected_chart == "Temp Boxplot":
-                    img_src = plot_temperature_boxplot(df_agg)
-                elif selected_chart == "Snowfall Pie":
-                    img_src = plot_snowfall_pie(df_agg, year)
-                elif selected_chart == "Snowfall Bar":
-                    img_src = plot_snowfall_bar(df_agg, year)
-                elif selected_chart == "Snowfall Trends":
-                    df_agg_st = aggregate_by_station_and_time(df_weather, date_freq='Y')
-                    stations = df_agg_st['NAME'].unique()[:20]
-                    img_src = plot_snowfall_trends(df_agg_st, stations)
-                elif selected_chart == "Weather Events":
-                    df_weather['YEAR'] = df_weather['DATE'].dt.year
-                    conditions = ['WT01', 'WT08', 'WT16', 'WSFG']
-                    img_src = plot_aggregated_weather_event_frequencies(
-                        prepare_event_flags(df_weather, conditions),
-                        conditions,
-                        label_map
-                    )
-                elif selected_chart == "Yearly Distributions":
-                    conditions = ['TAVG', 'PRCP', 'SNOW']
-                    img_src = plot_yearly_distributions(df_weather, conditions, label_map)
-                elif selected_chart == "Correlation Heatmap":
-                    conditions = [
-                        'TMIN', 'TAVG', 'TMAX', 'PRCP', 'SNOW', 'TSUN',
-                        'ACMH', 'WSFG', 'RHAV', 'WT01', 'WT08', 'WT16'
-                    ]
-                    img_src = plot_weather_correlation_heatmap(df_weather, conditions)
-
+                params = {'start_date': start_date, 'end_date': end_date, 'year': year}
+                # Rendered PNGs are cached per (chart, params, dataset version) and served by URL;
+                # misses render in the analysis process pool while this thread only waits
+                img_src = chart_cache.get_or_render(
+                    selected_chart, params, version,
+                    lambda: analysis_pool.render_chart(df_weather, version, selected_chart, start_date, end_date, year)
+                )
+                logger.info(f"Chart cache stats: {chart_cache.stats}")
+                if img_src is None:
+                    return html.Div(format_status_message("No chart could be rendered for the selected data", "error"))
             except Exception as e:
                 logger.info(f"Error during visualization: {str(e)}")
                 return html.Div(format_status_message(f"Error during visualization: {e}", "error"))
-            finally:
-                plt.close('all')
 
             label_for_selected = next((opt['label'] for opt in chart_options if opt['value'] == selected_chart),
                                       selected_chart)
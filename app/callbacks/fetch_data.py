@@ -5,9 +5,11 @@ from dash import html, Input, Output, State
 
 import pandas as pd
 
-from ..cache import cache_exists, load_from_cache, save_to_cache
+from ..cache import cache_exists, cache_file_path, load_from_cache, save_to_cache
 from ..data_processing.data_cleaner import clean_data
+from ..data_processing.schema import to_records
 from ..scraper import scrape_and_download
+from ..session_data import session_data, new_session_id
 from ..utils import get_data_type_label, format_status_message, set_min_start_date
 from ..logger import logger
 from dotenv import load_dotenv
@@ -30,10 +32,11 @@ def register_callbacks(app):
         [State('city-input', 'value'),
          State('data-type', 'value'),
          State('start-date', 'date'),
-         State('end-date', 'date')],
+         State('end-date', 'date'),
+         State('session-id', 'data')],
         prevent_initial_call=True
     )
-    def update_dashboard(n_clicks, city_name, data_type, start_date=None, end_date=None):
+    def update_dashboard(n_clicks, city_name, data_type, start_date=None, end_date=None, session_id=None):
         logger.info("[DASHBOARD] update_dashboard triggered")
         global stations # global_df
         try:
@@ -186,22 +189,29 @@ def register_callbacks(app):
             logger.debug(f"[DATA] Columns in DataFrame: {df.columns.tolist()}")
             logger.debug(f"[DATA] Required columns present: {required_cols.issubset(df.columns)}")
 
+            records = to_records(df)
             results = html.Div([
                 html.H2(f"Weather Data for {city_name.upper()}", style={"color": "#C99A5AFF"}),
                 html.P(f"Showing {get_data_type_label(data_type)} data{date_range_text}"),
                 html.P(f"Data points: {len(df)}", className='centered-info'),
                 html.P(f"Available data range for this location: {df['DATE'].min().date()} to {df['DATE'].max().date()}"),
                 dash.dash_table.DataTable(
-                    data=df.to_dict('records'),
+                    data=records,
                     columns=[{'name': i, 'id': i} for i in df.columns],
                     page_size=10,
                     style_table={'overflowX': 'auto'}
                 )
             ], className='centered-info')
+            # Parse once for this browser session: chart callbacks read the typed frame and its
+            # pyramid server side, and the controls only need the metadata
+            session_id = session_id or new_session_id()
+            dataset = session_data.put(session_id, df, source=cache_file_path(city_name, data_type))
+            dash.set_props('session-id', {'data': session_id})
+            dash.set_props('data-meta', {'data': dataset.meta})
             return (
                 results,  # Filled results container
                 None, # analysis-results
-                df.to_dict('records'),  # Store processed data
+                records,  # Store processed data
                 viz_style,  # Show visualization
                 None,  # No errors
                 "circle"  # Success spinner style
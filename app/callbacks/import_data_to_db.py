@@ -3,9 +3,8 @@ import os
 from dash import Input, Output, html
 
 from app.logger import logger
-from app.data_processing.data_to_db import import_csv_to_db
-from app.utils import get_latest_csv_filename, format_status_message, RAW_DATA_DIR, PROCESSED_DATA_DIR
-from app.data_processing.data_cleaner import clean_single_csv
+from app.data_processing.pipeline import clean_and_import
+from app.utils import get_latest_csv_filename, format_status_message, RAW_DATA_DIR
 
 def register_callbacks(app):
     @app.callback(
@@ -18,15 +17,11 @@ def register_callbacks(app):
             latest_csv = get_latest_csv_filename()
             raw_path = os.path.join(RAW_DATA_DIR, latest_csv)
             logger.info(f"latest_csv {latest_csv}, raw_path {raw_path}")
-            # Clean CSV first
-            clean_single_csv(raw_path)
+            if not os.path.exists(raw_path):
+                return format_status_message(f"Raw CSV not found: {raw_path}", "error")
 
-            cleaned_path = os.path.join(PROCESSED_DATA_DIR, latest_csv)
-
-            if not os.path.exists(cleaned_path):
-                return format_status_message(f"Cleaned CSV not found: {cleaned_path}", "error")
-
-            success, message = import_csv_to_db(cleaned_path)
+            # Clean in memory and import; processed CSV is saved in the background
+            success, message = clean_and_import(latest_csv)
 
             msg_type = "success" if success else "error"
             return html.Div(format_status_message(message, msg_type=msg_type))
@@ -1,18 +1,157 @@
 # Handles creating dash_app graphs (data before analysis)
 import os
 import dash
-from dash import Input, Output, State
+from dash import Input, Output, State, Patch
 
 import pandas as pd
 import numpy as np
 import plotly.express as px
 
+from ..data_processing.downsample import downsample_line_traces, downsample_series, downsampled_points
+from ..data_processing.derived import with_metrics, metric_label
+from ..data_processing.render_mode import bin_bar_frame, record_render_mode, render_record, trace_render_mode
 from ..utils import get_data_type_label, create_empty_figure, get_vis_config, is_valid_column, set_min_start_date
 from ..logger import logger
+from ..session_data import session_data
 from dotenv import load_dotenv
 load_dotenv()
 
 MIN_START_DATE = os.getenv('MIN_START_DATE')
+TEMPERATURE_TYPES = ['TMAX', 'TMIN', 'TAVG']
+# Data types drawn as bars/events by update_charts even when VIS_CONFIG says 'line'
+EVENT_TYPES = ['WT16', 'Snow', 'WT08']
+# Layout keys update_charts sets per data type: a data-type switch sends these and the traces only
+CHART_LAYOUT_KEYS = ['title', 'xaxis', 'yaxis', 'legend', 'hovermode', 'annotations', 'meta', 'uirevision']
+
+
+def line_chart_columns(data_type, frame) -> list[str]:
+    """Columns update_charts draws as line traces (in trace order) for data_type; [] for other charts."""
+    if data_type in TEMPERATURE_TYPES:
+        return [col for col in ['TMIN', 'TAVG', 'TMAX'] if col in frame.columns]
+    config = get_vis_config(data_type)
+    if data_type in EVENT_TYPES or config.get('chart_type') != 'line':
+        return []
+    return [col for col in config['y_cols'] if is_valid_column(frame, col)][:1]
+
+def line_chart_title(data_type, station, level) -> str:
+    level_note = "" if level == 'daily' else f" ({level} mean)"
+    if data_type in TEMPERATURE_TYPES:
+        return f"{get_data_type_label(data_type)} Trend - {station}{level_note}"
+    return f"{get_data_type_label(data_type)} Over Time{level_note}"
+
+def bar_chart_title(title, level) -> str:
+    return title if level == 'daily' else f"{title} ({level} total)"
+
+def event_bar_yaxis(fig, level):
+    """Daily event bars are flags (fixed 0-1 axis); binned ones count event days per bin."""
+    if level == 'daily':
+        fig.update_yaxes(range=[0, 1.1], showticklabels=False)
+    else:
+        fig.update_yaxes(title_text=f"Days per {level[:-2]}")
+
+def chart_uirevision(station, start_date, end_date, data_type) -> str:
+    # Zoom state survives the resampling patches until the selection changes
+    return f"{station}|{start_date}|{end_date}|{data_type}"
+
+def chart_kind(data_type, config, level) -> str:
+    """'line' (traces rebuilt from the pyramid), 'fixed' (daily events on a fixed y axis) or 'other'."""
+    if data_type in TEMPERATURE_TYPES or (data_type not in EVENT_TYPES and config.get('chart_type') == 'line'):
+        return 'line'
+    if level == 'daily' and (data_type in EVENT_TYPES or config.get('chart_type') == 'scatter'):
+        return 'fixed'
+    return 'other'
+
+def within_shown_range(date_from, date_to, shown) -> bool:
+    """Whether [date_from, date_to] lies inside the range the shown traces were built for."""
+    shown_from = pd.to_datetime(shown['start']) if shown['start'] else pd.Timestamp.min
+    shown_to = pd.to_datetime(shown['end']) if shown['end'] else pd.Timestamp.max
+    return (date_from is not None and date_from >= shown_from) and (date_to is not None and date_to <= shown_to)
+
+def day_strings(dates) -> np.ndarray:
+    """Daily dates as 'YYYY-MM-DD' for Patches: half the JSON of the ISO timestamps plotly writes."""
+    return np.datetime_as_string(np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]'))
+
+def line_trace_patch(patched, dataset, station, data_type, date_from, date_to):
+    """
+    Set the x/y of the line traces in `patched` from the pyramid level for [date_from, date_to]
+    (LTTB downsampled). Returns (level, points sent, points a full render plans for the render
+    mode), or None when data_type is not a line chart.
+    """
+    level, frame = dataset.pyramid.window(station, date_from, date_to)
+    cols = line_chart_columns(data_type, frame)
+    if not cols:
+        return None
+    points = 0
+    for index, col in enumerate(cols):
+        x, y = downsample_series(frame['DATE'], frame[col])
+        patched['data'][index]['x'] = day_strings(x)
+        patched['data'][index]['y'] = y
+        points += len(x)
+    patched['layout']['title']['text'] = line_chart_title(data_type, station, level)
+    return level, points, downsampled_points(len(frame)) * len(cols)
+
+def traces_patch(fig) -> Patch:
+    """Patch replacing the traces and the per-chart layout keys of a graph with those of fig (not the template)."""
+    patched = Patch()
+    figure = fig.to_plotly_json()
+    patched['data'] = figure['data']
+    for key in CHART_LAYOUT_KEYS:
+        if key in figure['layout']:
+            patched['layout'][key] = figure['layout'][key]
+        else:
+            del patched['layout'][key]
+    return patched
+
+def weather_range_patch(dataset, shown, station, data_type, date_from, date_to):
+    """
+    (Patch, state) moving the weather graph to a new date range: line traces are swapped for
+    the new range, daily events on a fixed axis only get a new x range. (None, None) when the
+    traces have to be rebuilt (other charts, or a line chart changing render mode).
+    """
+    patched = Patch()
+    if shown['kind'] == 'line':
+        line = line_trace_patch(patched, dataset, station, data_type, date_from, date_to)
+        if line is None:
+            return None, None
+        level, points, planned = line
+        mode = trace_render_mode(planned)
+        if mode != shown['render_mode']:
+            return None, None
+        patched['layout']['xaxis']['autorange'] = True
+        patched['layout']['meta'] = render_record(f"weather-graph {data_type}", mode, level, points)
+        state = {**shown, 'level': level, 'start': str(date_from), 'end': str(date_to)}
+    elif shown['kind'] == 'fixed' and within_shown_range(date_from, date_to, shown):
+        patched['layout']['xaxis']['autorange'] = False
+        patched['layout']['xaxis']['range'] = [date_from, date_to]
+        state = shown
+    else:
+        return None, None
+    return patched, state
+
+def precip_range_patch(filtered, shown, station, date_from, date_to):
+    """
+    (Patch, state) moving the precipitation graph to a new date range: a new x (and y) range
+    when its daily bars already cover it, else the bars of the new range.
+    """
+    filtered = with_metrics(filtered, ['PRCP_IN'])
+    level, precip_data = bin_bar_frame(filtered, 'PRCP_IN')
+    patched = Patch()
+    if level == 'daily' and shown['level'] == 'daily' and within_shown_range(date_from, date_to, shown):
+        patched['layout']['xaxis']['autorange'] = False
+        patched['layout']['xaxis']['range'] = [date_from, date_to]
+        peak = filtered['PRCP_IN'].max()
+        if pd.notna(peak) and peak > 0:
+            patched['layout']['yaxis']['autorange'] = False
+            patched['layout']['yaxis']['range'] = [0, peak * 1.05]
+        return patched, shown
+    patched['data'][0]['x'] = day_strings(precip_data['DATE'])
+    patched['data'][0]['y'] = precip_data['PRCP_IN'].to_numpy()
+    patched['layout']['title']['text'] = bar_chart_title(f"Precipitation - {station}", level)
+    patched['layout']['xaxis']['autorange'] = True
+    patched['layout']['yaxis']['autorange'] = True
+    patched['layout']['meta'] = render_record('precip-trend', 'svg' if level == 'daily' else 'binned',
+                                              level, len(precip_data))
+    return patched, {'level': level, 'start': str(date_from), 'end': str(date_to)}
 
 
 # Callback to update visualization controls
@@ -34,46 +173,19 @@ def register_callbacks(app):
          Output('date-range', 'max_date_allowed'),
          Output('date-range', 'start_date'),
          Output('date-range', 'end_date')],
-        Input('data-store', 'data')
+        Input('data-meta', 'data')
     )
-    def update_visualization_controls(data):
+    def update_visualization_controls(meta):
+        """Controls from the metadata written at fetch time, without reading the data-store."""
         logger.info("[DEBUG] update_visualization_controls - Visualization controls callback triggered!")
-        # global global_df
-        if not data:
+        if not meta:
             raise dash.exceptions.PreventUpdate
-        logger.info(f"Data received: {len(data)} records")
-        df = pd.DataFrame(data)
-        # Standardize date column name
-        date_col = 'DATE' if 'DATE' in df.columns else 'date'
-        logger.info(f"Using date column: {date_col}")
-        df[date_col] = pd.to_datetime(df[date_col])
-        logger.info(f"DataFrame columns: {df.columns.tolist()}")
-
-        # Get min/max dates from data
-        min_date = df[date_col].min()
-        max_date = df[date_col].max()
+        stations = meta['stations']
+        city_name = meta['city'] or "Selected Location"
+        min_date, max_date = meta['min_date'], meta['max_date']
         logger.info(f"Date range from data: min_date={min_date}, max_date={max_date}")
-        # Get city name from the data and Update station dropdown
-        if 'NAME' in df.columns and not df['NAME'].empty:
-            city_name = df['NAME'].iloc[0].split(',')[0]
-            stations = df['NAME'].unique().tolist()
-            logger.info(f"City name: {city_name}, Stations found: {stations}")
-        else:
-            city_name = "Selected Location"
-            stations = []
-            logger.warning("No 'NAME' column or empty in data; using default city and empty stations")
-        # Update station dropdown
-        stations = df['NAME'].unique().tolist()
         station_options = [{'label': s, 'value': s} for s in stations]
-        logger.info(f"Station options prepared: {station_options}")
-
-        # Update date range picker
-        min_date = df[date_col].min()
-        max_date = df[date_col].max()
-
         first_station = stations[0] if stations else None
-        logger.info(f"Default station selected: {first_station}")
-
         logger.info(f"Updating visualization controls for city: {city_name} with stations: {stations}")
 
         return (
@@ -89,50 +201,44 @@ def register_callbacks(app):
     # Callback to update charts based on user selections
     @app.callback(
         [Output('weather-graph', 'figure'),
-         Output('precip-trend', 'figure')],
+         Output('precip-trend', 'figure'),
+         Output('chart-state', 'data')],
         [Input('station-dropdown', 'value'),
          Input('date-range', 'start_date'),
          Input('date-range', 'end_date'),
          Input('data-type', 'value')],
-        State('data-store', 'data')
+        [State('data-meta', 'data'),
+         State('session-id', 'data'),
+         State('chart-state', 'data')]
     )
-    def update_charts(selected_station, start_date, end_date, data_type, data):
+    def update_charts(selected_station, start_date, end_date, data_type, meta, session_id, shown=None):
+        """
+        Both charts for the selection. When the graphs already show this dataset and station,
+        a date-range change or a data-type switch is sent as Patches (see chart-state).
+        """
         logger.info("[DEBUG] update_charts called")
-        if not data or not selected_station:
+        if not meta or not selected_station:
             logger.warning("No data received; preventing update")
             raise dash.exceptions.PreventUpdate
         try:
             logger.info(f"Data type: {data_type}")
 
-            df = pd.DataFrame(data)
-            logger.info(f"Data loaded into DataFrame with {len(df)} rows")
-
-            # Standardize column names
-            date_col = 'DATE' if 'DATE' in df.columns else 'date'
-            df[date_col] = pd.to_datetime(df[date_col])
-            # Filter by station
-            filtered = df[df['NAME'] == selected_station].copy()
-            logger.info(f"Filtered data by station '{selected_station}', rows: {len(filtered)}")
-
+            # Typed frame indexed by station, parsed once per dataset and kept for this session
+            dataset = session_data.get_or_load(session_id, meta)
+            if dataset is None:
+                msg = "No data available for the selected stations"
+                return create_empty_figure(msg), create_empty_figure(msg), None
+            date_col = 'DATE'
             # set start_date to MIN_START_DATE
             start_date = max(pd.to_datetime(start_date), pd.to_datetime(MIN_START_DATE))
             logger.info(f"Start date is set to minimal {start_date} for visualization")
 
-            # Filter by date range
+            # Filter by station and date range: binary search on the (NAME, DATE) ordered rows
             if start_date and end_date:
-                start_date = pd.to_datetime(start_date)
-                end_date = pd.to_datetime(end_date)
-                filtered = filtered[(filtered['DATE'] >= start_date) &
-                                    (filtered['DATE'] <= end_date)]
-                logger.info(f"Filtered data by date range, rows after filter: {len(filtered)}")
-
-            # Convert numeric columns to float (this fixes the error)
-            numeric_cols = ['TMIN', 'TAVG', 'TMAX', 'PRCP', 'NAME', 'SNOW', 'TSUN',
-                            'ACMH', 'WSFG', 'RHAV', 'WT01', 'WT02', 'WT08', 'WT16']
-            for col in numeric_cols:
-                if col in filtered.columns:
-                    filtered[col] = pd.to_numeric(filtered[col], errors='coerce')
-                    logger.info(f"Converted column {col} to numeric")
+                filtered = dataset.index.rows(selected_station, start_date, pd.to_datetime(end_date)).copy()
+            else:
+                filtered = dataset.index.rows(selected_station).copy()
+            logger.info(f"Filtered data by station '{selected_station}' and date range, rows: {len(filtered)}")
 
             # Create MAIN WEATHER GRAPH based on data_type
             config = get_vis_config(data_type)
@@ -144,21 +250,58 @@ def register_callbacks(app):
             if not valid_y_cols:
                 msg = f"No valid data found for {get_data_type_label(data_type)}"
                 logger.warning(msg)
-                return create_empty_figure(msg), create_empty_figure(msg)
+                return create_empty_figure(msg), create_empty_figure(msg), None
 
             # y_col = config['y_cols'][0]
             y_col = valid_y_cols[0]
 
-            if data_type in ['TMAX', 'TMIN', 'TAVG']:  # Temperature
-                temp_y_cols = [col for col in ['TMIN', 'TAVG', 'TMAX'] if col in filtered.columns]
+            # Line charts plot the coarsest pyramid level that still has a point per pixel
+            level, line_data = dataset.pyramid.window(
+                selected_station, start_date, pd.to_datetime(end_date) if end_date else None)
+            if not set(valid_y_cols) <= set(line_data.columns):
+                level, line_data = 'daily', filtered
+            logger.info(f"Line charts use the {level} level: {len(line_data)} points")
+            # Set per branch: 'svg'/'webgl' by point count, 'binned' for bars summed per week/month/year
+            render_mode, chart_level = 'svg', 'daily'
+
+            # What the graphs show (chart-state); the same dataset and station are patched, not rebuilt
+            date_to = pd.to_datetime(end_date) if end_date else None
+            view = {'key': meta['key'], 'station': selected_station, 'data_type': data_type,
+                    'start': str(start_date), 'end': str(date_to) if date_to is not None else None}
+            uirevision = chart_uirevision(selected_station, start_date, end_date, data_type)
+            same_view = bool(shown) and shown['key'] == meta['key'] and shown['station'] == selected_station
+            same_dates = same_view and (shown['start'], shown['end']) == (view['start'], view['end'])
+            type_switch = same_dates and shown['data_type'] != data_type
+            range_change = same_view and not same_dates and shown['data_type'] == data_type
+            precip_out = precip_state = None
+            if type_switch:
+                # The precipitation chart does not depend on the data type
+                precip_out, precip_state = dash.no_update, shown['precip']
+            elif range_change:
+                precip_out = dash.no_update
+                if shown['precip']:
+                    precip_out, precip_state = precip_range_patch(
+                        filtered, shown['precip'], selected_station, start_date, date_to)
+                weather_out, weather_state = weather_range_patch(
+                    dataset, shown['weather'], selected_station, data_type, start_date, date_to)
+                if weather_out is not None:
+                    weather_out['layout']['uirevision'] = uirevision
+                    logger.info(f"[PATCH] Date range {view['start']} - {view['end']} sent as patches")
+                    return weather_out, precip_out, {**view, 'weather': weather_state, 'precip': precip_state}
+
+            if data_type in TEMPERATURE_TYPES:  # Temperature
+                temp_y_cols = line_chart_columns(data_type, filtered)
                 logger.info(f"Temperature columns used for plot: {temp_y_cols}")
+                render_mode = trace_render_mode(downsampled_points(len(line_data)) * len(temp_y_cols))
+                chart_level = level
                 weather_fig = px.line(
-                    filtered,
+                    line_data,
                     x='DATE',
                     y=temp_y_cols, # weather data_type
-                    title=f"{data_type_label} Trend - {selected_station}",
+                    title=line_chart_title(data_type, selected_station, level),
                     labels={'value': 'Temperature (°F)', 'variable': 'Metric'},
                     color_discrete_sequence = config['colors'],
+                    render_mode=render_mode,
                 )
                 weather_fig.for_each_trace(
                     lambda trace: trace.update(line=dict(width=1), opacity=0.7),
@@ -174,13 +317,15 @@ def register_callbacks(app):
                 )
 
             elif data_type == 'WT16':  # Rain occurrence
-                filtered['Rain'] = filtered['WT16'].apply(lambda x: 1 if x > 0 else 0)
+                filtered = with_metrics(filtered, ['Rain'])
+                chart_level, bar_data = bin_bar_frame(filtered[filtered['Rain'] > 0], 'Rain')
+                render_mode = 'svg' if chart_level == 'daily' else 'binned'
                 weather_fig = px.bar(
-                    filtered[filtered['Rain'] > 0],
+                    bar_data,
                     x=date_col,
                     y='Rain',
-                    title=f"Rain Days - {selected_station}",
-                    labels={'Rain': 'Rain occurred'},
+                    title=bar_chart_title(f"Rain Days - {selected_station}", chart_level),
+                    labels={'Rain': metric_label('Rain')},
                     color_discrete_sequence=config['colors']
                 )
                 weather_fig.update_traces(
@@ -190,16 +335,18 @@ def register_callbacks(app):
                         opacity=1),
                     selector=dict(type='bar')
                 )
-                weather_fig.update_yaxes(range=[0, 1.1], showticklabels=False)
+                event_bar_yaxis(weather_fig, chart_level)
 
             elif data_type == 'Snow':  # Snow occurrence
-                filtered['Snow'] = filtered['SNOW'].apply(lambda x: 1 if x > 0 else 0)
+                filtered = with_metrics(filtered, ['Snow'])
+                chart_level, bar_data = bin_bar_frame(filtered[filtered['Snow'] > 0], 'Snow')
+                render_mode = 'svg' if chart_level == 'daily' else 'binned'
                 weather_fig = px.bar(
-                    filtered[filtered['Snow'] > 0],
+                    bar_data,
                     x=date_col,
                     y='Snow',
-                    title=f"Snow Days - {selected_station}",
-                    labels={'Snow': 'Snowfall occurred'},
+                    title=bar_chart_title(f"Snow Days - {selected_station}", chart_level),
+                    labels={'Snow': metric_label('Snow')},
                 )
                 weather_fig.update_traces(
                     marker=dict(
@@ -209,15 +356,17 @@ def register_callbacks(app):
                     ),
                     selector=dict(type='bar')
                 )
-                weather_fig.update_yaxes(range=[0, 1.1], showticklabels=False)
+                event_bar_yaxis(weather_fig, chart_level)
             elif data_type == 'WT08':  # Smoke or haze
-                filtered['Smoke'] = filtered['WT08'].apply(lambda x: 1 if x > 0 else 0)
+                filtered = with_metrics(filtered, ['Smoke'])
+                chart_level, bar_data = bin_bar_frame(filtered[filtered['Smoke'] > 0], 'Smoke')
+                render_mode = 'svg' if chart_level == 'daily' else 'binned'
                 weather_fig = px.bar(
-                    filtered[filtered['Smoke'] > 0],
+                    bar_data,
                     x=date_col,
                     y='Smoke',
-                    title=f"Smoke or Haze Days - {selected_station}",
-                    labels={'Smoke': 'Smoke or haze occurred'},
+                    title=bar_chart_title(f"Smoke or Haze Days - {selected_station}", chart_level),
+                    labels={'Smoke': metric_label('Smoke')},
                 )
                 weather_fig.update_traces(
                     marker=dict(
@@ -226,24 +375,29 @@ def register_callbacks(app):
                     ),
                     selector=dict(type='bar')
                 )
-                weather_fig.update_yaxes(range=[0, 1.1], showticklabels=False)
+                event_bar_yaxis(weather_fig, chart_level)
 
             else:  # Default for other data types
                 if config['chart_type'] == 'line':
+                    render_mode = trace_render_mode(downsampled_points(len(line_data)))
+                    chart_level = level
                     weather_fig = px.line(
-                        filtered,
+                        line_data,
                         x='DATE',
                         y=y_col,
-                        title=f"{get_data_type_label(data_type)} Over Time",
+                        title=line_chart_title(data_type, selected_station, level),
                         labels=config['labels'],
                         color_discrete_sequence=config['colors'],
+                        render_mode=render_mode,
                     )
                 elif config['chart_type'] == 'bar':
+                    chart_level, bar_data = bin_bar_frame(filtered, config['y_cols'][0])
+                    render_mode = 'svg' if chart_level == 'daily' else 'binned'
                     weather_fig = px.bar(
-                        filtered,
+                        bar_data,
                         x='DATE',
                         y=config['y_cols'][0],
-                        title=f"{get_data_type_label(data_type)} Over Time",
+                        title=bar_chart_title(f"{get_data_type_label(data_type)} Over Time", chart_level),
                         labels=config['labels'],
                         color_discrete_sequence=config['colors']
                     )
@@ -265,13 +419,15 @@ def register_callbacks(app):
                     event_data['fog_event'] = 1 + 0.2 * np.random.randn(len(event_data))
                     config['labels']['fog_event'] = 'Fog Occurrence'
 
+                    render_mode = trace_render_mode(len(event_data))
                     weather_fig = px.scatter(
                         event_data,
                         x='DATE',
                         y="fog_event",
                         title=f"{get_data_type_label(data_type)} Occurrence Over Time",
                         labels=config['labels'],
-                        color_discrete_sequence=config['colors']
+                        color_discrete_sequence=config['colors'],
+                        render_mode=render_mode,
                     )
                     weather_fig.update_traces(
                         marker=dict(
@@ -290,6 +446,7 @@ def register_callbacks(app):
                     )
                 elif config['chart_type'] == 'binary':
                     event_data = filtered[filtered[config['y_cols'][0]] > 0]
+                    render_mode = trace_render_mode(len(event_data))
                     if not event_data.empty:
                         weather_fig = px.scatter(
                             event_data,
@@ -297,7 +454,8 @@ def register_callbacks(app):
                             y=config['y_cols'][0],
                             title=f"{get_data_type_label(data_type)} Occurrences",
                             labels=config['labels'],
-                            color_discrete_sequence=config['colors']
+                            color_discrete_sequence=config['colors'],
+                            render_mode=render_mode,
                         )
                     else:
                         weather_fig = px.scatter(title=f"No {get_data_type_label(data_type)} Events")
@@ -308,15 +466,17 @@ def register_callbacks(app):
                             )]
                         )
 
-            if 'PRCP' in filtered.columns:
-                # PRCP = Precipitation (tenths of mm)
-                filtered['PRCP_IN'] = filtered['PRCP'] / 10 * 0.03937
+            if precip_out is not None:
+                precip_fig = None  # patched above or unchanged
+            elif 'PRCP' in filtered.columns:
+                filtered = with_metrics(filtered, ['PRCP_IN'])
+                precip_level, precip_data = bin_bar_frame(filtered, 'PRCP_IN')
                 precip_fig = px.bar(
-                    filtered,
+                    precip_data,
                     x=date_col,
                     y='PRCP_IN',
-                    title=f"Precipitation - {selected_station}",
-                    labels={'PRCP_IN': 'Precipitation (inches)'},
+                    title=bar_chart_title(f"Precipitation - {selected_station}", precip_level),
+                    labels={'PRCP_IN': metric_label('PRCP_IN')},
                     color_discrete_sequence=config['colors']
                 )
                 precip_fig.update_traces(
@@ -325,10 +485,13 @@ def register_callbacks(app):
                     marker_line_width=0.3,
                     opacity=1  # Full opacity
                 )
+                record_render_mode(precip_fig, 'precip-trend', 'svg' if precip_level == 'daily' else 'binned',
+                                   precip_level)
+                precip_state = {'level': precip_level, 'start': view['start'], 'end': view['end']}
             else:
                 precip_fig = create_empty_figure("No PRCP data available")
             # Common layout updates for both figures
-            for fig in [weather_fig, precip_fig]:
+            for fig in [f for f in (weather_fig, precip_fig) if f is not None]:
                 fig.update_layout(
                     title_x=0.5,
                     title_xanchor='center',
@@ -340,9 +503,62 @@ def register_callbacks(app):
                 fig.update_traces(
                     opacity=1
                 )
+            weather_fig.update_layout(uirevision=uirevision)
+            before, after = downsample_line_traces(weather_fig)
+            if before != after:
+                logger.info(f"[LTTB] Line traces downsampled from {before} to {after} points")
+            record_render_mode(weather_fig, f"weather-graph {data_type}", render_mode, chart_level)
+            state = {**view, 'precip': precip_state, 'weather': {
+                'kind': chart_kind(data_type, config, chart_level), 'render_mode': render_mode,
+                'level': chart_level, 'start': view['start'], 'end': view['end']}}
 
             logger.info(f"Updated charts for station '{selected_station}' between {start_date} and {end_date}")
-            return weather_fig, precip_fig
+            if type_switch or range_change:
+                # Only the traces and per-chart layout keys; the template and the rest stay in the browser
+                logger.info(f"[PATCH] {'Data type' if type_switch else 'Date range'} change sent as trace patches")
+                return traces_patch(weather_fig), precip_out, state
+            return weather_fig, precip_fig, state
         except Exception as e:
             logger.error(f"Error in update_charts: {str(e)}", exc_info=True)
-            return create_empty_figure("Error loading data"), create_empty_figure("Error loading data")
+            return create_empty_figure("Error loading data"), create_empty_figure("Error loading data"), None
+
+    # Zooming the line chart re-fetches the visible range from the session's pyramid
+    @app.callback(
+        Output('weather-graph', 'figure', allow_duplicate=True),
+        Input('weather-graph', 'relayoutData'),
+        [State('station-dropdown', 'value'),
+         State('date-range', 'start_date'),
+         State('date-range', 'end_date'),
+         State('data-type', 'value'),
+         State('data-meta', 'data'),
+         State('session-id', 'data')],
+        prevent_initial_call=True
+    )
+    def resample_visible_range(relayout, selected_station, start_date, end_date, data_type, meta, session_id):
+        if not relayout or not meta or not selected_station:
+            raise dash.exceptions.PreventUpdate
+        if relayout.get('xaxis.autorange'):
+            date_from = max(pd.to_datetime(start_date), pd.to_datetime(MIN_START_DATE)) if start_date else None
+            date_to = pd.to_datetime(end_date) if end_date else None
+        elif 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+            date_from, date_to = pd.to_datetime(relayout['xaxis.range[0]']), pd.to_datetime(relayout['xaxis.range[1]'])
+        elif 'xaxis.range' in relayout:
+            date_from, date_to = (pd.to_datetime(value) for value in relayout['xaxis.range'])
+        else:
+            raise dash.exceptions.PreventUpdate
+
+        dataset = session_data.get_or_load(session_id, meta)
+        if dataset is None:
+            logger.info("[LTTB] No dataset for this session; keeping the current traces")
+            raise dash.exceptions.PreventUpdate
+        patched = Patch()
+        line = line_trace_patch(patched, dataset, selected_station, data_type, date_from, date_to)
+        if line is None:
+            raise dash.exceptions.PreventUpdate
+        level, points, _ = line
+        if relayout.get('xaxis.autorange'):
+            patched['layout']['xaxis']['autorange'] = True
+        else:
+            patched['layout']['xaxis']['range'] = [date_from, date_to]
+        logger.info(f"[LTTB] Resampled {date_from} - {date_to} from the {level} level: {points} points")
+        return patched
@@ -0,0 +1,199 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from flask import Response, abort, request
+
+from .logger import logger
+from .utils import BASE_DATA_DIR, DB_PATH
+
+CHART_CACHE_DIR = os.path.join(BASE_DATA_DIR, "cache", "charts")
+CHART_CACHE_MEMORY_MB = float(os.getenv('CHART_CACHE_MEMORY_MB', '64'))
+CHART_CACHE_DISK_MB = float(os.getenv('CHART_CACHE_DISK_MB', '512'))
+CHART_URL_PREFIX = "/charts/"
+
+
+def chart_key(chart_id: str, params: dict, version) -> str:
+    """
+    Content key for a rendered chart. The DB file identity is part of the key because the
+    data version counter restarts when the database is rebuilt from scratch.
+    """
+    db_id = os.stat(DB_PATH).st_ino if os.path.exists(DB_PATH) else 0
+    payload = json.dumps({'chart': chart_id, 'params': params, 'version': version, 'db': db_id},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def _data_uri_to_png(src: str) -> bytes:
+    return base64.b64decode(src.split(",", 1)[1])
+
+
+class ChartImageCache:
+    """
+    PNG bytes by key (and the JSON manifests of multi-image charts): an in-memory LRU bounded
+    by size in front of a pruned disk directory. Concurrent misses on one key render once.
+    """
+
+    def __init__(self, cache_dir: str = CHART_CACHE_DIR, memory_mb: float = CHART_CACHE_MEMORY_MB,
+                 disk_mb: float = CHART_CACHE_DISK_MB):
+        self.cache_dir = cache_dir
+        self.memory_limit = int(memory_mb * 1024 * 1024)
+        self.disk_limit = int(disk_mb * 1024 * 1024)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        # Chart key -> Future of the render in progress, shared by requests arriving meanwhile
+        self._inflight = {}
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'renders': 0, 'shared_renders': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _remember(self, key: str, png: bytes):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = png
+            self._memory_bytes += len(png)
+            while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key: str, ext: str = "png") -> bytes | None:
+        name = f"{key}.{ext}"
+        with self._lock:
+            png = self._memory.get(name)
+            if png is not None:
+                self._memory.move_to_end(name)
+                self.stats['memory_hits'] += 1
+                return png
+        try:
+            with open(self._path(name), "rb") as f:
+                png = f.read()
+        except OSError:
+            return None
+        self.stats['disk_hits'] += 1
+        self._remember(name, png)
+        return png
+
+    def put(self, key: str, data: bytes, ext: str = "png"):
+        name = f"{key}.{ext}"
+        self._remember(name, data)
+        tmp_path = f"{self._path(name)}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+            self._prune_disk()
+        except OSError as e:
+            logger.warning(f"[CHART CACHE] Could not write {key} to disk: {e}")
+
+    def _prune_disk(self):
+        """Delete the least recently written files once the directory exceeds the disk limit."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((".png", ".json")):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.disk_limit:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def _cached(self, key: str):
+        """Chart URL(s) stored under key, or None."""
+        # Multi-image charts store a manifest of their part keys under the chart key
+        manifest = self.get(key, ext="json")
+        if manifest is not None:
+            parts = json.loads(manifest)
+            if all(self.get(part) is not None for part in parts):
+                return [chart_url(part) for part in parts]
+        if self.get(key) is not None:
+            return chart_url(key)
+        return None
+
+    def get_or_render(self, chart_id: str, params: dict, version, render):
+        """
+        Return chart URL(s) for (chart_id, params, version), calling render() only on a miss.
+        render returns a PNG data URI, a list of them, or None (nothing to show, not cached).
+        Requests missing the same key while it renders wait for that render instead.
+        """
+        key = chart_key(chart_id, params, version)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats['shared_renders'] += 1
+        if not owner:
+            return future.result()
+        try:
+            # The previous owner may have stored it between our lookup and taking the key
+            result = self._cached(key)
+            if result is None:
+                result = self._render(key, chart_id, params, render)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _render(self, key: str, chart_id: str, params: dict, render):
+        self.stats['misses'] += 1
+        result = render()
+        if isinstance(result, list) and not result:
+            # Every part failed to render: report it like a chart with nothing to show
+            logger.warning(f"[CHART CACHE] {chart_id} rendered no images for {params}")
+            return None
+        if result is None:
+            return None
+        self.stats['renders'] += 1
+        if isinstance(result, list):
+            parts = []
+            for index, src in enumerate(result):
+                self.put(f"{key}-{index}", _data_uri_to_png(src))
+                parts.append(f"{key}-{index}")
+            self.put(key, json.dumps(parts).encode(), ext="json")
+            return [chart_url(part) for part in parts]
+        self.put(key, _data_uri_to_png(result))
+        return chart_url(key)
+
+
+def chart_url(key: str) -> str:
+    return f"{CHART_URL_PREFIX}{key}.png"
+
+chart_cache = ChartImageCache()
+
+def register_chart_routes(server):
+    """Serve cached chart PNGs; keys are content hashes, so responses never change."""
+
+    @server.route(f"{CHART_URL_PREFIX}<key>.png")
+    def serve_chart(key):
+        if not re.fullmatch(r"[0-9a-f]{32}(-\d+)?", key):
+            abort(404)
+        etag = f'"{key}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={'ETag': etag})
+        png = chart_cache.get(key)
+        if png is None:
+            abort(404)
+        return Response(png, mimetype="image/png", headers={
+            'ETag': etag,
+            'Cache-Control': "public, max-age=31536000, immutable",
+        })
@@ -3,7 +3,10 @@ import os
 
 from dash import Dash
 
+from .analysis_pool import analysis_pool
 from .callbacks import register_all_callbacks
+from .chart_cache import register_chart_routes
+from .image_renderer import start_renderer_in_background
 from .logger import logger
 from .layout import create_layout
 from app.utils import IS_RENDER, PROJECT_ROOT
@@ -70,6 +73,10 @@ def create_dash_app():
     app.layout = create_layout()
 
     register_all_callbacks(app)
+    register_chart_routes(app.server)
+    # With worker processes the charts are rendered (and kaleido warmed) in the analysis pool
+    if analysis_pool.workers <= 0:
+        start_renderer_in_background()
 
     return app
 
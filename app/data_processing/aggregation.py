@@ -0,0 +1,148 @@
+import threading
+
+import pandas as pd
+
+from app.data_processing.dataset_cache import WEATHER_COLS
+from app.logger import logger
+
+# (dataset version, ...) -> cached result; only the latest dataset version is kept
+_cubes = {}
+_event_counts = {}
+_box_stats = {}
+_cubes_lock = threading.Lock()
+# Outliers kept per box (the most extreme ones), so box figures stay O(groups)
+MAX_BOX_OUTLIERS = 50
+
+
+def _versioned(store: dict, key: tuple, build):
+    """Return store[key] (key[0] is the dataset version), building it once under the lock."""
+    value = store.get(key)
+    if value is None:
+        with _cubes_lock:
+            if key not in store:
+                for stale in [k for k in store if k[0] != key[0]]:
+                    del store[stale]
+                store[key] = build()
+            value = store[key]
+    return value
+
+
+def build_cube(df: pd.DataFrame, date_freq: str = 'Y') -> pd.DataFrame:
+    """
+    Per (NAME, YEAR_PERIOD) sum and non-null count of every weather measure, so any mean
+    or sum aggregation is a lookup. Columns are ('sum'|'count', measure). df is not modified.
+    """
+    measures = df[[col for col in WEATHER_COLS if col in df.columns]]
+    keys = [df['NAME'], df['DATE'].dt.to_period(date_freq).rename('YEAR_PERIOD')]
+    grouped = measures.groupby(keys, observed=True)
+    return pd.concat({
+        'sum': grouped.sum().astype('float64'),
+        'count': grouped.count().astype('int32'),
+    }, axis=1)
+
+def get_cube(df: pd.DataFrame, date_freq: str = 'Y', version=None) -> pd.DataFrame:
+    """Build the cube, or reuse it when `version` identifies df (the full dataset)."""
+    if version is None:
+        return build_cube(df, date_freq)
+
+    def build():
+        cube = build_cube(df, date_freq)
+        logger.info(f"[AGG] Built {date_freq} cube for version {version}: {len(cube)} station periods")
+        return cube
+    return _versioned(_cubes, (version, date_freq), build)
+
+def slice_cube(cube: pd.DataFrame, agg_dict: dict, start=None, end=None) -> pd.DataFrame:
+    """
+    Answer {column: 'mean'|'sum'} for periods starting within [start, end] from the cube.
+    Returns one row per (NAME, YEAR_PERIOD), like a groupby(...).agg(agg_dict).reset_index().
+    """
+    if start is not None or end is not None:
+        period_start = cube.index.get_level_values('YEAR_PERIOD').to_timestamp()
+        mask = pd.Series(True, index=cube.index).to_numpy()
+        if start is not None:
+            mask &= period_start >= pd.Timestamp(start)
+        if end is not None:
+            mask &= period_start <= pd.Timestamp(end)
+        cube = cube[mask]
+
+    sums, counts = cube['sum'], cube['count']
+    result = pd.DataFrame(index=cube.index)
+    for col, how in agg_dict.items():
+        if col not in sums.columns:
+            continue
+        if how == 'sum':
+            result[col] = sums[col]
+        else:
+            result[col] = sums[col] / counts[col].where(counts[col] > 0)
+    return result.reset_index()
+
+def aggregate(df: pd.DataFrame, agg_dict: dict, date_freq: str = 'Y', version=None,
+              start=None, end=None) -> pd.DataFrame:
+    """Group df by station and period with agg_dict via the (cached) cube, without modifying df."""
+    return slice_cube(get_cube(df, date_freq, version), agg_dict, start, end)
+
+
+def _slice_years(counts: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Keep years whose 1 January lies within [start, end] (same rule as period slicing)."""
+    year_start = pd.to_datetime(counts.index.astype(str), format='%Y')
+    mask = pd.Series(True, index=counts.index).to_numpy()
+    if start is not None:
+        mask &= year_start >= pd.Timestamp(start)
+    if end is not None:
+        mask &= year_start <= pd.Timestamp(end)
+    return counts[mask]
+
+def count_yearly_events(df: pd.DataFrame, event_cols: list[str]) -> pd.DataFrame:
+    """
+    Days per year with value > 0 for each event column, in one vectorized groupby.
+    Only the event columns are touched; df is not copied or modified. Index: YEAR.
+    """
+    event_cols = [col for col in event_cols if col in df.columns]
+    occurred = df[event_cols].gt(0).fillna(False)
+    counts = occurred.groupby(df['DATE'].dt.year.rename('YEAR')).sum()
+    return counts.astype('int32')
+
+def yearly_event_counts(df: pd.DataFrame, event_cols: list[str], version=None,
+                        start=None, end=None) -> pd.DataFrame:
+    """
+    Yearly event counts for years within [start, end]. With `version` (df is the full
+    dataset) the counts are computed once per version and column set, then sliced.
+    """
+    if version is None:
+        return _slice_years(count_yearly_events(df, event_cols), start, end)
+    counts = _versioned(_event_counts, (version, tuple(event_cols)),
+                        lambda: count_yearly_events(df, event_cols))
+    return _slice_years(counts, start, end)
+
+def compute_box_stats(values: pd.Series, groups: pd.Series, max_outliers: int = MAX_BOX_OUTLIERS) -> pd.DataFrame:
+    """
+    Tukey box statistics per group, vectorized: q1, med, q3, whislo/whishi (most extreme data
+    within 1.5 IQR of the box), count and `fliers`, a list of at most max_outliers outliers.
+    Quartiles use linear interpolation like matplotlib and pandas box plots.
+    """
+    frame = pd.DataFrame({'group': groups, 'value': values.astype('float64')}).dropna()
+    grouped = frame.groupby('group', observed=True)['value']
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'med', 'q3']
+    iqr = stats['q3'] - stats['q1']
+
+    bounds = frame.join(pd.DataFrame({'low': stats['q1'] - 1.5 * iqr, 'high': stats['q3'] + 1.5 * iqr,
+                                      'med': stats['med']}), on='group')
+    inside = (bounds['value'] >= bounds['low']) & (bounds['value'] <= bounds['high'])
+    whiskers = bounds[inside].groupby('group', observed=True)['value'].agg(['min', 'max'])
+    stats['whislo'] = whiskers['min']
+    stats['whishi'] = whiskers['max']
+    stats['count'] = grouped.size()
+
+    outliers = bounds[~inside].assign(distance=lambda d: (d['value'] - d['med']).abs())
+    sample = outliers.sort_values('distance', ascending=False).groupby('group', observed=True).head(max_outliers)
+    fliers = sample.groupby('group', observed=True)['value'].agg(list).reindex(stats.index)
+    stats['fliers'] = [items if isinstance(items, list) else [] for items in fliers]
+    return stats
+
+def yearly_box_stats(df: pd.DataFrame, column: str, version=None, start=None, end=None) -> pd.DataFrame:
+    """Per-year box statistics of a daily column (index YEAR), cached per dataset version."""
+    def build():
+        return compute_box_stats(df[column], df['DATE'].dt.year.rename('YEAR'))
+    stats = build() if version is None else _versioned(_box_stats, (version, column), build)
+    return _slice_years(stats, start, end)
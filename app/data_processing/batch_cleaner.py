@@ -0,0 +1,171 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from app.data_processing.data_cleaner import clean_raw_csv, save_clean_data_to_csv
+from app.metrics import CleaningMetrics
+from app.utils import RAW_DATA_DIR, PROCESSED_DATA_DIR
+from app.logger import logger
+
+MANIFEST_NAME = "clean_manifest.json"
+
+
+def available_cores() -> int:
+    """Number of CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(output_dir: str) -> dict:
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"[BATCH] Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+
+def save_manifest(manifest: dict, output_dir: str):
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def _source_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def _is_unchanged(path: str, entry: dict | None, output_dir: str) -> tuple[bool, dict]:
+    """
+    Compare a raw file with its manifest entry: size and mtime first, content hash only when
+    those differ (e.g. the file was re-downloaded with identical content).
+    Returns (unchanged, current signature incl. sha256 when computed).
+    """
+    signature = _source_signature(path)
+    if entry is None or not os.path.exists(os.path.join(output_dir, os.path.basename(path))):
+        return False, signature
+    if entry.get('size') == signature['size'] and entry.get('mtime') == signature['mtime']:
+        return True, {**signature, 'sha256': entry.get('sha256')}
+    signature['sha256'] = file_sha256(path)
+    return signature['sha256'] == entry.get('sha256'), signature
+
+def clean_file_task(input_path: str, output_dir: str) -> dict:
+    """Worker: clean one raw file and save it. Runs in a separate process."""
+    filename = os.path.basename(input_path)
+    start = time.perf_counter()
+    metrics = CleaningMetrics(filename)
+    try:
+        df = clean_raw_csv(input_path, metrics=metrics)
+        metrics.log()
+        metrics.save()
+        if df.empty:
+            raise ValueError("no valid rows after cleaning")
+        save_clean_data_to_csv(df, os.path.join(output_dir, filename))
+        return {'filename': filename, 'rows': len(df), 'seconds': time.perf_counter() - start, 'error': None,
+                'quality': metrics.to_record()}
+    except Exception as e:
+        return {'filename': filename, 'rows': 0, 'seconds': time.perf_counter() - start, 'error': str(e),
+                'quality': metrics.to_record()}
+
+def clean_files_parallel(input_dir: str = RAW_DATA_DIR, output_dir: str = PROCESSED_DATA_DIR,
+                         workers: int | None = None, force: bool = False) -> dict:
+    """
+    Clean every raw CSV in input_dir over a process pool, skipping files whose size, mtime
+    or content hash match the manifest in output_dir.
+    Returns a run summary dict.
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+
+    to_clean = {}
+    skipped = []
+    for path in sorted(glob.glob(os.path.join(input_dir, "*.csv"))):
+        filename = os.path.basename(path)
+        unchanged, signature = _is_unchanged(path, manifest.get(filename), output_dir)
+        if unchanged and not force:
+            skipped.append(filename)
+            manifest[filename].update(signature)
+        else:
+            to_clean[path] = signature
+
+    workers = max(1, min(workers or available_cores(), len(to_clean) or 1))
+    logger.info(f"[BATCH] {len(to_clean)} files to clean with {workers} workers, {len(skipped)} unchanged")
+
+    results = []
+    if to_clean:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(clean_file_task, path, output_dir) for path in to_clean]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    failures = {}
+    rows = 0
+    for result in results:
+        path = os.path.join(input_dir, result['filename'])
+        if result['error']:
+            failures[result['filename']] = result['error']
+            logger.error(f"[BATCH] Failed to clean {result['filename']}: {result['error']}")
+            continue
+        signature = to_clean[path]
+        if 'sha256' not in signature:
+            signature['sha256'] = file_sha256(path)
+        manifest[result['filename']] = {
+            **signature,
+            'rows': result['rows'],
+            'dropped': result['quality']['dropped'],
+            'cleaned_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        rows += result['rows']
+
+    save_manifest(manifest, output_dir)
+
+    elapsed = time.perf_counter() - start
+    cleaned = len(results) - len(failures)
+    summary = {
+        'cleaned': cleaned,
+        'skipped': len(skipped),
+        'failed': failures,
+        'rows': rows,
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'files_per_second': round(cleaned / elapsed, 2) if elapsed else 0.0,
+        'rows_per_second': round(rows / elapsed) if elapsed else 0,
+    }
+    logger.info(f"[BATCH] Summary: {json.dumps(summary)}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean raw NOAA CSV files in parallel.")
+    parser.add_argument("--input", default=RAW_DATA_DIR, help="raw CSV directory")
+    parser.add_argument("--output", default=PROCESSED_DATA_DIR, help="processed CSV directory")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: available cores)")
+    parser.add_argument("--force", action="store_true", help="clean files even if unchanged")
+    args = parser.parse_args()
+
+    summary = clean_files_parallel(args.input, args.output, args.workers, args.force)
+    print(f"Cleaned {summary['cleaned']} files ({summary['rows']} rows) in {summary['seconds']}s "
+          f"with {summary['workers']} workers: {summary['files_per_second']} files/s, "
+          f"{summary['rows_per_second']} rows/s; skipped {summary['skipped']} unchanged")
+    for filename, error in summary['failed'].items():
+        print(f"FAILED {filename}: {error}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
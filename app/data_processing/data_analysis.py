@@ -2,115 +2,129 @@ import os
 import io
 import base64
 import sqlite3
+from contextvars import ContextVar
 import pandas as pd
 
 import plotly.io as pio
-from matplotlib import pyplot as plt
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
 import plotly.express as px
+import plotly.graph_objects as go
 import seaborn as sns
 
+from app.data_processing.aggregation import aggregate, yearly_event_counts, yearly_box_stats, compute_box_stats
+from app.data_processing.dataset_cache import weather_cache, load_weather_frame
+from app.data_processing.derived import with_metrics
+from app.data_processing.normals import get_normals, normals_period, yearly_anomaly_summary
+from app.image_renderer import plotly_renderer
 from app.logger import logger
 from app.utils import DB_DIR, DB_PATH, DB_NAME, TABLE_NAME, label_map
 
-# cache data
-_cached_weather_data = None
-
-def get_weather_data():
-    global _cached_weather_data
-    if _cached_weather_data is None:
-        _cached_weather_data = load_data_from_db(DB_PATH, TABLE_NAME)
-    return _cached_weather_data
-
 cols = [
     'TMIN', 'TAVG', 'TMAX', 'PRCP', 'SNOW', 'TSUN',
     'ACMH', 'WSFG', 'RHAV', 'WT01', 'WT02', 'WT08', 'WT16'
     ]
 
+IMAGE_MIME_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml', 'html': 'text/html'}
+# Format the plot functions render to; the dashboard always uses png, the report CLI sets it per task.
+# 'html' is interactive Plotly HTML; matplotlib charts are written as an SVG in an HTML page
+image_format = ContextVar('image_format', default='png')
+
+def get_weather_data():
+    """Weather table from the versioned dataset cache; reloads after imports change the DB."""
+    return weather_cache.get()
+
+def get_weather_snapshot(metrics: list[str] = ()):
+    """(data version, cached weather data with the requested derived metrics from derived.py)."""
+    version, df = weather_cache.snapshot()
+    return version, with_metrics(df, list(metrics), version=version)
+
 def load_data_from_db(db_path, table_name):
-    """Load data from SQLite table into a DataFrame."""
+    """Load data from SQLite table into a DataFrame with the compact dtype policy."""
     conn = sqlite3.connect(db_path)
-    query = f"SELECT * FROM {table_name}"
-    df = pd.read_sql_query(query, conn, parse_dates=['DATE'])
-
-    buffer = io.StringIO()
-    df.info(buf=buffer)
-    info_str = buffer.getvalue()
-    logger.info(f"Loaded DataFrame info str :\n{info_str}")
-    logger.info(f"Loaded DataFrame info:\n{df.info()}")
-    conn.close()
-    return df
+    try:
+        return load_weather_frame(conn, table_name)
+    finally:
+        conn.close()
+
+def new_figure(figsize, nrows=1):
+    """
+    Figure and axes (an array of `nrows` stacked axes sharing x when nrows > 1) on their own
+    Agg canvas. Nothing goes through pyplot's global figure state, so charts can be rendered
+    from several threads at once.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot() if nrows == 1 else fig.subplots(nrows, 1, sharex=True)
 
 def fig_to_dash_image(fig):
-    """Convert a matplotlib figure to Dash HTML image."""
+    """Convert a matplotlib figure to Dash HTML image (in the current image_format)."""
+    fmt = image_format.get()
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight')
-    buf.seek(0)
-    encoded = base64.b64encode(buf.read()).decode("utf-8")
+    fig.savefig(buf, format='svg' if fmt == 'html' else fmt, bbox_inches='tight')
+    image = buf.getvalue()
     buf.close()
-    return f"data:image/png;base64,{encoded}"
+    if fmt == 'html':
+        image = b"<!doctype html><html><head><meta charset='utf-8'></head><body>" + image + b"</body></html>"
+    encoded = base64.b64encode(image).decode("utf-8")
+    return f"data:{IMAGE_MIME_TYPES[fmt]};base64,{encoded}"
 
-def plotly_fig_to_base64_img(fig):
-    img_bytes = pio.to_image(fig, format='png')
+def png_to_data_uri(img_bytes, fmt='png'):
     encoded = base64.b64encode(img_bytes).decode('utf-8')
-    return f"data:image/png;base64,{encoded}"
+    return f"data:{IMAGE_MIME_TYPES[fmt]};base64,{encoded}"
+
+def plotly_fig_to_base64_img(fig):
+    """Render a Plotly figure on the shared kaleido renderer and return it as a data URI."""
+    fmt = image_format.get()
+    return png_to_data_uri(plotly_renderer.render(fig, fmt), fmt)
 
 def get_label(col):
     """Get readable label for a weather code."""
     return label_map.get(col, col)
 
-def aggregate_by_station_and_time(df, date_freq='Y', agg_cols=None):
-    """Aggregate weather data by station and period."""
-    df['YEAR_PERIOD'] = df['DATE'].dt.to_period(date_freq)
-
+def aggregate_by_station_and_time(df, date_freq='Y', agg_cols=None, version=None, start=None, end=None):
+    """
+    Aggregate weather data by station and period (means). With `version` (df is the full
+    cached dataset) the per-version aggregation cube is reused; start/end select periods.
+    """
     if agg_cols is None:
         agg_cols = cols
-
-    agg_dict = {col: 'mean' for col in agg_cols if col in df.columns}
-
-    grouped = df.groupby(['NAME', 'YEAR_PERIOD']).agg(agg_dict).reset_index()
-    return grouped
+    return aggregate(df, {col: 'mean' for col in agg_cols}, date_freq, version, start, end)
 
 def plot_max_temperature_trends(df_grouped, stations):
     """Plot yearly max temperature trends for stations."""
-    plt.figure(figsize=(12, 6))
+    fig, ax = new_figure((12, 6))
     for station in stations:
         station_data = df_grouped[df_grouped['NAME'] == station]
         if station_data.empty:
             logger.info(f"No data for station: {station}")
             continue
-        plt.plot(station_data['YEAR_PERIOD'].dt.to_timestamp(), station_data['TMAX'], label=station)
-
-    plt.title("Yearly Max Temperature Trends by Station", pad=15)
-    plt.xlabel("Year")
-    plt.ylabel("Max Temperature (°F)")
-    plt.legend(loc='center left', bbox_to_anchor=(1, 0.5), fontsize='small')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+        ax.plot(station_data['YEAR_PERIOD'].dt.to_timestamp(), station_data['TMAX'], label=station)
+
+    ax.set_title("Yearly Max Temperature Trends by Station", pad=15)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Max Temperature (°F)")
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5), fontsize='small')
+    setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
     return fig_to_dash_image(fig)
 
-def aggregate_snowfall_by_station_and_time(df, date_freq='Y'):
+def aggregate_snowfall_by_station_and_time(df, date_freq='Y', version=None, start=None, end=None):
     """Sum snowfall by station and period."""
-    df['YEAR_PERIOD'] = df['DATE'].dt.to_period(date_freq)
-    agg_dict = {'SNOW': 'sum'}
-    grouped = df.groupby(['NAME', 'YEAR_PERIOD']).agg(agg_dict).reset_index()
-    return grouped
+    return aggregate(df, {'SNOW': 'sum'}, date_freq, version, start, end)
 
-def aggregate_weather_conditions(df, date_freq='Y'):
+def aggregate_weather_conditions(df, date_freq='Y', version=None, start=None, end=None):
     """Aggregate multiple weather metrics by station and period."""
-    df['YEAR_PERIOD'] = df['DATE'].dt.to_period(date_freq)
-
-    agg_dict = {col: 'mean' for col in cols if col in df.columns}
+    agg_dict = {col: 'mean' for col in cols}
 
     sum_cols = ['WT16', 'WT08', 'WT01']
     for col in sum_cols:
         if col in agg_dict:
             agg_dict[col] = 'sum'
 
-    grouped = df.groupby(['NAME', 'YEAR_PERIOD']).agg(agg_dict).reset_index()
-    return grouped
+    return aggregate(df, agg_dict, date_freq, version, start, end)
 
 def plot_temperature(df_grouped, station_name):
     """Plot temperature trends for one station."""
@@ -119,17 +133,14 @@ def plot_temperature(df_grouped, station_name):
         logger.info(f"No data for station {station_name}")
         return
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['TMIN'], label='TMIN', color='blue')
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['TAVG'], label='TAVG', color='orange')
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['TMAX'], label='TMAX', color='red')
-    plt.title(f"Temperature Trends for {station_name}", pad=15)
-    plt.xlabel("Year")
-    plt.ylabel("Temperature (°F)")
-    plt.legend()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+    fig, ax = new_figure((10, 6))
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['TMIN'], label='TMIN', color='blue')
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['TAVG'], label='TAVG', color='orange')
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['TMAX'], label='TMAX', color='red')
+    ax.set_title(f"Temperature Trends for {station_name}", pad=15)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Temperature (°F)")
+    ax.legend()
     return fig_to_dash_image(fig)
 
 def plot_precipitation_and_snow(df_grouped, station_name):
@@ -139,16 +150,13 @@ def plot_precipitation_and_snow(df_grouped, station_name):
         logger.info(f"No data for station {station_name}")
         return
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['PRCP'], label='Precipitation (PRCP)', color='green')
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['SNOW'], label='Snowfall (SNOW)', color='cyan')
-    plt.title(f"Precipitation and Snowfall for {station_name}", pad=15)
-    plt.xlabel("Year")
-    plt.ylabel("Inches")
-    plt.legend()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+    fig, ax = new_figure((10, 6))
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['PRCP'], label='Precipitation (PRCP)', color='green')
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['SNOW'], label='Snowfall (SNOW)', color='cyan')
+    ax.set_title(f"Precipitation and Snowfall for {station_name}", pad=15)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Inches")
+    ax.legend()
     return fig_to_dash_image(fig)
 
 def plot_weather_events(df_grouped, station_name):
@@ -158,37 +166,31 @@ def plot_weather_events(df_grouped, station_name):
         logger.info(f"No data for station {station_name}")
         return
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['WT16'], label='WT16 (Weather Type 16)', color='purple')
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['WT08'], label='WT08 (Weather Type 08)', color='brown')
-    plt.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['WT01'], label='WT01 (Weather Type 01)', color='black')
-    plt.title(f"Weather Events for {station_name}", pad=15)
-    plt.xlabel("Year")
-    plt.ylabel("Event Counts")
-    plt.legend()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+    fig, ax = new_figure((10, 6))
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['WT16'], label='WT16 (Weather Type 16)', color='purple')
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['WT08'], label='WT08 (Weather Type 08)', color='brown')
+    ax.plot(data['YEAR_PERIOD'].dt.to_timestamp(), data['WT01'], label='WT01 (Weather Type 01)', color='black')
+    ax.set_title(f"Weather Events for {station_name}", pad=15)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Event Counts")
+    ax.legend()
     return fig_to_dash_image(fig)
 
 def plot_snowfall_trends(df_grouped, stations):
     """Plot yearly snowfall trends for stations."""
-    plt.figure(figsize=(14, 7))
+    fig, ax = new_figure((14, 7))
     for station in stations:
         station_data = df_grouped[df_grouped['NAME'] == station]
         if station_data.empty:
             logger.info(f"No data for station: {station}")
             continue
-        plt.plot(station_data['YEAR_PERIOD'].dt.to_timestamp(), station_data['SNOW'], label=station)
-
-    plt.title("Yearly Snowfall Trends by Station", pad=15)
-    plt.xlabel("Year")
-    plt.ylabel("Total Snowfall (inches)")
-    plt.legend(loc='upper right', fontsize='small', ncol=2)
-    plt.tight_layout()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+        ax.plot(station_data['YEAR_PERIOD'].dt.to_timestamp(), station_data['SNOW'], label=station)
+
+    ax.set_title("Yearly Snowfall Trends by Station", pad=15)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Total Snowfall (inches)")
+    ax.legend(loc='upper right', fontsize='small', ncol=2)
+    fig.tight_layout()
     return fig_to_dash_image(fig)
 
 def plot_snowfall_pie(df_grouped, year, min_threshold=0.01):
@@ -200,7 +202,8 @@ def plot_snowfall_pie(df_grouped, year, min_threshold=0.01):
         logger.info(f"No snowfall data for year {year}")
         return
 
-    snowfall_sum = data_year.groupby('NAME')['SNOW'].sum()
+    snowfall_sum = data_year.groupby('NAME', observed=True)['SNOW'].sum()
+    snowfall_sum.index = snowfall_sum.index.astype(str)  # plain labels so 'Others' can be added
     snowfall_sum = snowfall_sum[snowfall_sum > 0]
 
     if snowfall_sum.empty:
@@ -214,7 +217,7 @@ def plot_snowfall_pie(df_grouped, year, min_threshold=0.01):
     if small_slices_sum > 0:
         large_slices['Others'] = small_slices_sum
 
-    fig, ax = plt.subplots(figsize=(16, 8))
+    fig, ax = new_figure((16, 8))
     wedges, texts, autotexts = ax.pie(
         large_slices,
         labels=None,
@@ -226,7 +229,7 @@ def plot_snowfall_pie(df_grouped, year, min_threshold=0.01):
         radius=1.3
     )
 
-    centre_circle = plt.Circle((0, 0), 0.85, fc='white')
+    centre_circle = Circle((0, 0), 0.85, fc='white')
     ax.add_artist(centre_circle)
     ax.set_title(f"Snowfall Contribution by Station in {year}")
     ax.axis('equal')
@@ -241,10 +244,7 @@ def plot_snowfall_pie(df_grouped, year, min_threshold=0.01):
         title_fontsize=10
     )
 
-    plt.subplots_adjust(left=0.05, right=0.7, top=0.9, bottom=0.1)
-    # fig.show()
-    fig = plt.gcf()
-    plt.close()
+    fig.subplots_adjust(left=0.05, right=0.7, top=0.9, bottom=0.1)
     return fig_to_dash_image(fig)
 
 def plot_snowfall_bar(df_grouped, year):
@@ -256,45 +256,67 @@ def plot_snowfall_bar(df_grouped, year):
         logger.info(f"No snowfall data for year {year}")
         return
 
-    snowfall_sum = data_year.groupby('NAME')['SNOW'].sum()
+    snowfall_sum = data_year.groupby('NAME', observed=True)['SNOW'].sum()
     snowfall_sum = snowfall_sum[snowfall_sum >= 0.15].sort_values(ascending=False)
 
     if snowfall_sum.empty:
         logger.info(f"All stations had snowfall less than 0.2 inches in {year}")
         return
 
-    plt.figure(figsize=(12, 6))
-    snowfall_sum.plot(kind='bar', color='skyblue')
-    plt.title(f"Total Snowfall by Station in {year}", pad=15)
-    plt.ylabel("Snowfall (inches)")
-    plt.xlabel("Station")
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+    fig, ax = new_figure((12, 6))
+    snowfall_sum.plot(kind='bar', color='skyblue', ax=ax)
+    ax.set_title(f"Total Snowfall by Station in {year}", pad=15)
+    ax.set_ylabel("Snowfall (inches)")
+    ax.set_xlabel("Station")
+    setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
     return fig_to_dash_image(fig)
 
 def plot_temperature_boxplot(df_grouped, temp_col='TAVG'):
-    """Boxplot of temperature distribution by year."""
-    fig, ax = plt.subplots(figsize=(20, 6))
+    """Boxplot of temperature distribution by year, drawn from per-year box statistics."""
+    stats = compute_box_stats(df_grouped[temp_col], df_grouped['YEAR_PERIOD'])
+    if stats.empty:
+        logger.info(f"No {temp_col} data for boxplot")
+        return
+
+    fig, ax = new_figure((20, 6))
     readable_label = label_map.get(temp_col, temp_col)
-    df_grouped.boxplot(
-        column=temp_col,
-        by='YEAR_PERIOD',
-        grid=False,
-        rot=90,
-        patch_artist=True,
-        ax=ax
-    )
+    ax.bxp(box_stats_to_bxp(stats), patch_artist=True)
+    ax.tick_params(axis='x', labelrotation=90)
     ax.set_title(f'Distribution of {readable_label} Over Years', pad=10)
-    plt.suptitle('')
     ax.set_xlabel('Year')
     ax.set_ylabel(f'{readable_label} (°F)')
-    plt.tight_layout()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+    fig.tight_layout()
+    return fig_to_dash_image(fig)
+
+def plot_temperature_anomalies(summary, start_year=None, end_year=None):
+    """
+    Yearly temperature anomaly against the stations' day-of-year normals (red warmer, blue
+    colder) and the share of hot days / cold nights outside the normal 10-90th percentiles.
+    summary: normals.yearly_anomaly_summary(...) frame indexed by YEAR.
+    """
+    if summary.empty or summary['TEMP_ANOM'].isna().all():
+        logger.info("No temperature anomalies to plot (no normals for the selected data)")
+        return
+
+    fig, (ax_anom, ax_days) = new_figure((14, 8), nrows=2)
+    years = summary.index.to_numpy()
+    colors = ['#d62728' if value >= 0 else '#1f77b4' for value in summary['TEMP_ANOM'].fillna(0)]
+    ax_anom.bar(years, summary['TEMP_ANOM'], color=colors)
+    ax_anom.axhline(0, color='black', linewidth=0.8)
+    period = f" ({start_year}-{end_year})" if start_year and end_year else ""
+    ax_anom.set_title(f"Temperature Anomaly vs {normals_period()} Normals{period}", pad=10)
+    ax_anom.set_ylabel("Mean Anomaly (°F)")
+
+    ax_days.plot(years, summary['HOT_DAYS'], color='#d62728', marker='o', markersize=3,
+                 label='Days with max temp above normal 90th percentile')
+    ax_days.plot(years, summary['COLD_NIGHTS'], color='#1f77b4', marker='o', markersize=3,
+                 label='Days with min temp below normal 10th percentile')
+    ax_days.axhline(10, color='grey', linestyle='--', linewidth=0.8)
+    ax_days.set_xlabel("Year")
+    ax_days.set_ylabel("% of Days")
+    ax_days.legend(loc='upper left', fontsize='small')
+    fig.tight_layout()
     return fig_to_dash_image(fig)
 
 def show_max_temp_trends(df, agg_cols):
@@ -307,16 +329,7 @@ def show_max_temp_trends(df, agg_cols):
 def plot_station_trends(df_grouped, stations, variable, label_map, max_value=None):
     """ Plot yearly trends of a single weather variable for each station separately."""
     try:
-        df_grouped = df_grouped.copy()
-
-        for station in stations:
-            station_data = df_grouped[df_grouped['NAME'] == station]
-            if station_data.empty:
-                logger.info(f"No data for station: {station}")
-                continue
-            plt.plot(station_data['YEAR_PERIOD'].dt.to_timestamp(), station_data[variable], label=station)
-
-        df_grouped['YEAR'] = df_grouped['DATE'].dt.year
+        df_grouped = with_metrics(df_grouped, ['YEAR'])
         df_filtered = df_grouped[df_grouped[variable].notna()]
 
 
@@ -327,7 +340,7 @@ def plot_station_trends(df_grouped, stations, variable, label_map, max_value=Non
             print("No data to plot after filtering.")
             return
 
-        yearly_station_avg = df_filtered.groupby(['NAME', 'YEAR'])[variable].mean().reset_index()
+        yearly_station_avg = df_filtered.groupby(['NAME', 'YEAR'], observed=True)[variable].mean().reset_index()
 
         title = f"Yearly Average {label_map.get(variable, variable)} by Station"
 
@@ -350,11 +363,10 @@ def plot_station_trends(df_grouped, stations, variable, label_map, max_value=Non
 # Weather Event Frequency (for WT codes)
 def plot_weather_one_event_frequencies(df, event_cols, label_map):
     """Plot yearly counts of weather events."""
-    df['YEAR'] = df['DATE'].dt.year
+    df = with_metrics(df, ['YEAR'] + [f"{col}_flag" for col in event_cols])
     for col in event_cols:
         if col in df.columns:
             flag_col = f"{col}_flag"
-            df[flag_col] = df[col].apply(lambda x: 1 if x > 0 else 0)
             yearly_count = df.groupby('YEAR')[flag_col].sum().reset_index()
             fig = px.bar(
                 yearly_count,
@@ -367,48 +379,31 @@ def plot_weather_one_event_frequencies(df, event_cols, label_map):
             fig.show()
 
 def prepare_event_flags(df: pd.DataFrame, event_cols: list[str]) -> pd.DataFrame:
-    """ Add *_flag columns to DataFrame where event occurred (value > 0). """
-    df = df.copy()
-    df['YEAR'] = df['DATE'].dt.year
-
-    for col in event_cols:
-        if col in df.columns:
-            flag_col = f"{col}_flag"
-            df[flag_col] = df[col].apply(lambda x: 1 if pd.notna(x) and x > 0 else 0)
-
-    return df
-
-def plot_aggregated_weather_event_frequencies(df, event_cols, label_map, year_from=None, year_to=None):
-    """ Plot yearly counts of multiple weather events on one combined figure. """
-    df = df.copy()
-    df['YEAR'] = df['DATE'].dt.year
-
-    # Ensure flags exist (should already if prepare_event_flags used)
-    for col in event_cols:
-        flag_col = f"{col}_flag"
-        if flag_col not in df.columns:
-            df[flag_col] = df[col].apply(lambda x: 1 if pd.notna(x) and x > 0 else 0)
-
-    # Compute yearly totals to find valid years to filter out low data years
-    counts_tmp = df.groupby('YEAR')[[f"{col}_flag" for col in event_cols]].sum()
-    counts_tmp['total'] = counts_tmp.sum(axis=1)
-    valid_years = counts_tmp[counts_tmp['total'] >= 250].index.tolist()
-
+    """ Add YEAR and *_flag columns (value > 0) from the derived-metric registry. """
+    return with_metrics(df, ['YEAR'] + [f"{col}_flag" for col in event_cols if col in df.columns])
+
+def plot_aggregated_weather_event_frequencies(df, event_cols, label_map, year_from=None, year_to=None,
+                                              counts=None):
+    """
+    Plot yearly counts of multiple weather events on one combined figure.
+    counts: precomputed yearly_event_counts(...) result; computed from df when omitted.
+    """
+    if counts is None:
+        counts = yearly_event_counts(df, event_cols)
+    event_cols = [col for col in event_cols if col in counts.columns]
+
+    # Filter out low data years using the yearly totals of the same table
+    valid = counts[counts[event_cols].sum(axis=1) >= 250]
+    valid_years = valid.index.tolist()
     logger.info(f"Filtered years (total_events >= 250): {min(valid_years)} to {max(valid_years)}")
-    # Filter original df to valid years only
-    df = df[df['YEAR'].isin(valid_years)]
 
     if year_from is not None and year_from in valid_years:
-        df = df[df['YEAR'] >= year_from]
+        valid = valid[valid.index >= year_from]
     if year_to is not None and year_to in valid_years:
-        df = df[df['YEAR'] <= year_to]
+        valid = valid[valid.index <= year_to]
 
-    yearly_counts = df.groupby('YEAR')[[f"{col}_flag" for col in event_cols]].sum().reset_index()
-    rename_map = {
-        f"{col}_flag": label_map.get(col, f"Unknown ({col})")
-        for col in event_cols
-    }
-    yearly_counts.rename(columns=rename_map, inplace=True)
+    rename_map = {col: label_map.get(col, f"Unknown ({col})") for col in event_cols}
+    yearly_counts = valid[event_cols].rename(columns=rename_map).reset_index()
 
     # Plot combined bar chart
     logger.info(f"Years in final chart: {yearly_counts['YEAR'].tolist()}")
@@ -424,32 +419,60 @@ def plot_aggregated_weather_event_frequencies(df, event_cols, label_map, year_fr
     # fig.show()
     return plotly_fig_to_base64_img(fig)
 
-def plot_yearly_distributions(df, columns, label_map):
-    """Plot yearly boxplots for weather variables (spread/distribution)"""
-    df['YEAR'] = df['DATE'].dt.year
-    images = []
+def box_stats_to_bxp(stats):
+    """compute_box_stats rows as the dicts matplotlib's Axes.bxp draws."""
+    return [
+        {'label': str(group), 'q1': row.q1, 'med': row.med, 'q3': row.q3,
+         'whislo': row.whislo, 'whishi': row.whishi, 'fliers': row.fliers}
+        for group, row in zip(stats.index, stats.itertuples())
+    ]
+
+def box_stats_figure(stats, label, title):
+    """Plotly box figure from precomputed statistics: payload is O(years), not O(rows)."""
+    years = stats.index.astype(str).tolist()
+    fig = go.Figure(go.Box(
+        x=years, q1=stats['q1'], median=stats['med'], q3=stats['q3'],
+        lowerfence=stats['whislo'], upperfence=stats['whishi'],
+        name=label, boxpoints=False, marker_color='#636efa'
+    ))
+    flier_years = [year for year, fliers in zip(years, stats['fliers']) for _ in fliers]
+    flier_values = [value for fliers in stats['fliers'] for value in fliers]
+    fig.add_trace(go.Scatter(x=flier_years, y=flier_values, mode='markers', name='Outliers',
+                             marker=dict(color='#636efa', size=4), showlegend=False))
+    fig.update_layout(title=title, xaxis_title='Year', yaxis_title=label, showlegend=False)
+    return fig
+
+def plot_yearly_distributions(df, columns, label_map, stats=None):
+    """
+    Plot yearly boxplots for weather variables (spread/distribution).
+    stats: {column: yearly_box_stats(...)} precomputed per dataset version; computed from df when omitted.
+    """
+    figs = {}
     for col in columns:
         if col in df.columns:
-            fig = px.box(
-                df,
-                x='YEAR',
-                y=col,
-                title=f"{label_map.get(col, col)} Distribution by Year",
-                labels={'YEAR': 'Year', col: label_map.get(col, col)}
+            col_stats = stats[col] if stats and col in stats else yearly_box_stats(df, col)
+            figs[col] = box_stats_figure(
+                col_stats,
+                label_map.get(col, col),
+                f"{label_map.get(col, col)} Distribution by Year"
             )
             # fig.show()
-            try:
-                img_bytes = fig.to_image(format="png")
-                encoded = base64.b64encode(img_bytes).decode()
-                img_src = f"data:image/png;base64,{encoded}"
-                images.append(img_src)
-            except Exception as e:
-                logger.error(f"Failed to render image for {col}: {e}")
+
+    # One batch: the figures render concurrently on the warm kaleido tabs
+    fmt = image_format.get()
+    images = []
+    for col, result in zip(figs, plotly_renderer.render_many(list(figs.values()), fmt)):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to render image for {col}: {result}")
+        else:
+            images.append(png_to_data_uri(result, fmt))
+    logger.info(f"[RENDER] Plotly latency: {plotly_renderer.latency_summary()}")
     return images
 
-def plot_weather_correlation_heatmap(df, columns):
-    """Show correlation heatmap for selected weather features."""
-    df_agg = aggregate_weather_conditions(df, date_freq='Y')
+def plot_weather_correlation_heatmap(df, columns, df_agg=None):
+    """Show correlation heatmap for selected weather features (df_agg: precomputed yearly conditions)."""
+    if df_agg is None:
+        df_agg = aggregate_weather_conditions(df, date_freq='Y')
 
     missing_cols = [col for col in columns if col not in df_agg.columns]
     if missing_cols:
@@ -475,13 +498,10 @@ def plot_weather_correlation_heatmap(df, columns):
     df_corr = df_agg_filled[columns].corr()
     logger.info(df_corr)
 
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(df_corr, annot=True, cmap='coolwarm', fmt=".2f")
-    plt.title("Correlation Between Weather Features", pad=15)
-    plt.tight_layout()
-    # plt.show()
-    fig = plt.gcf()
-    plt.close()
+    fig, ax = new_figure((10, 8))
+    sns.heatmap(df_corr, annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+    ax.set_title("Correlation Between Weather Features", pad=15)
+    fig.tight_layout()
     img_str = fig_to_dash_image(fig)
     logger.info(f"Generated image string length: {len(img_str)}")
     return img_str
@@ -523,5 +543,6 @@ def analysis_and_visualization():
 
 # -------------------------
 # analysis_and_visualization()
-# uncomment plt.show() fig.show() to run from CLI
+# uncomment fig.show() to run from CLI
 # py -m app.data_processing.data_analysis
+# py -m app.report  (renders every chart to files in parallel)
@@ -3,6 +3,8 @@ import glob
 import numpy as np
 import pandas as pd
 
+from app.data_processing.schema import apply_compact_dtypes
+from app.metrics import CleaningMetrics
 from app.utils import RAW_DATA_DIR, PROCESSED_DATA_DIR, get_latest_csv_filename
 from app.logger import logger
 from dotenv import load_dotenv
@@ -12,6 +14,22 @@ MIN_START_DATE = os.getenv('MIN_START_DATE')
 input_dir=RAW_DATA_DIR
 output_dir=PROCESSED_DATA_DIR
 
+# Column Definitions
+BASE_COLS = ['STATION', 'DATE', 'LATITUDE', 'LONGITUDE', 'ELEVATION', 'NAME']
+DATA_COLS = ['TAVG', 'TMIN', 'TMAX', 'WT16', 'SNOW', 'ACMH', 'WSFG',
+             'PRCP', 'RHAV', 'TSUN', 'WT08', 'WT01', 'WT02']
+KEEP_COLS = BASE_COLS + DATA_COLS
+TEXT_COLS = ['STATION', 'NAME']
+TEMP_COLS = ['TAVG', 'TMIN', 'TMAX']
+DATE_FORMAT = '%Y-%m-%d'
+
+# Parse-time dtypes for the typed fast path; other data columns are only checked for presence
+RAW_DTYPES = {
+    'STATION': str, 'DATE': str, 'NAME': str,
+    'LATITUDE': 'float64', 'LONGITUDE': 'float64', 'ELEVATION': 'float64',
+    **{col: 'float64' for col in DATA_COLS},
+}
+
 
 def list_csv_files(input_dir):
     """Return a list of CSV file paths in the directory."""
@@ -29,34 +47,72 @@ def write_file_list(file_list, output_list_path):
             f.write(f"{os.path.basename(file_path)}\n")
     logger.info(f"Wrote list of files to {output_list_path}")
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    base_cols = ['STATION', 'DATE', 'LATITUDE', 'LONGITUDE', 'ELEVATION', 'NAME']
+def _drop_rows(df: pd.DataFrame, keep: pd.Series, metrics: CleaningMetrics, reason: str) -> pd.DataFrame:
+    """Keep rows where `keep` is True, counting the rest under reason"""
+    metrics.drop(reason, len(keep) - int(keep.sum()))
+    return df[keep]
+
+def _drop_before_min_date(df: pd.DataFrame, metrics: CleaningMetrics) -> pd.DataFrame:
+    """Remove rows with DATE before MIN_START_DATE"""
+    return _drop_rows(df, df['DATE'] >= pd.Timestamp(MIN_START_DATE), metrics, 'before_min_date')
+
+def _fill_tavg(df: pd.DataFrame, metrics: CleaningMetrics) -> pd.DataFrame:
+    """Fill 'TAVG' with average of 'TMAX' and 'TMIN'"""
+    if all(col in df.columns for col in ['TMAX', 'TMIN']):
+        avg_temp = df[['TMAX', 'TMIN']].mean(axis=1)
+        if 'TAVG' in df.columns:
+            missing = df['TAVG'].isna()
+            df['TAVG'] = df['TAVG'].fillna(avg_temp)
+            metrics.fill('TAVG', int((missing & avg_temp.notna()).sum()))
+        else:
+            df['TAVG'] = avg_temp
+            metrics.fill('TAVG', int(avg_temp.notna().sum()))
+    return df
+
+def _drop_unrealistic_temps(df: pd.DataFrame, metrics: CleaningMetrics) -> pd.DataFrame:
+    """Remove rows with unrealistic temperature values (in Celsius)"""
+    for col in TEMP_COLS:
+        if col in df.columns:
+            keep = (df[col].isna()) | ((df[col] >= -500) & (df[col] <= 512))
+            df = _drop_rows(df, keep, metrics, f"out_of_range_{col}")
+    return df
+
+def _emit(metrics: CleaningMetrics, df: pd.DataFrame, owned: bool) -> pd.DataFrame:
+    """Finish the metrics with the cleaned frame; log them when the caller did not supply them"""
+    metrics.finish(df)
+    if owned:
+        metrics.log()
+    return df
+
+def clean_data(df: pd.DataFrame, metrics: CleaningMetrics | None = None) -> pd.DataFrame:
+    """
+    Clean a raw NOAA frame of any dtypes. Data-quality counters go to `metrics`; when none
+    is given a record is created and logged once at the end.
+    """
+    owned = metrics is None
+    metrics = metrics or CleaningMetrics("clean_data")
+    base_cols = BASE_COLS
     required_columns = set(base_cols)
-    keep_cols = base_cols + ['TAVG', 'TMIN', 'TMAX', 'WT16', 'SNOW', 'ACMH', 'WSFG',
-                         'PRCP', 'RHAV', 'TSUN', 'WT08', 'WT01', 'WT02']
+    keep_cols = KEEP_COLS
+    metrics.rows_in += len(df)
 
     missing_columns = required_columns - set(df.columns)
     if missing_columns:
         logger.error(f"[CLEAN] Missing required columns: {', '.join(missing_columns)}")
-        return pd.DataFrame()
+        metrics.drop('missing_required_columns', len(df))
+        return _emit(metrics, pd.DataFrame(), owned)
 
     # Remove columns that end with '_ATTRIBUTES'
     df = df.loc[:, ~df.columns.str.endswith('_ATTRIBUTES')].copy()
 
     # Remove rows: replace empty strings with NaN, and drop fully empty rows
     df = df.replace(r'^\s*$', np.nan, regex=True)
-    df.dropna(how='all', inplace=True)
+    df = _drop_rows(df, df.notna().any(axis=1), metrics, 'empty')
 
     # Drop rows where only base_cols have values
     # (Do NOT drop it if at least one data column has a value)
-    logger.info(f"Before cleaning: {df.shape}")
-
     data_columns = df.columns.difference(base_cols)
-    logger.info(f"Data columns to check for NaNs: {list(data_columns)}")
-    logger.info(f"Null counts:\n{df[data_columns].isnull().sum()}")
-
-    df = df.dropna(subset=data_columns, how='all')
-    logger.info(f"After cleaning: {df.shape}")
+    df = _drop_rows(df, df[data_columns].notna().any(axis=1), metrics, 'no_data')
 
     # Keep only relevant columns: base + present allowed data columns
     df = df[[col for col in keep_cols if col in df.columns]].copy()
@@ -64,64 +120,136 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     # clean leading and trailing spaces in STR columns
     for col in df.select_dtypes(include=['object']):
         df[col] = df[col].astype(str).str.strip()
-        logger.info(f"Cleaned column '{col}', sample values:\n{df[col].head()}")
 
     # Validate 'DATE' column
     df['DATE'] = pd.to_datetime(df['DATE'], errors='coerce')
-    df.dropna(subset=['DATE'], inplace=True)
-    logger.info(f"DATE column converted to datetime. Valid dates count: {df['DATE'].notna().sum()}")
-
-    # Remove rows with DATE before MIN_START_DATE
-    before = len(df)
-    df = df[df['DATE'] >= pd.Timestamp(MIN_START_DATE)]
-    removed = before - len(df)
-    if removed > 0:
-        logger.info(f"[CLEAN] Removed {removed} rows with DATE before {MIN_START_DATE}.")
-
-    # Fill 'TAVG' with average of 'TMAX' and 'TMIN'
-    if all(col in df.columns for col in ['TMAX', 'TMIN']):
-        avg_temp = df[['TMAX', 'TMIN']].mean(axis=1)
-        if 'TAVG' in df.columns:
-            df['TAVG'] = df['TAVG'].fillna(avg_temp)
-        else:
-            df['TAVG'] = avg_temp
+    df = _drop_rows(df, df['DATE'].notna(), metrics, 'invalid_date')
 
-    # Remove rows with unrealistic temperature values (in Celsius)
-    temp_cols = ['TAVG', 'TMIN', 'TMAX']
-    for col in temp_cols:
-        if col in df.columns:
-            df = df[(df[col].isna()) | ((df[col] >= -500) & (df[col] <= 512))]
+    df = _drop_before_min_date(df, metrics)
+    df = _fill_tavg(df, metrics)
+    df = _drop_unrealistic_temps(df, metrics)
 
     # Convert all non-base columns to numeric
     numeric_cols = [col for col in df.columns if col not in base_cols]
     for col in numeric_cols:
-        before_na = df[col].isna().sum()
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-        after_na = df[col].isna().sum()
-        if after_na > before_na:
-            logger.warning(f"[CLEAN] Column '{col}': {after_na - before_na} non-numeric values converted to NaN.")
-            # show non-numeric samples (for debugging)
-            sample_invalid = df[col][df[col].isna()].dropna().head()
-            logger.debug(f"[CLEAN] Example invalid values in '{col}': {sample_invalid.values}")
-
-    logger.info(f"[CLEAN] Cleaned dataframe with {len(df)} rows")
+        converted = pd.to_numeric(df[col], errors='coerce')
+        metrics.coerce(col, int((converted.isna() & df[col].notna()).sum()))
+        df[col] = converted
+
+    return _emit(metrics, apply_compact_dtypes(df, label="clean_data"), owned)
+
+def raw_read_options(input_file_path: str, typed: bool = True) -> dict:
+    """
+    Return read_csv keyword arguments for a raw NOAA CSV: '_ATTRIBUTES' columns are skipped
+    at parse time and RAW_DTYPES are applied (or every column is read as text when typed=False).
+    """
+    header = pd.read_csv(input_file_path, nrows=0).columns
+    usecols = [col for col in header if not col.endswith('_ATTRIBUTES')]
+    # Data columns outside KEEP_COLS are read as text: they only decide whether a row has any data
+    dtype = {col: RAW_DTYPES.get(col, str) if typed else str for col in usecols}
+    return {'usecols': usecols, 'dtype': dtype}
+
+def read_raw_csv_fast(input_file_path: str) -> pd.DataFrame | None:
+    """
+    Read a raw NOAA CSV with explicit dtypes, skipping '_ATTRIBUTES' columns at parse time.
+    Returns None when a measurement column is not numeric, so callers can fall back to read_raw_csv.
+    """
+    try:
+        return pd.read_csv(input_file_path, **raw_read_options(input_file_path))
+    except ValueError as e:
+        logger.warning(f"[CLEAN] Typed read failed for {input_file_path}, using generic path: {e}")
+        return None
+
+def coerce_raw_text(df: pd.DataFrame, metrics: CleaningMetrics | None = None) -> pd.DataFrame:
+    """Convert a raw frame read as text to RAW_DTYPES; non-numeric measurements become NaN."""
+    for col in df.columns:
+        if RAW_DTYPES.get(col, str) is not str:
+            text = _strip_text(df[col])
+            df[col] = pd.to_numeric(text, errors='coerce')
+            if metrics is not None:
+                metrics.coerce(col, int((df[col].isna() & text.notna()).sum()))
     return df
 
-def clean_single_csv(filename):
+def _strip_text(series: pd.Series) -> pd.Series:
+    """Strip a text column and turn empty strings into NaN."""
+    stripped = series.str.strip()
+    return stripped.mask(stripped == '')
+
+def clean_data_fast(df: pd.DataFrame, metrics: CleaningMetrics | None = None) -> pd.DataFrame:
+    """
+    Clean a frame produced by read_raw_csv_fast. Applies the same rules as clean_data,
+    but measurements are already float64 and only text columns get string handling.
+    """
+    owned = metrics is None
+    metrics = metrics or CleaningMetrics("clean_data_fast")
+    metrics.rows_in += len(df)
+
+    missing_columns = set(BASE_COLS) - set(df.columns)
+    if missing_columns:
+        logger.error(f"[CLEAN] Missing required columns: {', '.join(missing_columns)}")
+        metrics.drop('missing_required_columns', len(df))
+        return _emit(metrics, pd.DataFrame(), owned)
+
+    typed_cols = [col for col in DATA_COLS if col in df.columns]
+    extra_cols = [col for col in df.columns if col not in KEEP_COLS]
+
+    # Keep rows with at least one data value (blank text counts as missing)
+    if typed_cols or extra_cols:
+        has_data = df[typed_cols].notna().any(axis=1)
+        for col in extra_cols:
+            has_data |= _strip_text(df[col]).notna()
+        df = _drop_rows(df, has_data, metrics, 'no_data')
+    else:
+        df = _drop_rows(df, df.notna().any(axis=1), metrics, 'empty')
+
+    df = df[[col for col in KEEP_COLS if col in df.columns]].copy()
+    for col in TEXT_COLS:
+        df[col] = _strip_text(df[col]).astype(str)
+
+    df['DATE'] = pd.to_datetime(df['DATE'].str.strip(), format=DATE_FORMAT, errors='coerce')
+    df = _drop_rows(df, df['DATE'].notna(), metrics, 'invalid_date')
+
+    df = _drop_before_min_date(df, metrics)
+    df = _fill_tavg(df, metrics)
+    df = _drop_unrealistic_temps(df, metrics)
+
+    return _emit(metrics, apply_compact_dtypes(df, label="clean_data_fast"), owned)
+
+def read_raw_csv(input_file_path: str) -> pd.DataFrame:
+    """Read a raw NOAA CSV, drop fully empty rows and strip string cells."""
+    df_raw = pd.read_csv(input_file_path, low_memory=False)
+    df = df_raw.dropna(how='all').copy()
+
+    for col in df.select_dtypes(include=['object']):
+        df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
+    return df
+
+def clean_raw_csv(filename, src_dir=None, metrics: CleaningMetrics | None = None) -> pd.DataFrame:
+    """
+    Read and clean one raw CSV file without writing the processed copy.
+    Without `metrics`, the file's quality record is logged and stored in QUALITY_DIR.
+    """
+    input_file_path = os.path.join(src_dir or input_dir, filename)
+    logger.info(f"input_path: {input_file_path}")
+    owned = metrics is None
+    metrics = metrics or CleaningMetrics(os.path.basename(filename))
+    df_raw = read_raw_csv_fast(input_file_path)
+    if df_raw is not None:
+        df = clean_data_fast(df_raw, metrics)
+    else:
+        df = clean_data(read_raw_csv(input_file_path), metrics)
+    if owned:
+        metrics.log()
+        metrics.save()
+    return df
+
+def clean_single_csv(filename, src_dir=None, dst_dir=None):
     """Read, clean one CSV file and return cleaned DataFrame."""
     try:
-        input_file_path = os.path.join(input_dir, filename)
-        logger.info(f"input_path: {input_file_path}")
-        output_file_path = os.path.join(output_dir, filename)
+        output_file_path = os.path.join(dst_dir or output_dir, os.path.basename(filename))
         logger.info(f"output_path: {output_file_path}")
 
-        df_raw = pd.read_csv(input_file_path, low_memory=False)
-        df = df_raw.dropna(how='all').copy()
-
-        for col in df.select_dtypes(include=['object']):
-            df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
-
-        df = clean_data(df)
+        df = clean_raw_csv(filename, src_dir)
 
         logger.info(f"[CLEAN] Successfully cleaned: {filename}")
         save_clean_data_to_csv(df, output_file_path)
@@ -147,14 +275,16 @@ def load_latest_csv(download_dir):
     return pd.read_csv(csv_path)
 
 def save_clean_data_to_csv(df: pd.DataFrame, output_path: str):
-    """Save cleaned DataFrame to CSV."""
-    df.to_csv(output_path, index=False)
+    """Save cleaned DataFrame to CSV (written to a temp file, then swapped in)."""
+    tmp_path = f"{output_path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
     logger.info(f"Saved cleaned data to: {output_path}")
 
 def clean_all_csv_files(input_dir, output_dir):
     """
     Clean all CSV files in the directory (drop empty rows, strip spaces),
-    then save cleaned CSVs to output_dir.
+    then save cleaned CSVs to output_dir. See batch_cleaner for the parallel, incremental version.
     """
     csv_files = glob.glob(os.path.join(input_dir, "*.csv"))
     if not csv_files:
@@ -164,12 +294,10 @@ def clean_all_csv_files(input_dir, output_dir):
     os.makedirs(output_dir, exist_ok=True)
 
     for file_path in csv_files:
-        cleaned_df = clean_single_csv(file_path)
+        filename = os.path.basename(file_path)
+        cleaned_df = clean_single_csv(filename, input_dir, output_dir)
         if cleaned_df is not None and not cleaned_df.empty:
-            filename = os.path.basename(file_path)
-            output_path = os.path.join(output_dir, filename)
-            save_clean_data_to_csv(cleaned_df, output_path)
-            logger.info(f"Cleaned and saved: {output_path}")
+            logger.info(f"Cleaned and saved: {os.path.join(output_dir, filename)}")
         else:
             logger.info(f"Skipping file (empty or failed to clean): {file_path}")
 
@@ -187,6 +315,7 @@ def clean_all_csv_files(input_dir, output_dir):
 # clean_single_csv(file_path)
 #
 # Command line examples:
+# py -m app.data_processing.batch_cleaner --workers 4
 # py -m app.data_processing.data_cleaner data/raw/US1CALA0090.csv
 # py -m app.data_processing.data_cleaner USC00282644.csv
 # -------------------------
\ No newline at end of file
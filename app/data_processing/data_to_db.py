@@ -1,9 +1,13 @@
 import glob
 import os
 import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
 import pandas as pd
 
 from app.data_processing.data_cleaner import list_csv_files, clean_single_csv
+from app.data_processing.normals import refresh_changed_normals
 from app.utils import RAW_DATA_DIR, PROCESSED_DATA_DIR, REPO_PROCESSED_DIR, DB_DIR, DB_PATH, DB_NAME, TABLE_NAME, \
     get_latest_csv_filename, IS_RENDER
 from app.logger import logger
@@ -11,6 +15,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MIN_START_DATE = os.getenv('MIN_START_DATE')
+# Already stored rows this many days back from a station's latest DATE are re-checked for revisions
+IMPORT_LOOKBACK_DAYS = int(os.getenv('IMPORT_LOOKBACK_DAYS', '30'))
 input_dir = RAW_DATA_DIR
 output_dir = PROCESSED_DATA_DIR
 logger.info(f"Input folder: {input_dir}")
@@ -20,6 +26,7 @@ base_cols = ['STATION', 'DATE', 'LATITUDE', 'LONGITUDE', 'ELEVATION', 'NAME']
 optional_cols = ['TAVG', 'TMIN', 'TMAX', 'WT16', 'SNOW', 'ACMH', 'WSFG',
                  'PRCP', 'RHAV', 'TSUN', 'WT08', 'WT01', 'WT02']
 keep_cols = base_cols + optional_cols
+text_cols = ['STATION', 'DATE', 'NAME']
 
 def get_all_cleaned_csv_files() -> list[str]:
     """Get all cleaned CSV files if multiple"""
@@ -34,103 +41,249 @@ def get_all_cleaned_csv_files() -> list[str]:
         logger.info("No CSV files found to import.")
         return []
 
-def clean_latest_csv_file(filename) -> str:
-    """Get latest downloaded CSV filename, clean it, and return the filename."""
-    full_path = os.path.join(RAW_DATA_DIR, filename)
-    clean_single_csv(full_path)
-    return filename
-
-def get_cleaned_csv_files(filename: str) -> list[str]:
-    """Return full path to cleaned file(s) based on filename."""
-    cleaned_path = os.path.join(PROCESSED_DATA_DIR, filename)
-    return [cleaned_path] if os.path.exists(cleaned_path) else []
-
-# get latest raw csv, clean and save
-def prepare_latest_csv_files():
-    csv_path = None
-    if csv_path is None:
-        latest = get_latest_csv_filename()
-        if not latest:
-            logger.info("No CSV files to import.")
-            return False, "No CSV files found."
-        latest_csv_filename = clean_latest_csv_file(latest)
-        csv_files = get_cleaned_csv_files(latest_csv_filename)
-        logger.info(f"Cleaned CSV files: {csv_files}")
-    else:
-        csv_files = [csv_path]
-    logger.info(f"CSV files to import: {csv_files}")
-    return csv_files
-
 schema = """
 CREATE TABLE IF NOT EXISTS weather_data (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     STATION TEXT, DATE TEXT, LATITUDE REAL, LONGITUDE REAL, ELEVATION REAL,
     NAME TEXT, CITY_NAME TEXT, TAVG REAL, TMIN REAL, TMAX REAL, WT16 REAL, 
     SNOW REAL, ACMH REAL, WSFG REAL, PRCP REAL, RHAV REAL, TSUN REAL,
-    WT08 REAL, WT01 REAL, WT02 REAL
+    WT08 REAL, WT01 REAL, WT02 REAL, ROW_HASH TEXT
 )
 """
+station_date_index = f"CREATE INDEX IF NOT EXISTS idx_station_date ON {TABLE_NAME} (STATION, DATE)"
+# Earliest changed DATE per station for each data version (PRAGMA user_version), used by
+# readers to reload only what changed since the version they hold
+import_log_schema = """
+CREATE TABLE IF NOT EXISTS import_log (
+    version INTEGER, STATION TEXT, MIN_DATE TEXT, imported_at TEXT
+)
+"""
+# Versions older than this many imports are pruned from import_log (readers then reload fully)
+IMPORT_LOG_KEEP_VERSIONS = 100
 
-# Connect to SQLite DB and create table
-def import_csv_to_db(csv_path: str = None) -> tuple[bool, str]:
+def ensure_schema(cursor):
+    """Create the weather table and index; add ROW_HASH to databases created before it existed."""
+    cursor.execute(schema)
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({TABLE_NAME})")}
+    if 'ROW_HASH' not in existing:
+        cursor.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN ROW_HASH TEXT")
+        logger.info(f"[DB] Added ROW_HASH column to '{TABLE_NAME}'.")
+    cursor.execute(station_date_index)
+    cursor.execute(import_log_schema)
+
+def get_data_version(conn) -> int:
+    """Data version counter of the DB, bumped by every import that changes rows."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def bump_data_version(cursor, changes: dict) -> int:
     """
-    Import data from given cleaned CSV file path into SQLite DB.
-    Returns:
-        (success: bool, message: str)
+    Increment the data version and log the earliest changed DATE per station.
+    Must run in the import's transaction so readers never see rows without the new version.
     """
-    try:
-        # Ensure DB directory exists
-        os.makedirs(DB_DIR, exist_ok=True)
+    version = get_data_version(cursor.connection) + 1
+    cursor.execute(f"PRAGMA user_version = {version}")
+    imported_at = datetime.now().isoformat(timespec='seconds')
+    cursor.executemany("INSERT INTO import_log (version, STATION, MIN_DATE, imported_at) VALUES (?, ?, ?, ?)",
+                       [(version, station, min_date, imported_at) for station, min_date in changes.items()])
+    cursor.execute("DELETE FROM import_log WHERE version <= ?", (version - IMPORT_LOG_KEEP_VERSIONS,))
+    logger.info(f"[DB] Data version {version}: {len(changes)} stations changed.")
+    return version
+
+def _note_change(changes: dict | None, station: str, dates: pd.Series):
+    if changes is None or dates.empty:
+        return
+    min_date = dates.min()
+    changes[station] = min(changes.get(station, min_date), min_date)
+
+def _prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df reduced to keep_cols with DATE as 'YYYY-MM-DD' text and a ROW_HASH column."""
+    df = df.copy()
+    if pd.api.types.is_datetime64_any_dtype(df['DATE']):
+        df['DATE'] = df['DATE'].dt.strftime('%Y-%m-%d')
+
+    for col in keep_cols:
+        if col not in df.columns:
+            df[col] = None
+
+    df = df[keep_cols]
+    # Undo the compact in-memory dtypes (schema.COMPACT_DTYPES) so sqlite3 gets plain values
+    for col in keep_cols:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        elif dtype == 'float32':
+            # float32 noise (e.g. 42.70000076) disappears at the 4 decimals NOAA values never exceed
+            df[col] = df[col].astype('float64').round(4)
+        elif pd.api.types.is_extension_array_dtype(dtype):
+            df[col] = df[col].astype('float64')
+    df['ROW_HASH'] = _row_hashes(df)
+    return df
 
-        if csv_path is None:
-            latest = get_latest_csv_filename()
-            if not latest:
-                logger.info("No CSV files to import.")
-                return False, "No CSV files found."
-            latest_csv_filename = clean_latest_csv_file(latest)
-            csv_files = get_cleaned_csv_files(latest_csv_filename)
+def _row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Hash keep_cols per row; values are normalized so DB reads and fresh frames hash alike."""
+    normalized = pd.DataFrame(index=df.index)
+    for col in keep_cols:
+        if col in text_cols:
+            normalized[col] = df[col].astype(str)
         else:
-            csv_files = [csv_path] #important
-        logger.info(f"CSV files to import: {csv_files}")
+            normalized[col] = np.round(pd.to_numeric(df[col], errors='coerce').astype('float64'), 4)
+    return pd.util.hash_pandas_object(normalized, index=False).astype(str)
 
-        if not csv_files:
-            msg = "No CSV files to process."
-            logger.info(msg)
-            return False, msg
+def _insert_rows(cursor, df: pd.DataFrame):
+    cols = keep_cols + ['ROW_HASH']
+    placeholders = ', '.join('?' for _ in cols)
+    insert_stmt = f"INSERT INTO {TABLE_NAME} ({', '.join(cols)}) VALUES ({placeholders})"
+    cursor.executemany(insert_stmt, df[cols].itertuples(index=False, name=None))
 
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(schema)
-            logger.info(f"Ensured table {TABLE_NAME} exists.")
+def _update_rows(cursor, df: pd.DataFrame):
+    set_cols = [col for col in keep_cols if col not in ('STATION', 'DATE')] + ['ROW_HASH']
+    update_stmt = (f"UPDATE {TABLE_NAME} SET {', '.join(f'{col} = ?' for col in set_cols)} "
+                   f"WHERE STATION = ? AND DATE = ?")
+    cursor.executemany(update_stmt, df[set_cols + ['STATION', 'DATE']].itertuples(index=False, name=None))
 
-            # Insert data from each CSV
-            for csv_file in csv_files:
-                logger.info(f"Importing file: {csv_file}")
-                df = pd.read_csv(csv_file)
+def _stored_hashes(cursor, station: str, after_date: str) -> pd.Series:
+    """ROW_HASH by DATE for a station's stored rows newer than after_date (computed if missing)."""
+    stored = pd.read_sql_query(
+        f"SELECT {', '.join(keep_cols)}, ROW_HASH FROM {TABLE_NAME} WHERE STATION = ? AND DATE > ?",
+        cursor.connection, params=(station, after_date)
+    )
+    stored = stored.drop_duplicates(subset='DATE', keep='first')
+    missing = stored['ROW_HASH'].isna()
+    if missing.any():
+        stored.loc[missing, 'ROW_HASH'] = _row_hashes(stored[missing])
+    return stored.set_index('DATE')['ROW_HASH']
 
-                if 'DATE' in df.columns:
-                    df['DATE'] = pd.to_datetime(df['DATE'], errors='coerce')
-                    df = df[df['DATE'] >= pd.Timestamp(MIN_START_DATE)]
-                    df['DATE'] = df['DATE'].dt.strftime('%Y-%m-%d')
-                    logger.info(f"Filtered data to dates >= {MIN_START_DATE}. Remaining rows: {len(df)}")
+def _upsert_frame(cursor, df: pd.DataFrame, changes: dict | None = None) -> dict:
+    """
+    Append only rows newer than each station's latest stored DATE, and update stored rows
+    within IMPORT_LOOKBACK_DAYS of it whose content hash changed. Older rows are skipped.
+    The earliest written DATE per station is recorded in `changes` when given.
+    Returns counts: {'inserted', 'updated', 'skipped'}.
+    """
+    df = _prepare_frame(df)
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
 
-                for col in keep_cols:
-                    if col not in df.columns:
-                        df[col] = None
+    for station, group in df.groupby('STATION', sort=False):
+        cursor.execute(f"SELECT MAX(DATE) FROM {TABLE_NAME} WHERE STATION = ?", (station,))
+        max_date = cursor.fetchone()[0]
+        if max_date is None:
+            _insert_rows(cursor, group)
+            _note_change(changes, station, group['DATE'])
+            counts['inserted'] += len(group)
+            continue
 
-                df = df[keep_cols]
-                rows = df.itertuples(index=False, name=None)
+        cutoff = (datetime.strptime(max_date, "%Y-%m-%d") - timedelta(days=IMPORT_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        new_rows = group[group['DATE'] > max_date]
+        window = group[(group['DATE'] > cutoff) & (group['DATE'] <= max_date)]
+        revised_count = 0
 
-                placeholders = ', '.join('?' for _ in keep_cols)
-                insert_stmt = f"INSERT INTO {TABLE_NAME} ({', '.join(keep_cols)}) VALUES ({placeholders})"
+        if not window.empty:
+            stored = _stored_hashes(cursor, station, cutoff)
+            stored_hash = window['DATE'].map(stored)
+            gaps = window[stored_hash.isna()]
+            revised = window[stored_hash.notna() & (stored_hash != window['ROW_HASH'])]
+            new_rows = pd.concat([gaps, new_rows])
+            _update_rows(cursor, revised)
+            _note_change(changes, station, revised['DATE'])
+            revised_count = len(revised)
 
-                cursor.executemany(insert_stmt, rows)
-                logger.info(f"Inserted {df.shape[0]} rows from {os.path.basename(csv_file)}")
+        _insert_rows(cursor, new_rows)
+        _note_change(changes, station, new_rows['DATE'])
+        counts['inserted'] += len(new_rows)
+        counts['updated'] += revised_count
+        counts['skipped'] += len(group) - len(new_rows) - revised_count
 
-            conn.commit()
-            logger.info(f"[DB] All data loaded into '{TABLE_NAME}' successfully.")
+    return counts
+
+def format_import_counts(counts: dict) -> str:
+    return f"inserted {counts['inserted']}, updated {counts['updated']}, skipped {counts['skipped']} rows"
 
-        return True, f"Successfully imported {df.shape[0]} rows."
+def import_df_to_db(df: pd.DataFrame, source_name: str = "DataFrame") -> tuple[bool, str]:
+    """
+    Import an already cleaned DataFrame (DATE parsed and filtered by clean_data) into SQLite DB.
+    Only rows newer than what is stored per station are inserted (see _upsert_frame).
+    Returns:
+        (success: bool, message: str)
+    """
+    if df is None or df.empty:
+        msg = f"No rows to import from {source_name}."
+        logger.info(msg)
+        return False, msg
+    return import_frames_to_db([df], source_name)
+
+def import_frames_to_db(frames, source_name: str = "DataFrame") -> tuple[bool, str]:
+    """
+    Import an iterable of cleaned DataFrames (e.g. streamed chunks) in one transaction: on any
+    error nothing is committed (no rows, data version or import_log). An error raised by
+    `frames` itself (e.g. a chunk that fails to parse) is re-raised after the rollback so the
+    caller can retry; import errors are returned.
+    Returns:
+        (success: bool, message: str)
+    """
+    frames = iter(frames)
+    from_frames = False
+    try:
+        os.makedirs(DB_DIR, exist_ok=True)
+        totals = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        changes = {}
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            cursor = conn.cursor()
+            ensure_schema(cursor)
+            while True:
+                from_frames = True
+                df = next(frames, None)
+                from_frames = False
+                if df is None:
+                    break
+                if df.empty:
+                    continue
+                counts = _upsert_frame(cursor, df, changes)
+                for key, value in counts.items():
+                    totals[key] += value
+            if changes:
+                bump_data_version(cursor, changes)
+                refresh_changed_normals(conn, changes)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        logger.info(f"[DB] {source_name}: {format_import_counts(totals)} in '{TABLE_NAME}'.")
+        return True, f"Import complete: {format_import_counts(totals)}."
     except Exception as e:
-        logger.error(f"Failed to import CSV to DB: {e}")
+        if from_frames:
+            logger.warning(f"Import of {source_name} rolled back: {e}")
+            raise
+        logger.error(f"Failed to import {source_name} to DB: {e}")
         return False, f"Import failed: {e}"
+
+def read_cleaned_csv(csv_file: str) -> pd.DataFrame:
+    """Read a cleaned CSV with DATE parsed and rows before MIN_START_DATE dropped."""
+    df = pd.read_csv(csv_file)
+    if 'DATE' in df.columns:
+        df['DATE'] = pd.to_datetime(df['DATE'], errors='coerce')
+        df = df[df['DATE'] >= pd.Timestamp(MIN_START_DATE)]
+        logger.info(f"Filtered {os.path.basename(csv_file)} to dates >= {MIN_START_DATE}. Remaining rows: {len(df)}")
+    return df
+
+def import_csv_to_db(csv_path: str = None) -> tuple[bool, str]:
+    """
+    Import a cleaned CSV file into SQLite DB; without csv_path the latest raw download is
+    cleaned first. Both go through import_frames_to_db.
+    Returns:
+        (success: bool, message: str)
+    """
+    if csv_path is not None:
+        return import_frames_to_db((read_cleaned_csv(path) for path in [csv_path]),
+                                   source_name=os.path.basename(csv_path))
+
+    latest = get_latest_csv_filename()
+    if not latest:
+        logger.info("No CSV files to import.")
+        return False, "No CSV files found."
+    df = clean_single_csv(os.path.join(RAW_DATA_DIR, latest))
+    if df is None:
+        return False, f"Failed to clean {latest}."
+    return import_df_to_db(df, source_name=latest)
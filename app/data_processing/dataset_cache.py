@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from app.data_processing.data_to_db import get_data_version
+from app.data_processing.dataset_index import sort_weather_frame
+from app.data_processing.schema import apply_compact_dtypes, frame_memory_mb
+from app.logger import logger
+from app.utils import DB_PATH, TABLE_NAME
+
+WEATHER_COLS = [
+    'TMIN', 'TAVG', 'TMAX', 'PRCP', 'SNOW', 'TSUN',
+    'ACMH', 'WSFG', 'RHAV', 'WT01', 'WT02', 'WT08', 'WT16'
+]
+LOAD_COLS = ['STATION', 'DATE', 'LATITUDE', 'LONGITUDE', 'ELEVATION', 'NAME'] + WEATHER_COLS
+
+
+def load_weather_frame(conn, table_name: str = TABLE_NAME, where: str = "", params=()) -> pd.DataFrame:
+    """Read weather rows (optionally filtered by a WHERE clause) with the compact dtype policy."""
+    query = f"SELECT {', '.join(LOAD_COLS)} FROM {table_name} {where}"
+    df = pd.read_sql_query(query, conn, params=params, parse_dates=['DATE'])
+    return apply_compact_dtypes(df, label=f"load {table_name}")
+
+def _changed_stations(conn, since_version: int, version: int) -> dict | None:
+    """
+    Earliest changed DATE per station for versions in (since_version, version], or None when
+    import_log does not cover every one of those versions (pruned, or written by other tools).
+    """
+    try:
+        rows = conn.execute(
+            "SELECT version, STATION, MIN(MIN_DATE) FROM import_log "
+            "WHERE version > ? AND version <= ? GROUP BY version, STATION",
+            (since_version, version)).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    if len({row[0] for row in rows}) != version - since_version:
+        return None
+    changes = {}
+    for _, station, min_date in rows:
+        changes[station] = min(changes.get(station, min_date), min_date)
+    return changes
+
+
+class DatasetCache:
+    """
+    In-memory copy of the weather table keyed by the DB data version (PRAGMA user_version,
+    bumped by the importer). A version change reloads only the changed station/date ranges
+    when import_log covers the gap, otherwise the whole table. Loads are single-flight and
+    the frame is kept sorted by (STATION, DATE).
+    """
+
+    def __init__(self, db_path: str = DB_PATH, table_name: str = TABLE_NAME):
+        self.db_path = db_path
+        self.table_name = table_name
+        self._lock = threading.Lock()
+        self._df = None
+        self._version = None
+        self.stats = {'version': None, 'rows': 0, 'memory_mb': 0.0, 'last_load': None,
+                      'last_load_seconds': 0.0, 'full_loads': 0, 'incremental_loads': 0, 'hits': 0}
+
+    def snapshot(self) -> tuple[int, pd.DataFrame]:
+        """Return (data version, frame); the frame must be treated as read-only."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            version = get_data_version(conn)
+            if self._df is not None and self._version == version:
+                self.stats['hits'] += 1
+                return self._version, self._df
+
+            with self._lock:
+                # Another request may have loaded this version while we waited
+                version = get_data_version(conn)
+                if self._df is None or self._version != version:
+                    self._load(conn, version)
+                return self._version, self._df
+        finally:
+            conn.close()
+
+    def get(self) -> pd.DataFrame:
+        return self.snapshot()[1]
+
+    def invalidate(self):
+        with self._lock:
+            self._df = None
+            self._version = None
+
+    def _load(self, conn, version: int):
+        start = time.perf_counter()
+        changes = None
+        if self._df is not None and self._version is not None and self._version < version:
+            changes = _changed_stations(conn, self._version, version)
+
+        if changes is None:
+            df = load_weather_frame(conn, self.table_name)
+            self.stats['full_loads'] += 1
+            mode = "full"
+        else:
+            df = self._apply_changes(conn, changes)
+            self.stats['incremental_loads'] += 1
+            mode = f"incremental ({len(changes)} stations)"
+        # Held sorted by (STATION, DATE) so dataset_index() can binary-search date windows
+        df = sort_weather_frame(df)
+
+        self._df, self._version = df, version
+        elapsed = time.perf_counter() - start
+        self.stats.update({
+            'version': version,
+            'rows': len(df),
+            'memory_mb': round(float(frame_memory_mb(df)), 2),
+            'last_load': mode,
+            'last_load_seconds': round(elapsed, 3),
+        })
+        logger.info(f"[DATASET] Loaded version {version} ({mode}): {len(df)} rows, "
+                    f"{self.stats['memory_mb']}MB in {elapsed:.2f}s")
+
+    def _apply_changes(self, conn, changes: dict) -> pd.DataFrame:
+        """Replace each changed station's rows from its earliest changed DATE onwards."""
+        df = self._df
+        stale = pd.Series(False, index=df.index)
+        stations = df['STATION'].astype(str)
+        for station, min_date in changes.items():
+            stale |= (stations == station) & (df['DATE'] >= pd.Timestamp(min_date))
+
+        clauses = " OR ".join("(STATION = ? AND DATE >= ?)" for _ in changes)
+        params = [value for item in changes.items() for value in item]
+        fresh = load_weather_frame(conn, self.table_name, where=f"WHERE {clauses}", params=params)
+
+        combined = pd.concat([df[~stale], fresh], ignore_index=True)
+        # Categories differ between the parts, so re-apply the dtype policy after concat
+        return apply_compact_dtypes(combined, label=f"reload {self.table_name}")
+
+
+weather_cache = DatasetCache()
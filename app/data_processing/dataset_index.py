@@ -0,0 +1,117 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.logger import logger
+
+# (dataset version, key column) -> DatasetIndex; only the latest dataset version is kept
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _key_codes(values: pd.Series) -> tuple[np.ndarray, list]:
+    """Integer codes per row (in order of first appearance) and the matching key values."""
+    codes, uniques = pd.factorize(values, sort=False, use_na_sentinel=False)
+    return codes, [str(value) for value in uniques]
+
+def sort_weather_frame(df: pd.DataFrame, key: str = 'STATION') -> pd.DataFrame:
+    """
+    Return df with each key's rows contiguous and ordered by DATE (RangeIndex).
+    Frames already laid out that way (e.g. NOAA exports) are returned unchanged.
+    """
+    codes, _ = _key_codes(df[key])
+    dates = df['DATE'].to_numpy(dtype='datetime64[ns]').view('int64')
+    same_key = np.diff(codes) == 0
+    contiguous = np.count_nonzero(~same_key) == len(np.unique(codes)) - 1 if len(codes) else True
+    if contiguous and not (same_key & (np.diff(dates) < 0)).any():
+        return df if isinstance(df.index, pd.RangeIndex) and df.index.start == 0 else df.reset_index(drop=True)
+    order = np.lexsort((dates, codes))
+    return df.take(order).reset_index(drop=True)
+
+
+class DatasetIndex:
+    """
+    Weather frame sorted by (key, DATE) with an offset table per key. A key's date window is
+    two binary searches and an iloc slice of the sorted frame, without scanning other rows.
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str = 'STATION'):
+        self.key = key
+        self.frame = sort_weather_frame(df, key)
+        codes, keys = _key_codes(self.frame[key])
+        bounds = np.r_[0, np.flatnonzero(np.diff(codes)) + 1, len(codes)]
+        self.offsets = {keys[codes[start]]: (int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])}
+        self._dates = self.frame['DATE'].to_numpy(dtype='datetime64[ns]')
+
+    def keys(self) -> list[str]:
+        return list(self.offsets)
+
+    def _bounds(self, start: int, stop: int, date_from=None, date_to=None) -> tuple[int, int]:
+        """Positions of rows within [date_from, date_to] (inclusive) inside [start, stop)."""
+        dates = self._dates[start:stop]
+        lo, hi = start, stop
+        if date_from is not None:
+            lo = start + int(np.searchsorted(dates, np.datetime64(pd.Timestamp(date_from)), 'left'))
+        if date_to is not None:
+            hi = start + int(np.searchsorted(dates, np.datetime64(pd.Timestamp(date_to)), 'right'))
+        return lo, max(lo, hi)
+
+    def rows(self, key=None, date_from=None, date_to=None) -> pd.DataFrame:
+        """
+        Rows of one key within [date_from, date_to]: a slice of the sorted frame, not a copy.
+        With key=None, rows of all keys: the frame itself without dates, a slice when the
+        window is one contiguous block (e.g. a single key), otherwise a gathered copy of the
+        per-key windows; use slices() to walk them without copying. Unknown keys give an
+        empty frame.
+        """
+        if key is not None:
+            if str(key) not in self.offsets:
+                return self.frame.iloc[0:0]
+            return self.frame.iloc[slice(*self._bounds(*self.offsets[str(key)], date_from, date_to))]
+        if date_from is None and date_to is None:
+            return self.frame
+        windows = [window for window in self._windows(date_from, date_to) if window[0] < window[1]]
+        if not windows:
+            return self.frame.iloc[0:0]
+        if all(prev[1] == window[0] for prev, window in zip(windows, windows[1:])):
+            return self.frame.iloc[windows[0][0]:windows[-1][1]]
+        positions = np.concatenate([np.arange(lo, hi) for lo, hi in windows])
+        return self.frame.take(positions)
+
+    def slices(self, date_from=None, date_to=None):
+        """Yield (key, rows within [date_from, date_to]) per key, each a slice of the sorted frame."""
+        for key, (lo, hi) in zip(self.offsets, self._windows(date_from, date_to)):
+            yield key, self.frame.iloc[lo:hi]
+
+    def _windows(self, date_from=None, date_to=None) -> list[tuple[int, int]]:
+        return [self._bounds(start, stop, date_from, date_to) for start, stop in self.offsets.values()]
+
+def dataset_index(df: pd.DataFrame, version=None, key: str = 'STATION') -> DatasetIndex:
+    """Index df by (key, DATE); with `version` (df is the full dataset) it is built once per version."""
+    if version is None:
+        return DatasetIndex(df, key)
+    index = _indexes.get((version, key))
+    if index is None:
+        with _indexes_lock:
+            if (version, key) not in _indexes:
+                for stale in [k for k in _indexes if k[0] != version]:
+                    del _indexes[stale]
+                _indexes[(version, key)] = DatasetIndex(df, key)
+                logger.info(f"[INDEX] Indexed version {version} by {key}: {len(_indexes[(version, key)].offsets)} keys")
+            index = _indexes[(version, key)]
+    return index
+
+def year_period_window(start=None, end=None) -> tuple:
+    """
+    Inclusive DATE bounds of the years whose 1 January lies within [start, end], the rule used
+    for YEAR_PERIOD filters, so the window can be found on the DATE index.
+    """
+    date_from = date_to = None
+    if start is not None:
+        start = pd.Timestamp(start)
+        first_year = start.year if start == pd.Timestamp(start.year, 1, 1) else start.year + 1
+        date_from = pd.Timestamp(first_year, 1, 1)
+    if end is not None:
+        date_to = pd.Timestamp(pd.Timestamp(end).year + 1, 1, 1) - pd.Timedelta(1, 'ns')
+    return date_from, date_to
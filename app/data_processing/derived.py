@@ -0,0 +1,128 @@
+import threading
+
+import pandas as pd
+
+from app.logger import logger
+
+# Registry of derived metrics: name -> {'units', 'label', 'inputs', 'func'}.
+# Each metric is declared once, evaluated vectorized on first use and cached per dataset version.
+DERIVED_METRICS = {}
+
+# (dataset version, metric name) -> full-length Series for the frame that version identifies
+_metric_cache = {}
+# (dataset version, metric names) -> (source frame, frame with the metrics added), so repeated
+# with_metrics calls on the cached dataset do not copy it again
+_frame_cache = {}
+# Dash serves callbacks from several threads; both caches are read and pruned under this lock
+_cache_lock = threading.Lock()
+
+MM_TO_INCH = 0.03937
+# Columns that get a 0/1 "<col>_flag" event metric
+EVENT_FLAG_COLS = ['WT01', 'WT02', 'WT08', 'WT16', 'WSFG', 'SNOW', 'PRCP']
+
+
+def register_metric(name: str, units: str, label: str, inputs: list[str]):
+    """Decorator declaring a derived metric computed from `inputs` (raw or derived columns)."""
+    def decorator(func):
+        DERIVED_METRICS[name] = {'units': units, 'label': label, 'inputs': inputs, 'func': func}
+        return func
+    return decorator
+
+def _occurred(series: pd.Series) -> pd.Series:
+    """0/1 int8 event indicator: 1 where value > 0, missing counts as 0."""
+    return series.gt(0).fillna(False).astype('int8')
+
+
+@register_metric('PRCP_IN', units='in', label='Precipitation (inches)', inputs=['PRCP'])
+def _prcp_inches(df):
+    # PRCP = Precipitation (tenths of mm)
+    return df['PRCP'] / 10 * MM_TO_INCH
+
+@register_metric('YEAR', units='year', label='Year', inputs=['DATE'])
+def _year(df):
+    return df['DATE'].dt.year
+
+@register_metric('YEAR_PERIOD', units='year', label='Year', inputs=['DATE'])
+def _year_period(df):
+    return df['DATE'].dt.to_period('Y')
+
+@register_metric('Rain', units='0/1', label='Rain occurred', inputs=['WT16'])
+def _rain(df):
+    return _occurred(df['WT16'])
+
+@register_metric('Snow', units='0/1', label='Snowfall occurred', inputs=['SNOW'])
+def _snow(df):
+    return _occurred(df['SNOW'])
+
+@register_metric('Smoke', units='0/1', label='Smoke or haze occurred', inputs=['WT08'])
+def _smoke(df):
+    return _occurred(df['WT08'])
+
+for _col in EVENT_FLAG_COLS:
+    register_metric(f"{_col}_flag", units='0/1', label=f"{_col} occurred", inputs=[_col])(
+        lambda df, col=_col: _occurred(df[col]))
+
+
+def metric_label(name: str) -> str:
+    return DERIVED_METRICS[name]['label'] if name in DERIVED_METRICS else name
+
+def metric_units(name: str) -> str | None:
+    return DERIVED_METRICS[name]['units'] if name in DERIVED_METRICS else None
+
+def _evaluate(df: pd.DataFrame, name: str, version, computed: dict) -> pd.Series:
+    if name in computed:
+        return computed[name]
+    key = (version, name)
+    with _cache_lock:
+        series = _metric_cache.get(key) if version is not None else None
+    if series is None:
+        spec = DERIVED_METRICS[name]
+        # Inputs may be derived metrics themselves; evaluate those first
+        missing = [col for col in spec['inputs'] if col not in df.columns]
+        if missing:
+            inputs = {col: _evaluate(df, col, version, computed) for col in missing
+                      if col in DERIVED_METRICS}
+            source = df.assign(**inputs)
+        else:
+            source = df
+        series = spec['func'](source)
+        if version is not None:
+            with _cache_lock:
+                _metric_cache[key] = series
+    computed[name] = series
+    return series
+
+def with_metrics(df: pd.DataFrame, names: list[str], version=None) -> pd.DataFrame:
+    """
+    Return df with the requested derived metrics added as columns.
+    Metrics already present as columns are left alone; unknown names or metrics whose
+    inputs are absent are skipped. When `version` is given it must identify exactly this
+    frame (e.g. the full dataset loaded for a DB version) and results are cached under it,
+    including the returned frame, which callers must then treat as read-only.
+    """
+    frame_key = (version, tuple(names))
+    if version is not None:
+        with _cache_lock:
+            for cache in (_metric_cache, _frame_cache):
+                for key in [key for key in cache if key[0] != version]:
+                    del cache[key]
+            source, cached = _frame_cache.get(frame_key, (None, None))
+        if source is df:
+            return cached
+
+    computed = {}
+    for name in names:
+        if name in df.columns or name not in DERIVED_METRICS:
+            continue
+        spec = DERIVED_METRICS[name]
+        if not all(col in df.columns or col in DERIVED_METRICS for col in spec['inputs']):
+            logger.warning(f"[DERIVED] Skipping {name}: missing inputs {spec['inputs']}")
+            continue
+        _evaluate(df, name, version, computed)
+
+    added = {name: series for name, series in computed.items() if name in names}
+    result = df.assign(**added) if added else df
+    if version is not None:
+        with _cache_lock:
+            _frame_cache[frame_key] = (df, result)
+    return result
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Points kept per line trace sent to the browser (0 sends every point). The render mode is
+# chosen from the points kept, see render_mode.WEBGL_POINT_THRESHOLD
+LINE_POINT_BUDGET = int(os.getenv('LINE_POINT_BUDGET', '2000'))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of n_out points of (x, y) (x ascending, no NaN)
+    that keep the visual shape of the line. First and last points are always kept; each
+    bucket in between keeps the point forming the largest triangle with the previously kept
+    point and the next bucket's average. Bucket bounds and averages are computed for all
+    buckets at once; only the (inherently sequential) choice of anchor runs per bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+    next_x = np.r_[(np.add.reduceat(x[:n - 1], starts) / counts)[1:], x[-1]]
+    next_y = np.r_[(np.add.reduceat(y[:n - 1], starts) / counts)[1:], y[-1]]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket, (start, stop) in enumerate(zip(starts, stops)):
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - next_x[bucket]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (next_y[bucket] - ay))
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+def downsample_series(dates, values, budget: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (dates, values) reduced to at most `budget` (LINE_POINT_BUDGET) points with LTTB. LTTB runs
+    on the present values; a NaN (dated at the first missing day) is kept between two kept points
+    that had missing values between them, so plotly still breaks the line at data gaps.
+    """
+    budget = LINE_POINT_BUDGET if budget is None else budget
+    dates = pd.to_datetime(np.asarray(dates)).to_numpy(dtype='datetime64[ns]')
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    if not budget or len(values) <= budget:
+        return dates, values
+    present = np.flatnonzero(~np.isnan(values))
+    # Positions in `present` followed by a gap; each kept pair spanning one gets a NaN break
+    gaps = np.flatnonzero(np.diff(present) > 1)
+    # Breaks are at most one per gap and one per kept pair, so this keeps the total within budget
+    n_out = max(budget - len(gaps), (budget + 1) // 2)
+    days = (dates[present] - dates[0]) / np.timedelta64(1, 'D')
+    keep = lttb_indices(days, values[present], n_out)
+    if not len(gaps) or len(keep) < 2:
+        return dates[present[keep]], values[present[keep]]
+    # First gap at or after each kept point, and whether it lies before the next kept point
+    first_gap = np.searchsorted(gaps, keep[:-1])
+    has_gap = first_gap < len(gaps)
+    has_gap[has_gap] = gaps[first_gap[has_gap]] < keep[1:][has_gap]
+    break_at = present[gaps[first_gap[has_gap]]] + 1
+    positions = np.sort(np.r_[present[keep], break_at])
+    return dates[positions], values[positions]
+
+def downsampled_points(points: int, budget: int | None = None) -> int:
+    """Points a line trace of `points` points keeps after downsampling."""
+    budget = LINE_POINT_BUDGET if budget is None else budget
+    return min(points, budget) if budget else points
+
+def downsample_line_traces(fig, budget: int | None = None):
+    """Downsample every line trace of fig over the budget in place; returns (points before, points after)."""
+    budget = LINE_POINT_BUDGET if budget is None else budget
+    before = after = 0
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl') or 'lines' not in (trace.mode or '') or trace.x is None:
+            continue
+        before += len(trace.x)
+        if budget and len(trace.x) > budget:
+            x, y = downsample_series(trace.x, trace.y, budget)
+            trace.update(x=x, y=y)
+        after += len(trace.x)
+    return before, after
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.logger import logger
+from app.utils import DB_PATH, TABLE_NAME
+
+NORMALS_TABLE = "climate_normals"
+NORMAL_COLS = ['TMAX', 'TMIN', 'TAVG', 'PRCP']
+NORMAL_STATS = ['MEAN', 'P10', 'P50', 'P90']
+# Climate normal period (WMO standard 30 years) and the day-of-year smoothing window
+NORMALS_START_YEAR = int(os.getenv('NORMALS_START_YEAR', '1991'))
+NORMALS_END_YEAR = int(os.getenv('NORMALS_END_YEAR', '2020'))
+NORMALS_SMOOTH_DAYS = 15
+# Days of year with fewer years of data than this get no normal
+NORMALS_MIN_YEARS = 10
+DAYS = 366
+
+normals_schema = f"""
+CREATE TABLE IF NOT EXISTS {NORMALS_TABLE} (
+    STATION TEXT, DOY INTEGER, PERIOD TEXT,
+    {', '.join(f'{col}_{stat} REAL' for col in NORMAL_COLS for stat in NORMAL_STATS + ['N'])},
+    PRIMARY KEY (STATION, DOY)
+)
+"""
+
+# Normals read per data version (only the latest is kept)
+_normals_cache = {}
+_normals_lock = threading.Lock()
+
+
+def normals_period() -> str:
+    return f"{NORMALS_START_YEAR}-{NORMALS_END_YEAR}"
+
+def day_of_year(dates: pd.Series) -> np.ndarray:
+    """Day 1-366 on a leap-year calendar: 29 February is always day 60, 1 March day 61."""
+    doy = dates.dt.dayofyear.to_numpy()
+    shift = (~dates.dt.is_leap_year.to_numpy()) & (dates.dt.month.to_numpy() > 2)
+    return doy + shift
+
+def _group_quantiles(groups: np.ndarray, values: np.ndarray, n_groups: int, quantiles: list[float]) -> np.ndarray:
+    """Linear-interpolated quantiles of values per integer group in one sort; NaN for empty groups."""
+    valid = ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    result = np.full((len(quantiles), n_groups), np.nan)
+    has_data = counts > 0
+    for row, q in enumerate(quantiles):
+        position = starts[has_data] + q * (counts[has_data] - 1)
+        low = np.floor(position).astype(int)
+        high = np.ceil(position).astype(int)
+        result[row, has_data] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return result
+
+def _smooth_days(values: np.ndarray, window: int = NORMALS_SMOOTH_DAYS) -> np.ndarray:
+    """Centered moving average along the (circular) day-of-year axis, ignoring NaN days."""
+    half = window // 2
+    padded = np.concatenate([values[:, values.shape[1] - half:], values, values[:, :half]], axis=1)
+    present = ~np.isnan(padded)
+    sums = np.cumsum(np.where(present, padded, 0.0), axis=1)
+    counts = np.cumsum(present, axis=1)
+    sums = np.concatenate([np.zeros((len(values), 1)), sums], axis=1)
+    counts = np.concatenate([np.zeros((len(values), 1)), counts], axis=1)
+    window_sums = sums[:, window:] - sums[:, :-window]
+    window_counts = counts[:, window:] - counts[:, :-window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+def compute_normals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Day-of-year normals per station over the normal period, vectorized over all stations:
+    mean and 10/50/90th percentiles of NORMAL_COLS per (STATION, DOY), smoothed over
+    NORMALS_SMOOTH_DAYS days, and the number of observations behind each raw day.
+    """
+    dates = pd.to_datetime(df['DATE'])
+    in_period = (dates.dt.year >= NORMALS_START_YEAR) & (dates.dt.year <= NORMALS_END_YEAR)
+    df, dates = df[in_period], dates[in_period]
+    codes, stations = pd.factorize(df['STATION'].astype(str))
+    groups = codes * DAYS + (day_of_year(dates) - 1)
+    n_groups = len(stations) * DAYS
+
+    result = {
+        'STATION': np.repeat(np.asarray(stations, dtype=object), DAYS),
+        'DOY': np.tile(np.arange(1, DAYS + 1), len(stations)),
+    }
+    for col in NORMAL_COLS:
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan) if col in df.columns else np.full(len(df), np.nan)
+        present = ~np.isnan(values)
+        counts = np.bincount(groups[present], minlength=n_groups)
+        sums = np.bincount(groups[present], weights=values[present], minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts >= NORMALS_MIN_YEARS, sums / counts, np.nan)
+        stats = {'MEAN': means}
+        for name, quantile in zip(NORMAL_STATS[1:], _group_quantiles(groups, values, n_groups, [0.1, 0.5, 0.9])):
+            stats[name] = np.where(counts >= NORMALS_MIN_YEARS, quantile, np.nan)
+        for name, stat in stats.items():
+            result[f"{col}_{name}"] = _smooth_days(stat.reshape(len(stations), DAYS)).ravel()
+        result[f"{col}_N"] = counts.astype('float64')
+    normals = pd.DataFrame(result)
+    normals['PERIOD'] = normals_period()
+    return normals
+
+def refresh_normals(conn, stations=None) -> int:
+    """
+    Recompute and store the normals of `stations` (all stations when None) from the weather
+    table, inside the caller's transaction. Returns the number of stations refreshed.
+    """
+    conn.execute(normals_schema)
+    columns = ', '.join(['STATION', 'DATE'] + NORMAL_COLS)
+    where = "WHERE DATE >= ? AND DATE <= ?"
+    params = [f"{NORMALS_START_YEAR}-01-01", f"{NORMALS_END_YEAR}-12-31"]
+    if stations is not None:
+        stations = list(stations)
+        if not stations:
+            return 0
+        where += f" AND STATION IN ({', '.join('?' for _ in stations)})"
+        params += stations
+        conn.execute(f"DELETE FROM {NORMALS_TABLE} WHERE STATION IN ({', '.join('?' for _ in stations)})", stations)
+    else:
+        conn.execute(f"DELETE FROM {NORMALS_TABLE}")
+
+    df = pd.read_sql_query(f"SELECT {columns} FROM {TABLE_NAME} {where}", conn, params=params)
+    if df.empty:
+        return 0
+    normals = compute_normals(df)
+    cols = list(normals.columns)
+    conn.executemany(f"INSERT INTO {NORMALS_TABLE} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+                     normals.astype(object).where(normals.notna(), None).itertuples(index=False, name=None))
+    refreshed = normals['STATION'].nunique()
+    logger.info(f"[NORMALS] Refreshed {normals_period()} normals for {refreshed} stations")
+    return refreshed
+
+def refresh_changed_normals(conn, changes: dict) -> int:
+    """
+    Refresh stations whose earliest changed DATE (from an import) falls before the period end.
+    A DB without normals yet gets them for every station, not only the imported ones.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (NORMALS_TABLE,)).fetchone()
+    if not exists:
+        return refresh_normals(conn)
+    period_end = f"{NORMALS_END_YEAR}-12-31"
+    return refresh_normals(conn, [station for station, min_date in changes.items() if min_date <= period_end])
+
+def load_normals(conn) -> pd.DataFrame:
+    """Stored normals; (re)built for all stations when missing or computed for another period."""
+    conn.execute(normals_schema)
+    periods = {row[0] for row in conn.execute(f"SELECT DISTINCT PERIOD FROM {NORMALS_TABLE}")}
+    if periods != {normals_period()}:
+        refresh_normals(conn)
+        conn.commit()
+    return pd.read_sql_query(f"SELECT * FROM {NORMALS_TABLE}", conn)
+
+def get_normals(version=None, db_path: str = DB_PATH) -> pd.DataFrame:
+    """Normals table, read once per data version."""
+    if version is not None and version in _normals_cache:
+        return _normals_cache[version]
+    with _normals_lock:
+        if version in _normals_cache:
+            return _normals_cache[version]
+        conn = sqlite3.connect(db_path)
+        try:
+            normals = load_normals(conn)
+        finally:
+            conn.close()
+        if version is not None:
+            _normals_cache.clear()
+            _normals_cache[version] = normals
+    return normals
+
+def add_anomalies(df: pd.DataFrame, normals: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """
+    Return df with {col}_ANOM (value minus the day's normal mean) and {col}_PCTL_BAND
+    (-1 below P10, 0 within, 1 above P90) looked up from the normals table, not from history.
+    """
+    lookup = normals.set_index(['STATION', 'DOY'])
+    keys = pd.MultiIndex.from_arrays([df['STATION'].astype(str).to_numpy(), day_of_year(df['DATE'])])
+    added = {}
+    for col in cols:
+        # float64: an empty normals table (no station data in the normals period) reads as object
+        day_normals = lookup[[f"{col}_MEAN", f"{col}_P10", f"{col}_P90"]].reindex(keys).astype('float64')
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        added[f"{col}_ANOM"] = values - day_normals[f"{col}_MEAN"].to_numpy()
+        band = np.where(values > day_normals[f"{col}_P90"].to_numpy(), 1,
+                        np.where(values < day_normals[f"{col}_P10"].to_numpy(), -1, 0))
+        added[f"{col}_PCTL_BAND"] = np.where(np.isnan(added[f"{col}_ANOM"]), np.nan, band)
+    return df.assign(**added)
+
+def yearly_anomaly_summary(df: pd.DataFrame, normals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per YEAR: mean daily temperature anomaly (TAVG, or the TMAX/TMIN anomaly mean where TAVG
+    is missing) and the percentage of days with TMAX above its P90 and TMIN below its P10.
+    """
+    cols = [col for col in ['TMAX', 'TMIN', 'TAVG'] if col in df.columns]
+    anomalies = add_anomalies(df[['STATION', 'DATE'] + cols], normals, cols)
+    empty = pd.Series(np.nan, index=anomalies.index)
+    temp_anom = anomalies.get('TAVG_ANOM', empty).fillna(
+        anomalies[[f"{col}_ANOM" for col in ['TMAX', 'TMIN'] if col in cols]].mean(axis=1))
+    tmax_band = anomalies.get('TMAX_PCTL_BAND', empty)
+    tmin_band = anomalies.get('TMIN_PCTL_BAND', empty)
+    summary = pd.DataFrame({
+        'YEAR': anomalies['DATE'].dt.year,
+        'TEMP_ANOM': temp_anom,
+        'HOT_DAYS': (tmax_band == 1).astype('float64').where(tmax_band.notna()) * 100,
+        'COLD_NIGHTS': (tmin_band == -1).astype('float64').where(tmin_band.notna()) * 100,
+    })
+    return summary.groupby('YEAR').mean().dropna(how='all')
@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import psutil
+
+from app.data_processing.data_cleaner import (
+    read_raw_csv, read_raw_csv_fast, clean_data, clean_data_fast, save_clean_data_to_csv,
+    raw_read_options, coerce_raw_text
+)
+from app.data_processing.data_to_db import import_df_to_db, import_frames_to_db
+from app.metrics import StageTimer, CleaningMetrics
+from app.utils import RAW_DATA_DIR, PROCESSED_DATA_DIR
+from app.logger import logger
+
+# Raw files above this size are cleaned in chunks instead of being loaded at once
+STREAMING_THRESHOLD_MB = float(os.getenv('STREAMING_THRESHOLD_MB', '64'))
+CLEAN_CHUNK_ROWS = int(os.getenv('CLEAN_CHUNK_ROWS', '50000'))
+
+# Single background writer: processed CSVs are a side output, never on the import path
+_processed_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="processed-writer")
+
+
+def _save_processed_copy(df, output_path):
+    try:
+        save_clean_data_to_csv(df, output_path)
+    except Exception as e:
+        logger.error(f"[PIPELINE] Failed to save processed copy {output_path}: {e}")
+
+
+def clean_and_import(filename: str, save_processed: bool = True) -> tuple[bool, str]:
+    """
+    Clean a raw CSV and insert the typed DataFrame straight into SQLite DB.
+    The processed CSV is written in the background when save_processed is True.
+    Returns:
+        (success: bool, message: str)
+    """
+    filename = os.path.basename(filename)
+    input_file_path = os.path.join(RAW_DATA_DIR, filename)
+    if os.path.getsize(input_file_path) > STREAMING_THRESHOLD_MB * 1024 * 1024:
+        return stream_clean(filename, write_csv=save_processed, import_db=True)
+
+    timer = StageTimer(f"clean_and_import {filename}")
+    metrics = CleaningMetrics(filename)
+    with timer.stage("read"):
+        df_raw = read_raw_csv_fast(input_file_path)
+        typed = df_raw is not None
+        if not typed:
+            df_raw = read_raw_csv(input_file_path)
+    with timer.stage("clean"):
+        df = clean_data_fast(df_raw, metrics) if typed else clean_data(df_raw, metrics)
+    metrics.log()
+    metrics.save()
+    if df.empty:
+        timer.log()
+        return False, f"No valid rows left after cleaning {filename}."
+
+    with timer.stage("insert"):
+        success, message = import_df_to_db(df, source_name=filename)
+
+    if save_processed:
+        # clean_data returns a fresh frame that is not touched afterwards, so no copy is needed
+        _processed_writer.submit(_save_processed_copy, df, os.path.join(PROCESSED_DATA_DIR, filename))
+
+    timer.log()
+    return success, f"{message} ({timer.summary()})"
+
+
+class _MemoryTracker:
+    """Track peak process RSS and the largest cleaned chunk while streaming."""
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.start_rss = self.process.memory_info().rss
+        self.peak_rss = self.start_rss
+        self.max_chunk_bytes = 0
+
+    def sample(self, chunk: pd.DataFrame):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        self.max_chunk_bytes = max(self.max_chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+
+    def summary(self) -> str:
+        mb = 1024 * 1024
+        return (f"peak_rss={self.peak_rss / mb:.0f}MB (+{(self.peak_rss - self.start_rss) / mb:.0f}MB), "
+                f"max_chunk={self.max_chunk_bytes / mb:.1f}MB")
+
+
+def _iter_clean_chunks(input_file_path: str, chunk_rows: int, typed: bool, stats: dict,
+                       memory: _MemoryTracker, metrics: CleaningMetrics):
+    """Yield cleaned chunks of a raw CSV. Every cleaning rule is row-local, so chunks are independent."""
+    options = raw_read_options(input_file_path, typed=typed)
+    with pd.read_csv(input_file_path, chunksize=chunk_rows, **options) as reader:
+        for chunk in reader:
+            if not typed:
+                chunk = coerce_raw_text(chunk, metrics)
+            stats['rows_in'] += len(chunk)
+            cleaned = clean_data_fast(chunk, metrics)
+            stats['rows_out'] += len(cleaned)
+            stats['chunks'] += 1
+            memory.sample(cleaned)
+            yield cleaned
+
+
+def _stream_pass(input_file_path, output_path, chunk_rows, typed, write_csv, import_db, memory):
+    stats = {'rows_in': 0, 'rows_out': 0, 'chunks': 0}
+    # Counters add up over chunks; a fresh collector per pass keeps a text retry from double counting
+    metrics = CleaningMetrics(os.path.basename(input_file_path))
+    tmp_path = f"{output_path}.tmp"
+    header_written = False
+
+    def chunks():
+        nonlocal header_written
+        for cleaned in _iter_clean_chunks(input_file_path, chunk_rows, typed, stats, memory, metrics):
+            if cleaned.empty:
+                continue
+            if write_csv:
+                cleaned.to_csv(tmp_path, mode='a' if header_written else 'w',
+                               header=not header_written, index=False)
+                header_written = True
+            yield cleaned
+
+    # A ValueError while reading (a non-numeric measurement) propagates out of the generator:
+    # import_frames_to_db rolls the whole import back and re-raises it
+    if import_db:
+        success, message = import_frames_to_db(chunks(), source_name=os.path.basename(input_file_path))
+    else:
+        for _ in chunks():
+            pass
+        success, message = True, "Cleaned without DB import."
+    metrics.log()
+    metrics.save()
+    if write_csv and header_written:
+        os.replace(tmp_path, output_path)
+    return success, message, stats
+
+
+def stream_clean(filename: str, chunk_rows: int = CLEAN_CHUNK_ROWS,
+                 write_csv: bool = True, import_db: bool = False) -> tuple[bool, str]:
+    """
+    Clean a large raw CSV in fixed-size chunks with the clean_data_fast rules, appending each
+    chunk to the processed CSV and/or the DB so memory stays bounded by the chunk size.
+    Returns:
+        (success: bool, message: str)
+    """
+    filename = os.path.basename(filename)
+    input_file_path = os.path.join(RAW_DATA_DIR, filename)
+    output_path = os.path.join(PROCESSED_DATA_DIR, filename)
+    timer = StageTimer(f"stream_clean {filename}")
+    memory = _MemoryTracker()
+
+    with timer.stage("stream"):
+        try:
+            success, message, stats = _stream_pass(
+                input_file_path, output_path, chunk_rows, True, write_csv, import_db, memory)
+        except ValueError as e:
+            # A measurement column is not numeric: restart reading text and coercing.
+            # The typed pass committed nothing (its import was rolled back).
+            logger.warning(f"[PIPELINE] Typed streaming failed for {filename}, retrying as text: {e}")
+            success, message, stats = _stream_pass(
+                input_file_path, output_path, chunk_rows, False, write_csv, import_db, memory)
+
+    timer.log()
+    logger.info(f"[PIPELINE] Streamed {filename}: {stats['rows_out']} of {stats['rows_in']} rows kept "
+                f"in {stats['chunks']} chunks of {chunk_rows}, {memory.summary()}")
+    return success, f"{message} ({stats['rows_out']} rows, {timer.summary()}, {memory.summary()})"
@@ -0,0 +1,48 @@
+import os
+import time
+
+import pandas as pd
+
+from app.data_processing.dataset_index import DatasetIndex
+from app.logger import logger
+
+# Coarser levels of the daily series: pandas period alias -> level name
+PYRAMID_LEVELS = {'W': 'weekly', 'M': 'monthly', 'Y': 'yearly'}
+PYRAMID_COLS = ['TMIN', 'TAVG', 'TMAX', 'PRCP', 'SNOW', 'TSUN', 'ACMH', 'WSFG', 'RHAV']
+# Plot width the level is chosen for: the coarsest level with at least one point per pixel
+CHART_WIDTH_PX = int(os.getenv('CHART_WIDTH_PX', '1200'))
+
+
+class SeriesPyramid:
+    """
+    Daily values and weekly, monthly and yearly means of every PYRAMID_COLS column per
+    station (NAME), each level indexed by (NAME, DATE) so a date window is a binary search.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        start = time.perf_counter()
+        cols = [col for col in PYRAMID_COLS if col in df.columns]
+        values = df[cols].apply(pd.to_numeric, errors='coerce')
+        dates = pd.to_datetime(df['DATE'])
+        self.daily = DatasetIndex(values.assign(NAME=df['NAME'].astype(str), DATE=dates), key='NAME')
+        self.levels = {}
+        for freq in PYRAMID_LEVELS:
+            keys = [df['NAME'].astype(str).rename('NAME'), dates.dt.to_period(freq).dt.start_time.rename('DATE')]
+            level = values.groupby(keys, sort=True).mean()
+            self.levels[freq] = DatasetIndex(level.reset_index(), key='NAME')
+        self.rows = len(df)
+        self.build_seconds = time.perf_counter() - start
+        sizes = ", ".join(f"{PYRAMID_LEVELS[freq]} {len(index.frame)}" for freq, index in self.levels.items())
+        logger.info(f"[PYRAMID] Built from {self.rows} daily rows in {self.build_seconds:.3f}s ({sizes})")
+
+    def window(self, station, date_from=None, date_to=None, pixels: int | None = None):
+        """
+        (level name, frame) of the coarsest level with at least `pixels` (CHART_WIDTH_PX) points
+        for station in [date_from, date_to], falling back to the daily rows.
+        """
+        pixels = CHART_WIDTH_PX if pixels is None else pixels
+        for freq in reversed(PYRAMID_LEVELS):
+            frame = self.levels[freq].rows(station, date_from, date_to)
+            if len(frame) >= pixels:
+                return PYRAMID_LEVELS[freq], frame
+        return 'daily', self.daily.rows(station, date_from, date_to)
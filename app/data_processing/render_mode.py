@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+
+from app.data_processing.pyramid import PYRAMID_LEVELS
+from app.logger import logger
+
+# Points above which charts use WebGL traces (scattergl) and daily bar series are binned.
+# Line charts count the points left after LTTB (downsample.LINE_POINT_BUDGET per trace), so
+# with the defaults they stay SVG; they reach WebGL only when budget x traces is over the
+# threshold or LINE_POINT_BUDGET=0. Scatter charts are not downsampled and count every point.
+WEBGL_POINT_THRESHOLD = int(os.getenv('WEBGL_POINT_THRESHOLD', '10000'))
+
+
+def trace_render_mode(points: int, threshold: int | None = None) -> str:
+    """plotly express render_mode for a chart of `points` points: 'webgl' above the threshold, else 'svg'."""
+    threshold = WEBGL_POINT_THRESHOLD if threshold is None else threshold
+    return 'webgl' if points > threshold else 'svg'
+
+def bin_bar_frame(df: pd.DataFrame, y: str, threshold: int | None = None) -> tuple[str, pd.DataFrame]:
+    """
+    (level name, frame) of a daily bar series: the rows themselves within the threshold,
+    else y summed per week, month or year (the finest level with no more bars than the
+    threshold). Plotly has no WebGL bar trace, so dense bars are reduced instead.
+    """
+    threshold = WEBGL_POINT_THRESHOLD if threshold is None else threshold
+    if len(df) <= threshold:
+        return 'daily', df
+    dates = pd.to_datetime(df['DATE'])
+    for freq, level in PYRAMID_LEVELS.items():
+        binned = (df[y].groupby(dates.dt.to_period(freq).dt.start_time.rename('DATE'), sort=True)
+                  .sum(min_count=1).reset_index())
+        if len(binned) <= threshold:
+            break
+    return level, binned
+
+def figure_points(fig) -> int:
+    return sum(len(trace.x) for trace in fig.data if trace.x is not None)
+
+def render_record(chart: str, mode: str, level: str, points: int, threshold: int | None = None) -> dict:
+    """{render_mode, level, points, threshold} of one render (mode is 'svg', 'webgl' or 'binned'), logged as [RENDER]."""
+    threshold = WEBGL_POINT_THRESHOLD if threshold is None else threshold
+    logger.info(f"[RENDER] {chart}: {points} {level} points drawn as {mode} (WebGL above {threshold})")
+    return {'render_mode': mode, 'level': level, 'points': points, 'threshold': threshold}
+
+def record_render_mode(fig, chart: str, mode: str, level: str = 'daily', threshold: int | None = None) -> dict:
+    """Store the render record of fig in its layout.meta."""
+    render = render_record(chart, mode, level, figure_points(fig), threshold)
+    fig.update_layout(meta=render)
+    return render
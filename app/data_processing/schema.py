@@ -0,0 +1,53 @@
+import pandas as pd
+
+from app.logger import logger
+
+# Shared in-memory dtype policy for every weather frame (cleaner output, DB loads, cache loads)
+CATEGORY_COLS = ['STATION', 'NAME', 'CITY_NAME']
+COORDINATE_COLS = ['LATITUDE', 'LONGITUDE', 'ELEVATION']
+FLAG_COLS = ['WT01', 'WT02', 'WT08', 'WT16']
+MEASUREMENT_COLS = ['TAVG', 'TMIN', 'TMAX', 'SNOW', 'ACMH', 'WSFG', 'PRCP', 'RHAV', 'TSUN']
+# DB bookkeeping columns that are never needed in memory
+DROP_COLS = ['id', 'ROW_HASH']
+
+COMPACT_DTYPES = {
+    **{col: 'category' for col in CATEGORY_COLS},
+    **{col: 'float64' for col in COORDINATE_COLS},  # 5-decimal coordinates do not fit float32
+    **{col: 'float32' for col in MEASUREMENT_COLS},
+    **{col: 'Int8' for col in FLAG_COLS},  # NOAA weather-type flags are 1 or missing
+}
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def apply_compact_dtypes(df: pd.DataFrame, label: str = "frame") -> pd.DataFrame:
+    """
+    Return df with COMPACT_DTYPES applied where columns exist, logging memory before and after:
+    categorical STATION/NAME, float32 measurements, nullable Int8 weather-type flags.
+    """
+    before_mb = frame_memory_mb(df)
+    df = df.drop(columns=[col for col in DROP_COLS if col in df.columns])
+
+    for col, dtype in COMPACT_DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == 'category':
+            df[col] = df[col].astype('category')
+        elif dtype == 'Int8':
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int8')
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+
+    logger.info(f"[MEMORY] {label}: {len(df)} rows, {before_mb:.1f}MB -> {frame_memory_mb(df):.1f}MB")
+    return df
+
+def to_records(df: pd.DataFrame) -> list[dict]:
+    """
+    df.to_dict('records') for the browser (DataTable, data-store): float32 measurements are
+    widened to float64 at their shortest decimal form, so 42.7 is sent as 42.7 and not as
+    42.70000076293945. The compact dtypes stay on the in-memory and cached frames only.
+    """
+    widened = {col: df[col].astype(str).astype('float64')
+               for col in MEASUREMENT_COLS if col in df.columns and df[col].dtype == 'float32'}
+    return df.assign(**widened).to_dict('records')
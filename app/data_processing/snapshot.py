@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from app.logger import logger
+from app.utils import BASE_DATA_DIR, DB_PATH
+
+SNAPSHOT_DIR = os.path.join(BASE_DATA_DIR, "cache", "snapshots")
+SNAPSHOTS_KEPT = 2
+
+
+def snapshot_name(version) -> str:
+    """Directory name for a dataset version; the DB inode separates rebuilt databases."""
+    db_id = os.stat(DB_PATH).st_ino if os.path.exists(DB_PATH) else 0
+    return f"v{version}-{db_id}"
+
+def write_snapshot(df: pd.DataFrame, version, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """
+    Write df column by column as .npy files that other processes can memory-map, and return
+    the snapshot path. Categories are stored as codes plus a JSON list, nullable integers as
+    data plus mask. Existing snapshots are reused; other versions are removed.
+    """
+    path = os.path.join(snapshot_dir, snapshot_name(version))
+    if os.path.exists(os.path.join(path, "columns.json")):
+        return path
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    columns = []
+    for index, col in enumerate(df.columns):
+        series = df[col]
+        entry = {'name': col, 'file': f"{index}"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry['kind'] = 'category'
+            entry['categories'] = [str(value) for value in series.cat.categories]
+            np.save(os.path.join(tmp_path, f"{index}.npy"), series.cat.codes.to_numpy())
+        elif isinstance(series.array, (pd.arrays.IntegerArray, pd.arrays.FloatingArray)):
+            entry['kind'] = 'masked'
+            entry['dtype'] = str(series.dtype)
+            np.save(os.path.join(tmp_path, f"{index}.npy"),
+                    series.array.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0))
+            np.save(os.path.join(tmp_path, f"{index}.mask.npy"), series.isna().to_numpy())
+        else:
+            entry['kind'] = 'array'
+            np.save(os.path.join(tmp_path, f"{index}.npy"), series.to_numpy())
+        columns.append(entry)
+    # columns.json is written last: its presence marks a complete snapshot
+    with open(os.path.join(tmp_path, "columns.json"), "w") as f:
+        json.dump({'version': version, 'rows': len(df), 'columns': columns}, f)
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process published the same snapshot first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    _prune_snapshots(snapshot_dir)
+    logger.info(f"[SNAPSHOT] Wrote version {version}: {len(df)} rows to {path}")
+    return path
+
+def _prune_snapshots(snapshot_dir: str, keep: int = SNAPSHOTS_KEPT):
+    """Delete all but the newest `keep` snapshots (tasks queued on the previous one still attach)."""
+    entries = [os.path.join(snapshot_dir, name) for name in os.listdir(snapshot_dir) if ".tmp-" not in name]
+    for stale in sorted(entries, key=os.path.getmtime)[:-keep]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+def attach_snapshot(path: str) -> pd.DataFrame:
+    """Rebuild a snapshot frame over read-only memory maps (numeric data is not copied)."""
+    with open(os.path.join(path, "columns.json")) as f:
+        meta = json.load(f)
+    data = {}
+    for entry in meta['columns']:
+        values = np.load(os.path.join(path, f"{entry['file']}.npy"), mmap_mode='r')
+        if entry['kind'] == 'category':
+            data[entry['name']] = pd.Categorical.from_codes(values, entry['categories'])
+        elif entry['kind'] == 'masked':
+            mask = np.load(os.path.join(path, f"{entry['file']}.mask.npy"), mmap_mode='r')
+            array_type = pd.api.types.pandas_dtype(entry['dtype']).construct_array_type()
+            data[entry['name']] = array_type(values, mask)
+        else:
+            data[entry['name']] = values
+    return pd.DataFrame(data, copy=False)
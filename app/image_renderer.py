@@ -0,0 +1,156 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import plotly.io as pio
+
+from .logger import logger
+
+# Chromium tabs kept open by the shared kaleido renderer (figures of a batch render concurrently)
+KALEIDO_WORKERS = int(os.getenv('KALEIDO_WORKERS', '2'))
+RENDER_TIMEOUT_SECONDS = float(os.getenv('RENDER_TIMEOUT_SECONDS', '30'))
+# plotly.js in 'html' renders: 'cdn' links it, 'inline' embeds it (~3.5MB per file, works offline)
+HTML_PLOTLYJS = os.getenv('HTML_PLOTLYJS', 'cdn')
+
+
+class PlotlyImageRenderer:
+    """
+    Long-lived kaleido instance on its own event-loop thread. Figures are rendered on warm
+    Chromium tabs instead of starting a browser per pio.to_image call. When kaleido cannot
+    start (e.g. Chrome missing) renders fall back to pio.to_image. The 'html' format is
+    interactive Plotly HTML and needs no browser.
+    """
+
+    def __init__(self, workers: int = KALEIDO_WORKERS, timeout: float = RENDER_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.timeout = timeout
+        self._loop = None
+        self._kaleido = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=500)
+        self.stats = {'renders': 0, 'failures': 0, 'timeouts': 0, 'fallback_renders': 0, 'status': 'stopped'}
+
+    def start(self) -> bool:
+        """Start the browser (idempotent). Returns False when kaleido is unavailable."""
+        with self._lock:
+            if self._kaleido is not None:
+                return True
+            if self.stats['status'] == 'unavailable':
+                return False
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="kaleido-renderer", daemon=True).start()
+            try:
+                import kaleido
+                instance = kaleido.Kaleido(n=self.workers, timeout=self.timeout)
+                asyncio.run_coroutine_threadsafe(instance.__aenter__(), loop).result(timeout=60)
+            except Exception as e:
+                loop.call_soon_threadsafe(loop.stop)
+                self.stats['status'] = 'unavailable'
+                logger.warning(f"[RENDER] Kaleido renderer unavailable, using pio.to_image per figure: {e}")
+                return False
+            self._loop, self._kaleido = loop, instance
+            self.stats['status'] = 'running'
+            logger.info(f"[RENDER] Kaleido renderer started with {self.workers} tabs")
+            return True
+
+    def stop(self):
+        with self._lock:
+            if self._kaleido is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._kaleido.__aexit__(None, None, None), self._loop).result(10)
+            except Exception as e:
+                logger.warning(f"[RENDER] Error while stopping kaleido: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop, self._kaleido = None, None
+            self.stats['status'] = 'stopped'
+
+    def _opts(self, fig, fmt: str) -> dict:
+        return {
+            'format': fmt,
+            'width': fig.layout.width or pio.defaults.default_width,
+            'height': fig.layout.height or pio.defaults.default_height,
+            'scale': pio.defaults.default_scale,
+        }
+
+    def render_many(self, figs: list, fmt: str = 'png') -> list:
+        """
+        Render figures to image bytes (png or svg) concurrently. Each entry is bytes, or the
+        exception raised for that figure (including TimeoutError after `timeout` seconds).
+        'html' returns interactive Plotly HTML pages.
+        """
+        if fmt == 'html':
+            return [self._html(fig) for fig in figs]
+        if not self.start():
+            return [self._fallback(fig, fmt) for fig in figs]
+
+        start = time.perf_counter()
+        futures = [asyncio.run_coroutine_threadsafe(self._kaleido.calc_fig(fig, self._opts(fig, fmt)), self._loop)
+                   for fig in figs]
+        results = []
+        for future in futures:
+            remaining = max(0.0, self.timeout - (time.perf_counter() - start))
+            try:
+                results.append(future.result(timeout=remaining))
+                self.stats['renders'] += 1
+            except FutureTimeoutError:
+                future.cancel()
+                self.stats['timeouts'] += 1
+                results.append(TimeoutError(f"render exceeded {self.timeout}s"))
+            except Exception as e:
+                self.stats['failures'] += 1
+                results.append(e)
+        self._record(time.perf_counter() - start, len(figs))
+        return results
+
+    def render(self, fig, fmt: str = 'png') -> bytes:
+        """Render one figure to image bytes, raising on failure or timeout."""
+        result = self.render_many([fig], fmt)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _html(self, fig):
+        try:
+            include = True if HTML_PLOTLYJS == 'inline' else HTML_PLOTLYJS
+            return fig.to_html(full_html=True, include_plotlyjs=include).encode('utf-8')
+        except Exception as e:
+            self.stats['failures'] += 1
+            return e
+
+    def _fallback(self, fig, fmt: str):
+        start = time.perf_counter()
+        try:
+            image = pio.to_image(fig, format=fmt)
+            self.stats['fallback_renders'] += 1
+            return image
+        except Exception as e:
+            self.stats['failures'] += 1
+            return e
+        finally:
+            self._record(time.perf_counter() - start, 1)
+
+    def _record(self, seconds: float, count: int):
+        self._latencies.append(seconds / max(count, 1))
+
+    def latency_summary(self) -> dict:
+        """Per-figure render latency over the most recent renders (seconds)."""
+        if not self._latencies:
+            return {'count': 0}
+        ordered = sorted(self._latencies)
+        return {
+            'count': len(ordered),
+            'p50': round(ordered[len(ordered) // 2], 3),
+            'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            'max': round(ordered[-1], 3),
+        }
+
+
+plotly_renderer = PlotlyImageRenderer()
+
+def start_renderer_in_background():
+    """Warm the kaleido browser at app boot without delaying startup."""
+    threading.Thread(target=plotly_renderer.start, name="kaleido-start", daemon=True).start()
@@ -9,6 +9,9 @@ def create_layout():
     return html.Div([
         dcc.Download(id='download-data'),
         dcc.Store(id='data-store'),
+        dcc.Store(id='data-meta'),
+        dcc.Store(id='session-id', storage_type='session'),
+        dcc.Store(id='chart-state'),
 
         html.H1('NOAA Weather Dashboard'),
         html.H4(
@@ -0,0 +1,98 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from .logger import logger
+from .utils import QUALITY_DIR
+
+
+class StageTimer:
+    """Collect wall-clock durations of named pipeline stages."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, stage_name: str):
+        """Time the enclosed block and store it under stage_name (seconds)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage_name] = self.stages.get(stage_name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def summary(self) -> str:
+        """Return a compact 'stage=0.12s ... total=0.40s' string."""
+        parts = [f"{stage}={seconds:.3f}s" for stage, seconds in self.stages.items()]
+        parts.append(f"total={self.total:.3f}s")
+        return " ".join(parts)
+
+    def log(self):
+        logger.info(f"[TIMING] {self.name}: {self.summary()}")
+
+
+class CleaningMetrics:
+    """
+    Data-quality counters for one cleaned file: rows in/out, drops by reason, coercions,
+    filled values and per-column nulls of the output. Emitted once as a compact JSON record.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.rows_in = 0
+        self.rows_out = 0
+        self.dropped = Counter()
+        self.coerced = Counter()
+        self.filled = Counter()
+        self.nulls = Counter()
+
+    def drop(self, reason: str, count: int):
+        if count:
+            self.dropped[reason] += int(count)
+
+    def coerce(self, column: str, count: int):
+        """Count values of column that were not numeric and became NaN."""
+        if count:
+            self.coerced[column] += int(count)
+
+    def fill(self, column: str, count: int):
+        if count:
+            self.filled[column] += int(count)
+
+    def finish(self, df):
+        """Record the output rows and their per-column null counts (one vectorized pass)."""
+        self.rows_out += len(df)
+        for column, count in df.isna().sum().items():
+            if count:
+                self.nulls[column] += int(count)
+
+    def to_record(self) -> dict:
+        return {
+            'source': self.source,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'dropped': dict(self.dropped),
+            'coerced': dict(self.coerced),
+            'filled': dict(self.filled),
+            'nulls': dict(self.nulls),
+        }
+
+    def log(self):
+        logger.info(f"[QUALITY] {json.dumps(self.to_record(), separators=(',', ':'))}")
+
+    def save(self, quality_dir: str = QUALITY_DIR) -> str:
+        """Store the record as <quality_dir>/<source>.json, replacing the previous run's record."""
+        os.makedirs(quality_dir, exist_ok=True)
+        path = os.path.join(quality_dir, f"{os.path.splitext(os.path.basename(self.source))[0]}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_record(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
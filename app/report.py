@@ -0,0 +1,222 @@
+"""
+Headless analysis report: render the dashboard's analysis charts in parallel and write
+PNG/SVG images or interactive Plotly HTML, one HTML page per chart and an index page,
+without starting Dash.
+
+Usage:
+    py -m app.report --from-year 1990 --to-year 2020 --formats png,svg,html
+    py -m app.report --stations USW00094728 "SEATTLE BOEING FIELD, WA US" --charts "Temp Boxplot"
+"""
+import argparse
+import base64
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from app.data_processing.batch_cleaner import available_cores
+from app.logger import logger
+from app.utils import BASE_DATA_DIR, chart_options
+
+REPORTS_DIR = os.path.join(BASE_DATA_DIR, "reports")
+REPORT_FORMATS = ['png', 'svg', 'html']
+
+# Per worker process: the attached snapshot (path, frame) and the station subset taken from it
+_attached = {}
+
+
+def chart_slug(chart: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", chart.lower()).strip("-")
+
+def _report_frame(snapshot_path: str, version, stations: list[str]):
+    """Attach the dataset snapshot once per worker; restrict it to `stations` when given."""
+    from app.data_processing.dataset_index import dataset_index
+    from app.data_processing.derived import with_metrics
+    from app.data_processing.snapshot import attach_snapshot
+
+    if _attached.get('path') != snapshot_path:
+        _attached.clear()
+        _attached.update(path=snapshot_path, df=with_metrics(attach_snapshot(snapshot_path), ['YEAR'], version=version))
+    df = _attached['df']
+    if not stations:
+        return version, df
+    # The subset is fixed per (version, stations), so that pair keys the version-keyed caches for it
+    subset_version = (version, tuple(stations))
+    if _attached.get('subset_version') != subset_version:
+        index = dataset_index(df, version=version)
+        _attached.update(subset_version=subset_version,
+                         subset=pd.concat([index.rows(station) for station in stations], ignore_index=True))
+    return subset_version, _attached['subset']
+
+def render_report_chart(snapshot_path: str, version, stations: list[str], chart: str, fmt: str,
+                        start_date, end_date, year) -> dict:
+    """Worker task: render one chart in one format. Returns the images (bytes) and timing."""
+    from app.callbacks.analysis import render_chart
+    from app.data_processing.data_analysis import image_format
+
+    start = time.perf_counter()
+    result = {'chart': chart, 'format': fmt, 'images': [], 'error': None}
+    try:
+        version, df = _report_frame(snapshot_path, version, stations)
+        image_format.set(fmt)
+        src = render_chart(chart, df, version, start_date, end_date, year)
+        sources = src if isinstance(src, list) else [src] if src else []
+        result['images'] = [base64.b64decode(item.split(",", 1)[1]) for item in sources]
+        if not result['images']:
+            result['error'] = "no image rendered (no data, or rendering failed: see log)"
+    except Exception as e:
+        result['error'] = " ".join(str(e).split()) or type(e).__name__
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def resolve_stations(df: pd.DataFrame, requested: list[str]) -> list[str]:
+    """Map station IDs or exact station names to STATION IDs."""
+    names = df[['STATION', 'NAME']].drop_duplicates().astype(str)
+    by_name = dict(zip(names['NAME'], names['STATION']))
+    stations = []
+    for item in requested:
+        if item in set(names['STATION']):
+            stations.append(item)
+        elif item in by_name:
+            stations.append(by_name[item])
+        else:
+            raise ValueError(f"Unknown station: {item}")
+    return stations
+
+def artifact_name(chart: str, fmt: str, index: int = 0) -> str:
+    suffix = f"-{index + 1}" if index else ""
+    # Interactive figures are HTML too, so they must not overwrite the chart page
+    return f"{chart_slug(chart)}{suffix}.{'plot.html' if fmt == 'html' else fmt}"
+
+def _write_chart_page(output_dir: str, chart: str, label: str, results: list[dict]) -> str:
+    """One HTML page per chart showing every rendered image or interactive figure; returns its file name."""
+    page = f"{chart_slug(chart)}.html"
+    parts = [f"<h1>{html.escape(label)}</h1>"]
+    for result in results:
+        if result['error']:
+            parts.append(f"<p>{result['format'].upper()}: {html.escape(result['error'])}</p>")
+        for path in result.get('files', []):
+            if result['format'] == 'html':
+                view = f'<iframe src="{path}" style="width:100%;height:560px;border:0"></iframe>'
+            else:
+                view = f'<img src="{path}" style="max-width:100%">'
+            parts.append(f'<p><a href="{path}">{path}</a></p>{view}')
+    with open(os.path.join(output_dir, page), "w", encoding="utf-8") as f:
+        f.write(f"<!doctype html><html><head><meta charset='utf-8'><title>{html.escape(label)}</title></head>"
+                f"<body>{''.join(parts)}<p><a href='index.html'>Back to index</a></p></body></html>")
+    return page
+
+def _write_index(output_dir: str, title: str, rows: list[tuple]):
+    body = "".join(
+        f"<tr><td><a href='{page}'>{html.escape(label)}</a></td><td>{html.escape(status)}</td><td>{seconds:.2f}</td></tr>"
+        for label, page, status, seconds in rows
+    )
+    with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(f"<!doctype html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title></head><body>"
+                f"<h1>{html.escape(title)}</h1><table><tr><th>Chart</th><th>Status</th><th>Seconds</th></tr>"
+                f"{body}</table></body></html>")
+
+def generate_report(output_dir: str, charts: list[str] | None = None, stations: list[str] | None = None,
+                    from_year: int | None = None, to_year: int | None = None, year: int | None = None,
+                    formats: list[str] | None = None, workers: int | None = None) -> dict:
+    """
+    Render `charts` (default: every chart in chart_options) for each format over a process pool
+    and write the images, per-chart HTML pages and index.html to output_dir.
+    Returns a summary with per-chart timings.
+    """
+    from app.data_processing.dataset_cache import weather_cache
+    from app.data_processing.snapshot import write_snapshot
+
+    start = time.perf_counter()
+    labels = {opt['value']: opt['label'] for opt in chart_options}
+    charts = charts or list(labels)
+    unknown = [chart for chart in charts if chart not in labels]
+    if unknown:
+        raise ValueError(f"Unknown charts: {unknown}; choose from {list(labels)}")
+    formats = formats or ['png']
+    bad_formats = [fmt for fmt in formats if fmt not in REPORT_FORMATS]
+    if bad_formats:
+        raise ValueError(f"Unsupported formats: {bad_formats}; choose from {REPORT_FORMATS}")
+
+    version, df = weather_cache.snapshot()
+    stations = resolve_stations(df, stations) if stations else []
+    start_date = end_date = None
+    if from_year or to_year:
+        start_date = f"{from_year or df['DATE'].min().year}-01-01"
+        end_date = f"{to_year or df['DATE'].max().year}-01-01"
+    year = year or from_year or int(df['DATE'].max().year)
+    snapshot_path = write_snapshot(df, version)
+
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(chart, fmt) for chart in charts for fmt in formats]
+    workers = max(1, min(workers or available_cores(), len(tasks)))
+    logger.info(f"[REPORT] Rendering {len(charts)} charts x {formats} with {workers} workers to {output_dir}")
+
+    results = {chart: [] for chart in charts}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_report_chart, snapshot_path, version, stations, chart, fmt,
+                               start_date, end_date, year) for chart, fmt in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            result['files'] = []
+            for index, image in enumerate(result.pop('images')):
+                name = artifact_name(result['chart'], result['format'], index)
+                with open(os.path.join(output_dir, name), "wb") as f:
+                    f.write(image)
+                result['files'].append(name)
+            results[result['chart']].append(result)
+
+    rows = []
+    summary = {'output_dir': output_dir, 'version': version, 'stations': stations, 'start_date': start_date,
+               'end_date': end_date, 'year': year, 'workers': workers, 'charts': {}}
+    for chart in charts:
+        chart_results = sorted(results[chart], key=lambda item: formats.index(item['format']))
+        page = _write_chart_page(output_dir, chart, labels[chart], chart_results)
+        errors = [f"{item['format']}: {item['error']}" for item in chart_results if item['error']]
+        seconds = sum(item['seconds'] for item in chart_results)
+        status = "; ".join(errors) if errors else "ok"
+        rows.append((labels[chart], page, status, seconds))
+        summary['charts'][chart] = {
+            'seconds': round(seconds, 3),
+            'files': [name for item in chart_results for name in item['files']],
+            'errors': errors,
+        }
+    _write_index(output_dir, f"Weather analysis report ({start_date or 'all'} - {end_date or 'all'})", rows)
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(output_dir, "report.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    logger.info(f"[REPORT] Finished in {summary['seconds']}s")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=None, help="output directory (default: data/reports/<timestamp>)")
+    parser.add_argument("--charts", nargs="+", default=None, help="chart values from chart_options (default: all)")
+    parser.add_argument("--stations", nargs="+", default=None, help="station IDs or names (default: all)")
+    parser.add_argument("--from-year", type=int, default=None, help="first year of the analysis period")
+    parser.add_argument("--to-year", type=int, default=None, help="last year of the analysis period")
+    parser.add_argument("--year", type=int, default=None, help="year for the snowfall pie/bar (default: --from-year, else latest)")
+    parser.add_argument("--formats", default="png", help="comma separated formats: png, svg, html (interactive)")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: available cores)")
+    args = parser.parse_args()
+
+    output_dir = args.output or os.path.join(REPORTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    summary = generate_report(output_dir, args.charts, args.stations, args.from_year, args.to_year, args.year,
+                              [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()], args.workers)
+    print(f"{'chart':<24}{'seconds':>9}  result")
+    for chart, info in summary['charts'].items():
+        result = "; ".join(info['errors']) if info['errors'] else ", ".join(info['files'])
+        print(f"{chart:<24}{info['seconds']:>9.2f}  {result[:100]}")
+    print(f"Report written to {os.path.join(summary['output_dir'], 'index.html')} in {summary['seconds']}s "
+          f"with {summary['workers']} workers")
+    return 1 if any(info['errors'] for info in summary['charts'].values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
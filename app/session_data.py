@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+from .cache import read_cache_file
+from .data_processing.dataset_cache import WEATHER_COLS, load_weather_frame
+from .data_processing.dataset_index import DatasetIndex
+from .data_processing.pyramid import SeriesPyramid
+from .logger import logger
+from .utils import DB_PATH, TABLE_NAME
+
+# Browser sessions whose parsed dataset is kept server side (least recently used are dropped)
+SESSION_SLOTS = int(os.getenv('SESSION_SLOTS', '16'))
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+def dataset_key(df: pd.DataFrame) -> str:
+    """
+    Short id of a loaded dataset (row count and the NAME/DATE of its first and last rows),
+    stored in data-meta so a session slot is only used for the dataset it was built from.
+    """
+    if df.empty:
+        return "empty"
+    ends = df.iloc[[0, -1]][['NAME', 'DATE']].astype(str).to_numpy().ravel().tolist()
+    return hashlib.md5(repr([len(df)] + ends).encode()).hexdigest()[:16]
+
+def load_session_frame(meta: dict, db_path: str = DB_PATH, table_name: str = TABLE_NAME) -> pd.DataFrame:
+    """
+    Rows of the data-meta stations and date range, re-read from the fetch cache file the
+    dataset was loaded from (data-meta 'source'), or from the weather DB when that file is gone.
+    """
+    stations = meta.get('stations') or []
+    if not stations:
+        return pd.DataFrame(columns=['NAME', 'DATE'])
+    date_from, date_to = (pd.to_datetime(meta[col]) for col in ('min_date', 'max_date'))
+    source = meta.get('source')
+    if source and os.path.exists(source):
+        # Same steps as update_dashboard: rows with DATE and NAME in the fetched date range
+        df = read_cache_file(source).dropna(subset=['DATE', 'NAME'])
+        dates = pd.to_datetime(df['DATE'], errors='coerce')
+        return df[df['NAME'].astype(str).isin(stations) & (dates >= date_from) & (dates <= date_to)]
+    where = (f"WHERE NAME IN ({', '.join('?' for _ in stations)}) AND DATE >= ? AND DATE <= ? "
+             "ORDER BY NAME, DATE")
+    dates = [date.strftime('%Y-%m-%d') for date in (date_from, date_to)]
+    with sqlite3.connect(db_path) as conn:
+        return load_weather_frame(conn, table_name, where=where, params=[*stations, *dates])
+
+def typed_weather_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Store records (or a cleaned frame) with DATE as datetime, NAME as text and numeric measures."""
+    df = pd.DataFrame(df)
+    if 'DATE' not in df.columns and 'date' in df.columns:
+        df = df.rename(columns={'date': 'DATE'})
+    typed = {'DATE': pd.to_datetime(df['DATE']), 'NAME': df['NAME'].astype(str)}
+    for col in WEATHER_COLS:
+        if col in df.columns:
+            typed[col] = pd.to_numeric(df[col], errors='coerce')
+    return df.assign(**typed)
+
+
+class SessionDataset:
+    """One session's dataset: the typed frame indexed by station (NAME), its pyramid and metadata."""
+
+    def __init__(self, df: pd.DataFrame, key: str | None = None, source: str | None = None):
+        frame = typed_weather_frame(df)
+        self.key = key or dataset_key(frame)
+        self.index = DatasetIndex(frame, key='NAME')
+        self.pyramid = SeriesPyramid(self.index.frame)
+        stations = self.index.keys()
+        self.meta = {
+            'key': self.key,
+            'stations': stations,
+            'city': stations[0].split(',')[0] if stations else None,
+            'min_date': frame['DATE'].min(),
+            'max_date': frame['DATE'].max(),
+            # Fetch cache file the rows were read from, to reload them in another process
+            'source': source,
+        }
+
+
+class SessionDataStore:
+    """Parsed datasets by browser session id (LRU), so chart callbacks never receive the data-store."""
+
+    def __init__(self, size: int = SESSION_SLOTS, db_path: str = DB_PATH, table_name: str = TABLE_NAME):
+        self.size = size
+        self.db_path = db_path
+        self.table_name = table_name
+        self._slots = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'builds': 0}
+
+    def put(self, session_id: str, df: pd.DataFrame, key: str | None = None,
+            source: str | None = None) -> SessionDataset:
+        dataset = SessionDataset(df, key, source)
+        with self._lock:
+            self._slots[session_id] = dataset
+            self._slots.move_to_end(session_id)
+            while len(self._slots) > self.size:
+                self._slots.popitem(last=False)
+            self.stats['builds'] += 1
+        logger.info(f"[SESSION] Parsed dataset {dataset.key} for session {session_id}: "
+                    f"{len(dataset.index.frame)} rows, {len(dataset.meta['stations'])} stations")
+        return dataset
+
+    def get(self, session_id: str, key: str) -> SessionDataset | None:
+        """The session's dataset when it is the one described by data-meta `key`."""
+        with self._lock:
+            dataset = self._slots.get(session_id)
+            if dataset is None or dataset.key != key:
+                return None
+            self._slots.move_to_end(session_id)
+            self.stats['hits'] += 1
+            return dataset
+
+    def get_or_load(self, session_id: str, meta: dict) -> SessionDataset | None:
+        """
+        The session's dataset, reloaded (see load_session_frame) only when this process has no
+        slot for it (server restart, another worker, evicted session). None when the reloaded
+        rows are not the dataset data-meta describes.
+        """
+        dataset = self.get(session_id, meta['key'])
+        if dataset is None:
+            logger.info(f"[SESSION] No parsed dataset for session {session_id}; reloading it")
+            frame = typed_weather_frame(load_session_frame(meta, self.db_path, self.table_name))
+            key = dataset_key(frame)
+            if key != meta['key']:
+                logger.warning(f"[SESSION] Reloaded rows are dataset {key}, not {meta['key']}; fetch the data again")
+                return None
+            dataset = self.put(session_id, frame, key, meta.get('source'))
+        return dataset
+
+
+session_data = SessionDataStore()
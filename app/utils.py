@@ -28,9 +28,13 @@ else:
     BASE_DATA_DIR = os.path.join(PROJECT_ROOT, "data")
     DB_DIR = os.path.join(PROJECT_ROOT, "db")
     REPO_PROCESSED_DIR = None
+# Optional overrides, e.g. the benchmark suite runs against a scratch workspace
+BASE_DATA_DIR = os.getenv('NOAA_DATA_DIR', BASE_DATA_DIR)
+DB_DIR = os.getenv('NOAA_DB_DIR', DB_DIR)
 
 RAW_DATA_DIR = os.path.join(BASE_DATA_DIR, "raw")
 PROCESSED_DATA_DIR = os.path.join(BASE_DATA_DIR, "processed")
+QUALITY_DIR = os.path.join(BASE_DATA_DIR, "quality")
 LOGS_DIR = os.path.join(BASE_DATA_DIR if IS_RENDER else PROJECT_ROOT, "logs")
 
 DB_NAME = "noaa_weather.db"
@@ -40,6 +44,7 @@ TABLE_NAME = "weather_data"
 # Create folders if they don't exist
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+os.makedirs(QUALITY_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
 os.makedirs(DB_DIR, exist_ok=True)
 
@@ -169,6 +174,7 @@ chart_options = [
     {'label': 'Event Frequencies Fog, Smoke, Rain, Wind (Bar)', 'value': 'Weather Events'},
     {'label': 'Yearly Distributions Temp, Precip, Snow (Boxplot)', 'value': 'Yearly Distributions'},
     {'label': 'Correlation Heatmap', 'value': 'Correlation Heatmap'},
+    {'label': 'Temperature Anomalies vs Climate Normals (Bar)', 'value': 'Temp Anomalies'},
 ]
 
 # Helper Functions
@@ -0,0 +1,99 @@
+"""
+Load-test concurrent matplotlib chart rendering.
+
+Every analysis chart drawn with matplotlib is rendered once serially as a reference, then
+the same charts are rendered many times from a thread pool. Each concurrent result must be
+byte-identical to its reference: a chart drawing into (or closing) another thread's figure
+shows up as a mismatch or an exception.
+
+Needs the weather database (run the importer first).
+
+Usage:
+    py -m benchmarks.bench_chart_concurrency [--threads 8] [--renders 64]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('MIN_START_DATE', '1950-01-01')
+
+from app.data_processing.data_analysis import (
+    get_weather_snapshot, aggregate_weather_conditions, aggregate_by_station_and_time,
+    plot_max_temperature_trends, plot_snowfall_trends, plot_snowfall_pie, plot_snowfall_bar,
+    plot_temperature_boxplot, plot_weather_correlation_heatmap, plot_temperature,
+    plot_precipitation_and_snow, plot_weather_events,
+)
+
+HEATMAP_COLS = ['TMIN', 'TAVG', 'TMAX', 'PRCP', 'SNOW', 'TSUN', 'ACMH', 'WSFG', 'RHAV', 'WT01', 'WT08', 'WT16']
+
+
+def chart_jobs() -> dict:
+    """Chart name -> zero-argument render function, all built from the cached dataset."""
+    version, df = get_weather_snapshot(['YEAR', 'YEAR_PERIOD'])
+    df_agg = aggregate_weather_conditions(df, version=version)
+    df_st = aggregate_by_station_and_time(df, version=version)
+    stations = df_st['NAME'].unique()[:20]
+    station = stations[0]
+    year = int(df_agg['YEAR_PERIOD'].max().year) - 1
+    return {
+        'max_temp_trends': lambda: plot_max_temperature_trends(df_st, stations),
+        'snowfall_trends': lambda: plot_snowfall_trends(df_st, stations),
+        'snowfall_pie': lambda: plot_snowfall_pie(df_agg, year),
+        'snowfall_bar': lambda: plot_snowfall_bar(df_agg, year),
+        'temp_boxplot': lambda: plot_temperature_boxplot(df_agg),
+        'heatmap': lambda: plot_weather_correlation_heatmap(df, HEATMAP_COLS, df_agg=df_agg),
+        'station_temperature': lambda: plot_temperature(df_agg, station),
+        'station_precipitation': lambda: plot_precipitation_and_snow(df_agg, station),
+        'station_events': lambda: plot_weather_events(df_agg, station),
+    }
+
+
+def timed(name, job):
+    start = time.perf_counter()
+    try:
+        return name, job(), time.perf_counter() - start
+    except Exception as e:
+        return name, e, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="worker threads rendering at once")
+    parser.add_argument("--renders", type=int, default=64, help="total concurrent renders")
+    args = parser.parse_args()
+
+    jobs = chart_jobs()
+    start = time.perf_counter()
+    reference = {name: job() for name, job in jobs.items()}
+    serial_s = time.perf_counter() - start
+    names = list(jobs)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        futures = [pool.submit(timed, names[i % len(names)], jobs[names[i % len(names)]])
+                   for i in range(args.renders)]
+        results = [future.result() for future in futures]
+    concurrent_s = time.perf_counter() - start
+
+    errors = [(name, result) for name, result, _ in results if isinstance(result, Exception)]
+    mismatches = [name for name, result, _ in results
+                  if not isinstance(result, Exception) and result != reference[name]]
+    latencies = sorted(seconds for _, _, seconds in results)
+
+    print(f"charts: {len(names)}, serial pass: {serial_s:.2f}s ({serial_s / len(names):.3f}s/chart)")
+    print(f"{args.renders} renders on {args.threads} threads: {concurrent_s:.2f}s, "
+          f"{args.renders / concurrent_s:.1f} charts/s")
+    print(f"latency p50 {latencies[len(latencies) // 2]:.3f}s, "
+          f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.3f}s, max {latencies[-1]:.3f}s")
+    print(f"errors: {len(errors)}, mismatches vs serial: {len(mismatches)}")
+    for name, error in errors[:5]:
+        print(f"  {name}: {error!r}")
+    if mismatches:
+        print(f"  mismatched charts: {sorted(set(mismatches))}")
+    if errors or mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
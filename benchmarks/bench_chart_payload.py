@@ -0,0 +1,146 @@
+"""
+Payload size and callback time of the daily charts (update_charts) and of the zoom
+resampling callback, for one long synthetic station.
+
+Each data type is rendered in three modes:
+    full      every daily row (no pyramid level, no LTTB): the original behaviour
+    pyramid   the coarsest pyramid level with a point per pixel (CHART_WIDTH_PX)
+    lttb      pyramid level, then LTTB down to LINE_POINT_BUDGET points per line trace
+Payload is the JSON size of the figures Dash sends to the browser; the client-side draw
+time grows with the number of points, which is reported as well, together with the render
+mode each figure was drawn with (svg, webgl or binned, see WEBGL_POINT_THRESHOLD).
+
+A sequence of dashboard interactions (date-range changes and data-type switches) is then
+replayed twice: rebuilding both figures every time, and as the Patches update_charts sends
+when the graphs already show the station (chart-state).
+
+Usage:
+    py -m benchmarks.bench_chart_payload --years 75
+    py -m benchmarks.bench_chart_payload --years 75 --budget 1000 --width 800
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import dash
+import pandas as pd
+import plotly.io.json as pio_json
+
+from benchmarks.bench_suite import _CallbackCollector
+from benchmarks.synthetic import generate_dataset
+
+DATA_TYPES = ['TAVG', 'PRCP', 'ACMH', 'WT01']
+ZOOMS = [('10 years', 3650), ('1 year', 365), ('3 months', 90)]
+# (data type, days before the last date the range starts at; None for the whole station)
+INTERACTIONS = [('TAVG', None), ('TAVG', 3650), ('TAVG', 365), ('PRCP', 365), ('WT01', 365),
+                ('WT01', 90), ('TAVG', 90), ('TAVG', None), ('ACMH', None)]
+
+
+def figure_stats(*figs) -> tuple[int, int]:
+    """(JSON bytes, plotted points) of the figures or patches."""
+    payload = pio_json.to_json_plotly(list(figs))
+    points = 0
+    for fig in figs:
+        for trace in getattr(fig, 'data', ()):
+            points += len(trace.x) if trace.x is not None else 0
+    return len(payload.encode()), points
+
+def output_bytes(*outputs) -> int:
+    """JSON bytes of callback outputs as Dash sends them: figures, Patch operations, nothing for no_update."""
+    sent = [output.to_plotly_json() if isinstance(output, dash.Patch) else output
+            for output in outputs if output is not dash.no_update]
+    return len(pio_json.to_json_plotly(sent).encode())
+
+def timed(func, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=75, help="years of daily data for the station")
+    parser.add_argument("--budget", type=int, default=None, help="LTTB points per trace (default: LINE_POINT_BUDGET)")
+    parser.add_argument("--width", type=int, default=None, help="plot width in pixels (default: CHART_WIDTH_PX)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best time is kept")
+    args = parser.parse_args()
+    os.environ.setdefault('MIN_START_DATE', '1950-01-01')
+
+    from app.callbacks import visualization
+    from app.data_processing import downsample, pyramid
+    from app.data_processing.data_cleaner import clean_data, read_raw_csv
+    from app.logger import logger
+    from app.session_data import session_data
+    logger.setLevel(logging.WARNING)
+
+    budget = downsample.LINE_POINT_BUDGET if args.budget is None else args.budget
+    width = pyramid.CHART_WIDTH_PX if args.width is None else args.width
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path, = generate_dataset(tmp_dir, stations=1, years=args.years)
+        df = clean_data(read_raw_csv(path))
+    df['DATE'] = pd.to_datetime(df['DATE'])
+    records = df.assign(DATE=df['DATE'].dt.strftime('%Y-%m-%d')).astype(object)
+    records = records.where(records.notna(), None).to_dict('records')
+    station = str(df['NAME'].iloc[0])
+    start_date, end_date = str(df['DATE'].min().date()), str(df['DATE'].max().date())
+
+    collector = _CallbackCollector()
+    visualization.register_callbacks(collector)
+    update_charts = collector.callbacks['update_charts']
+    dataset = session_data.put("bench", records)
+    meta = dataset.meta
+    resample = collector.callbacks['resample_visible_range']
+    print(f"Station: {len(df)} daily rows ({start_date} - {end_date}), width {width}px, LTTB budget {budget}")
+
+    modes = {'full': (len(df) + 1, 0), 'pyramid': (width, 0), 'lttb': (width, budget)}
+    print(f"\n{'data type':<10}{'mode':<10}{'points':>10}{'payload KB':>12}{'callback s':>12}  render (weather / precip)")
+    for data_type in DATA_TYPES:
+        for mode, (pixels, mode_budget) in modes.items():
+            pyramid.CHART_WIDTH_PX, downsample.LINE_POINT_BUDGET = pixels, mode_budget
+            figs, seconds = timed(lambda: update_charts(station, start_date, end_date, data_type, meta, "bench"),
+                                   args.repeat)
+            figs = figs[:2]
+            size, points = figure_stats(*figs)
+            renders = " / ".join((fig.layout.meta or {}).get('render_mode', '-') for fig in figs)
+            print(f"{data_type:<10}{mode:<10}{points:>10}{size / 1024:>12.1f}{seconds:>12.3f}  {renders}")
+
+    pyramid.CHART_WIDTH_PX, downsample.LINE_POINT_BUDGET = width, budget
+    print("\nZoom resampling (TAVG, Patch of the visible range)")
+    print(f"{'zoom':<10}{'points':>10}{'payload KB':>12}{'callback s':>12}")
+    last = df['DATE'].max()
+    for label, days in ZOOMS:
+        relayout = {'xaxis.range[0]': str(last - pd.Timedelta(days, 'D')), 'xaxis.range[1]': str(last)}
+        patch, seconds = timed(lambda: resample(relayout, station, start_date, end_date, 'TAVG', meta, "bench"),
+                                 args.repeat)
+        payload = pio_json.to_json_plotly(patch.to_plotly_json())
+        operations = patch.to_plotly_json()['operations']
+        points = sum(len(op['params']['value']) for op in operations
+                     if op['location'][-1] == 'x' and op['location'][0] == 'data')
+        print(f"{label:<10}{points:>10}{len(payload.encode()) / 1024:>12.1f}{seconds:>12.3f}")
+
+    print("\nInteractions (update_charts): full figures vs patches")
+    print(f"{'data type':<10}{'range':<25}{'full KB':>10}{'full s':>9}{'patch KB':>10}{'patch s':>9}  sent")
+    totals = [0, 0.0, 0, 0.0]
+    shown = None
+    for data_type, days in INTERACTIONS:
+        start = start_date if days is None else str((last - pd.Timedelta(days, 'D')).date())
+        full, full_seconds = timed(lambda: update_charts(station, start, end_date, data_type, meta, "bench"),
+                                   args.repeat)
+        patched, patch_seconds = timed(lambda: update_charts(station, start, end_date, data_type, meta,
+                                                             "bench", shown), args.repeat)
+        shown = patched[2]
+        full_size, patch_size = output_bytes(*full[:2]), output_bytes(*patched[:2])
+        sent = " / ".join('no_update' if output is dash.no_update else type(output).__name__ for output in patched[:2])
+        totals = [total + value for total, value in zip(totals, [full_size, full_seconds, patch_size, patch_seconds])]
+        print(f"{data_type:<10}{start + ' - ' + end_date:<25}{full_size / 1024:>10.1f}{full_seconds:>9.3f}"
+              f"{patch_size / 1024:>10.1f}{patch_seconds:>9.3f}  {sent}")
+    print(f"{'total':<35}{totals[0] / 1024:>10.1f}{totals[1]:>9.3f}{totals[2] / 1024:>10.1f}{totals[3]:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
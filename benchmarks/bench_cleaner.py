@@ -0,0 +1,80 @@
+"""
+Benchmark the generic and typed cleaning paths on the bundled station files.
+
+The bundled files in data/processed are already clean, so each one is turned back into
+a raw-looking NOAA export first (quoted cells, padded NAME, '_ATTRIBUTES' columns).
+
+Usage:
+    py -m benchmarks.bench_cleaner [--repeat 3]
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+os.environ.setdefault('MIN_START_DATE', '1950-01-01')
+
+import numpy as np
+import pandas as pd
+
+from app.data_processing.data_cleaner import (
+    BASE_COLS, read_raw_csv, clean_data, read_raw_csv_fast, clean_data_fast
+)
+from app.utils import PROJECT_ROOT
+
+BUNDLED_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
+
+
+def make_raw_copy(processed_path: str, out_dir: str) -> str:
+    """Write a raw-looking NOAA CSV built from a processed file and return its path."""
+    df = pd.read_csv(processed_path, dtype=str, keep_default_na=False)
+    raw = {}
+    for col in df.columns:
+        raw[col] = df[col]
+        if col not in BASE_COLS:
+            raw[f"{col}_ATTRIBUTES"] = np.where(df[col] != '', ',,W,2400', '')
+    raw = pd.DataFrame(raw)
+    raw['NAME'] = ' ' + raw['NAME'] + ' '
+    raw_path = os.path.join(out_dir, os.path.basename(processed_path))
+    raw.to_csv(raw_path, index=False, quoting=1)
+    return raw_path
+
+
+def best_of(func, repeat: int) -> tuple[float, pd.DataFrame]:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per file, best time is reported")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(BUNDLED_DIR, "*.csv")))
+    print(f"{'file':<18}{'rows':>8}{'generic s':>12}{'typed s':>10}{'speedup':>9}  identical")
+    total_generic = total_typed = 0.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for processed_path in files:
+            raw_path = make_raw_copy(processed_path, tmp_dir)
+            generic_s, expected = best_of(lambda: clean_data(read_raw_csv(raw_path)), args.repeat)
+            typed_s, actual = best_of(lambda: clean_data_fast(read_raw_csv_fast(raw_path)), args.repeat)
+            try:
+                pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+                identical = "yes"
+            except AssertionError:
+                identical = "NO"
+            total_generic += generic_s
+            total_typed += typed_s
+            print(f"{os.path.basename(raw_path):<18}{len(actual):>8}{generic_s:>12.3f}{typed_s:>10.3f}"
+                  f"{generic_s / typed_s:>8.1f}x  {identical}")
+    print(f"{'total':<18}{'':>8}{total_generic:>12.3f}{total_typed:>10.3f}{total_generic / total_typed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Time every hot path on synthetic data and keep a JSON history compared against a baseline.
+
+A scratch workspace (data dir and SQLite DB) is created per run, filled with synthetic
+stations (see benchmarks/synthetic.py), then each step is timed:
+clean_data, import_csv_to_db, load_data_from_db, build_pyramid, each aggregate_* function,
+each chart in chart_options (cold, no version caches), the per-session parse of a station's
+records and update_charts for a few data types. Repeatable
+steps keep the best of --repeat runs; generation and the import run once.
+
+Every run is appended to the history file (benchmarks/results/, or BENCH_RESULTS_DIR). With a baseline recorded for the same scale,
+each step is printed with its ratio to the baseline and steps over --threshold are flagged.
+Per-row cost (us/row) makes scaling cliffs visible across --stations sizes.
+
+Usage:
+    py -m benchmarks.bench_suite --stations 10 --years 75
+    py -m benchmarks.bench_suite --stations 100 --save-baseline
+    py -m benchmarks.bench_suite --stations 1000 --skip-charts
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# History and baseline files (ignored by git: machine specific)
+RESULTS_DIR = os.getenv('BENCH_RESULTS_DIR', os.path.join(os.path.dirname(__file__), "results"))
+HISTORY_PATH = os.path.join(RESULTS_DIR, "history.json")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+UPDATE_CHART_TYPES = ['TAVG', 'PRCP', 'Snow', 'WT01']
+# Reported but never counted as a regression (benchmark setup, not app code)
+UNTRACKED_STEPS = {'generate'}
+
+
+class _CallbackCollector:
+    """Stand-in for the Dash app: register_callbacks() hands us the plain callback functions."""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def callback(self, *args, **kwargs):
+        def register(func):
+            self.callbacks[func.__name__] = func
+            return func
+        return register
+
+
+class StepTimer:
+    """Best-of-`repeat` wall time per step (stateful steps pass repeat=1)."""
+
+    def __init__(self, repeat: int = 1):
+        self.repeat = repeat
+        self.timings = {}
+        self.errors = {}
+
+    def run(self, step: str, func, repeat: int | None = None):
+        best = None
+        result = None
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            try:
+                result = func()
+            except Exception as e:
+                self.errors[step] = " ".join(str(e).split())[:200] or type(e).__name__
+                result = None
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            if step in self.errors:
+                break
+        self.timings[step] = round(best, 4)
+        status = f"ERROR {self.errors[step]}" if step in self.errors else ""
+        print(f"  {step:<40}{self.timings[step]:>10.3f}s  {status}", flush=True)
+        return result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(stations: int, years: int, workspace: str, skip_charts: bool = False, repeat: int = 3,
+              verbose: bool = False) -> dict:
+    """Generate data in workspace and time each step. App modules are imported here so the
+    NOAA_DATA_DIR/NOAA_DB_DIR overrides set by main() take effect."""
+    from benchmarks.synthetic import generate_dataset
+    from app.callbacks import visualization
+    from app.callbacks.analysis import render_chart
+    from app.data_processing.data_analysis import (
+        load_data_from_db, aggregate_by_station_and_time, aggregate_snowfall_by_station_and_time,
+        aggregate_weather_conditions,
+    )
+    from app.data_processing.data_cleaner import read_raw_csv, clean_data
+    from app.data_processing.data_to_db import import_csv_to_db
+    from app.data_processing.derived import with_metrics
+    from app.data_processing.pyramid import SeriesPyramid
+    from app.logger import logger
+    from app.session_data import session_data
+    from app.utils import DB_PATH, TABLE_NAME, chart_options
+
+    if not verbose:
+        logger.setLevel(logging.WARNING)
+    timer = StepTimer(repeat)
+    csv_dir = os.path.join(workspace, "synthetic")
+    paths = timer.run("generate", lambda: generate_dataset(csv_dir, stations, years), repeat=1)
+
+    frames = [read_raw_csv(path) for path in paths]
+    rows = sum(len(frame) for frame in frames)
+    timer.run("clean_data", lambda: [clean_data(frame) for frame in frames])
+    del frames
+
+    def import_all():
+        for path in paths:
+            ok, message = import_csv_to_db(path)
+            if not ok:
+                raise RuntimeError(message)
+    timer.run("import_csv_to_db", import_all, repeat=1)
+
+    df = timer.run("load_data_from_db", lambda: load_data_from_db(DB_PATH, TABLE_NAME))
+    if df is None:
+        return {'rows': rows, 'timings': timer.timings, 'errors': timer.errors}
+
+    # Ingest-time cost of the weekly/monthly/yearly levels behind the daily line charts
+    timer.run("build_pyramid", lambda: SeriesPyramid(df))
+    timer.run("aggregate_by_station_and_time", lambda: aggregate_by_station_and_time(df))
+    timer.run("aggregate_snowfall_by_station_and_time", lambda: aggregate_snowfall_by_station_and_time(df))
+    timer.run("aggregate_weather_conditions", lambda: aggregate_weather_conditions(df))
+
+    last_year = int(df['DATE'].max().year)
+    start_date, end_date = f"{last_year - 30}-01-01", f"{last_year}-01-01"
+    if not skip_charts:
+        df_charts = with_metrics(df, ['YEAR'])
+        for option in chart_options:
+            chart = option['value']
+            # version=None: no cube/index/metric caches, i.e. the cost of a cold request
+            timer.run(f"chart: {chart}",
+                      lambda: render_chart(chart, df_charts, None, start_date, end_date, last_year - 1))
+
+    collector = _CallbackCollector()
+    visualization.register_callbacks(collector)
+    update_charts = collector.callbacks['update_charts']
+    station_frame = df[df['STATION'] == df['STATION'].iloc[0]].copy()
+    station_frame['DATE'] = station_frame['DATE'].dt.strftime('%Y-%m-%d')
+    records = station_frame.astype(object).where(station_frame.notna(), None).to_dict('records')
+    station_name = str(station_frame['NAME'].iloc[0])
+    # Parsed once per fetched dataset (update_dashboard), then reused by every chart callback
+    dataset = timer.run("session_parse", lambda: session_data.put("bench", records))
+    for data_type in UPDATE_CHART_TYPES:
+        timer.run(f"update_charts: {data_type}",
+                  lambda: update_charts(station_name, start_date, f"{last_year}-12-31", data_type, dataset.meta,
+                                        "bench"))
+    return {'rows': rows, 'timings': timer.timings, 'errors': timer.errors}
+
+
+def load_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+def save_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def compare(record: dict, baseline: dict | None, threshold: float):
+    """Print each step with per-row cost and its ratio to the baseline; returns regressed steps."""
+    regressions = []
+    print(f"\n{'step':<42}{'seconds':>10}{'us/row':>10}{'baseline':>10}{'ratio':>8}")
+    for step, seconds in record['timings'].items():
+        per_row = seconds * 1e6 / record['rows'] if record['rows'] else 0.0
+        line = f"{step:<42}{seconds:>10.3f}{per_row:>10.2f}"
+        base = (baseline or {}).get('timings', {}).get(step)
+        if base:
+            ratio = seconds / base
+            flag = "  SLOWER" if ratio > threshold else "  faster" if ratio < 1 / threshold else ""
+            line += f"{base:>10.3f}{ratio:>7.2f}x{flag}"
+            if ratio > threshold and step not in UNTRACKED_STEPS:
+                regressions.append(step)
+        print(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=10, help="synthetic stations (10 to 1000)")
+    parser.add_argument("--years", type=int, default=75, help="years of daily data per station")
+    parser.add_argument("--skip-charts", action="store_true", help="skip chart rendering (large scales)")
+    parser.add_argument("--workspace", default=None, help="keep generated data/DB here (default: temp dir)")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON history file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="JSON baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="record this run as the baseline for its scale")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per repeatable step, best time is kept")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's INFO logging")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio to baseline flagged as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        workspace = args.workspace or tmp_dir
+        os.environ['NOAA_DATA_DIR'] = os.path.join(workspace, "data")
+        os.environ['NOAA_DB_DIR'] = os.path.join(workspace, "db")
+        os.environ.setdefault('MIN_START_DATE', '1950-01-01')
+        # Analysis charts render inline: the suite times the work, not the process pool
+        os.environ['ANALYSIS_WORKERS'] = '0'
+        if 'app.utils' in sys.modules:
+            raise RuntimeError("app was imported before the benchmark workspace was configured")
+
+        print(f"Benchmark: {args.stations} stations x {args.years} years in {workspace}")
+        result = run_suite(args.stations, args.years, workspace, args.skip_charts, args.repeat, args.verbose)
+
+    scale = f"{args.stations}x{args.years}"
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'scale': scale,
+        'stations': args.stations,
+        'years': args.years,
+        'python': sys.version.split()[0],
+        **result,
+    }
+    history = load_json(args.history, [])
+    history.append(record)
+    save_json(args.history, history)
+
+    baselines = load_json(args.baseline, {})
+    regressions = compare(record, baselines.get(scale), args.threshold)
+    if args.save_baseline:
+        baselines[scale] = record
+        save_json(args.baseline, baselines)
+        print(f"\nSaved baseline for {scale} to {args.baseline}")
+    elif scale not in baselines:
+        print(f"\nNo baseline for {scale}; run with --save-baseline to record one")
+    print(f"History: {len(history)} runs in {args.history}")
+    if result['errors']:
+        print(f"Errors in {len(result['errors'])} steps: {sorted(result['errors'])}")
+    if regressions:
+        print(f"Regressions over {args.threshold}x: {regressions}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
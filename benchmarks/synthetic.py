@@ -0,0 +1,103 @@
+"""
+Synthetic NOAA station CSVs for benchmarks, at any scale.
+
+Each synthetic station is built from one of the bundled station files in data/processed:
+every synthetic year copies a template year (mapped proportionally over the template's
+history, so columns that only exist in some eras keep their NaN pattern), with a
+per-station temperature offset, daily temperature noise and a precipitation scale.
+Columns, column order and value units match the template files.
+
+Usage:
+    py -m benchmarks.synthetic --stations 100 --years 75 --output /tmp/synthetic
+"""
+import argparse
+import calendar
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUNDLED_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
+TEMP_COLS = ['TMIN', 'TAVG', 'TMAX']
+AMOUNT_COLS = ['PRCP', 'SNOW']
+
+
+def load_templates(src_dir: str = BUNDLED_DIR) -> list[pd.DataFrame]:
+    """Bundled processed station files, DATE kept as text, with a YEAR helper column."""
+    templates = []
+    for path in sorted(glob.glob(os.path.join(src_dir, "*.csv"))):
+        df = pd.read_csv(path, dtype={'DATE': str})
+        df['YEAR'] = df['DATE'].str[:4].astype(int)
+        templates.append(df)
+    if not templates:
+        raise FileNotFoundError(f"No template CSVs in {src_dir}")
+    return templates
+
+def synthetic_station(template: pd.DataFrame, index: int, start_year: int, years: int,
+                      rng: np.random.Generator) -> pd.DataFrame:
+    """One synthetic station with `years` years of daily rows from start_year."""
+    counts = template['YEAR'].value_counts()
+    source_years = sorted(counts[counts >= 300].index)
+    by_year = dict(tuple(template.groupby('YEAR')))
+    jitter = int(rng.integers(-2, 3))
+
+    parts = []
+    for offset in range(years):
+        year = start_year + offset
+        position = int(offset * len(source_years) / years) + jitter
+        part = by_year[source_years[min(max(position, 0), len(source_years) - 1)]]
+        dates = str(year) + part['DATE'].str[4:]
+        if not calendar.isleap(year):
+            keep = ~dates.str.endswith("-02-29")
+            part, dates = part[keep], dates[keep]
+        parts.append(part.assign(DATE=dates.to_numpy()))
+    df = pd.concat(parts, ignore_index=True).drop(columns='YEAR')
+
+    name_suffix = str(template['NAME'].iloc[0]).rsplit(",", 1)[-1].strip()
+    df['STATION'] = f"SYN{index:08d}"
+    df['NAME'] = f"SYNTHETIC STATION {index:04d}, {name_suffix}"
+    df['LATITUDE'] = round(float(template['LATITUDE'].iloc[0]) + rng.uniform(-1, 1), 5)
+    df['LONGITUDE'] = round(float(template['LONGITUDE'].iloc[0]) + rng.uniform(-1, 1), 5)
+
+    # Same offset and daily noise for TMIN/TAVG/TMAX keeps them ordered
+    noise = rng.normal(0, 20) + rng.normal(0, 8, len(df))
+    for col in [col for col in TEMP_COLS if col in df.columns]:
+        df[col] = (df[col] + noise).round()
+    scale = rng.lognormal(0, 0.3)
+    for col in [col for col in AMOUNT_COLS if col in df.columns]:
+        df[col] = (df[col] * scale).round()
+    return df[[col for col in template.columns if col != 'YEAR']]
+
+def generate_dataset(output_dir: str, stations: int = 10, years: int = 75, start_year: int = 1950,
+                     seed: int = 0, templates: list[pd.DataFrame] | None = None) -> list[str]:
+    """Write `stations` synthetic station CSVs to output_dir and return their paths."""
+    templates = templates or load_templates()
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index in range(stations):
+        df = synthetic_station(templates[index % len(templates)], index, start_year, years, rng)
+        path = os.path.join(output_dir, f"SYN{index:08d}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=10, help="number of stations")
+    parser.add_argument("--years", type=int, default=75, help="years of daily data per station")
+    parser.add_argument("--start-year", type=int, default=1950)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="directory for the generated CSVs")
+    args = parser.parse_args()
+
+    paths = generate_dataset(args.output, args.stations, args.years, args.start_year, args.seed)
+    size_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+    print(f"Wrote {len(paths)} station files ({size_mb:.1f}MB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import os
-from app.dashboard import app
 
 if __name__ == '__main__':
+    # Imported here, not at module level: analysis pool workers are spawned processes that
+    # re-import this module, and must not build their own Dash app (DB bootstrap, callbacks)
+    from app.dashboard import app
+
     if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
         print("Running locally... at http://localhost:8050/")
     debug_mode=os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The app resolves its data and DB folders at import time: point them at a scratch workspace
+_WORKSPACE = tempfile.mkdtemp(prefix="noaa-tests-")
+os.environ.setdefault('RENDER', 'true')
+os.environ.setdefault('MIN_START_DATE', '1950-01-01')
+os.environ['NOAA_DATA_DIR'] = os.path.join(_WORKSPACE, "data")
+os.environ['NOAA_DB_DIR'] = os.path.join(_WORKSPACE, "db")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
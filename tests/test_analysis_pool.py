@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pandas as pd
+
+from app import analysis_pool
+from app.analysis_pool import AnalysisPool
+
+
+def sleep_task(snapshot_path, version, task, args):
+    """Stand-in for _run_task (importable by the spawned workers): sleeps args[0] seconds."""
+    time.sleep(args[0])
+    return args[0]
+
+def no_init():
+    pass
+
+
+def test_stuck_workers_are_recycled(monkeypatch):
+    monkeypatch.setattr(analysis_pool, '_run_task', sleep_task)
+    monkeypatch.setattr(analysis_pool, '_init_worker', no_init)
+    pool = AnalysisPool(workers=2, timeout=1)
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    errors = []
+
+    def render(seconds):
+        try:
+            return pool.render_chart(df, 1, seconds, None, None, None)
+        except Exception as e:
+            errors.append(type(e).__name__)
+
+    try:
+        assert render(0.1) == 0.1
+        threads = [threading.Thread(target=render, args=(60,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == ['TimeoutError', 'TimeoutError']
+        assert pool.stats['timeouts'] == 2 and pool.stats['recycled'] == 1
+
+        # The restarted workers take new charts at once
+        assert render(0.1) == 0.1
+        assert pool.stats['stuck'] == 0
+    finally:
+        pool.shutdown()
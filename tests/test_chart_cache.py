@@ -0,0 +1,64 @@
+import base64
+import os
+import threading
+import time
+
+from app.chart_cache import ChartImageCache
+
+PNG = "data:image/png;base64," + base64.b64encode(b"\x89PNG not really").decode()
+
+
+def test_concurrent_misses_render_once(tmp_path):
+    cache = ChartImageCache(str(tmp_path))
+    calls = []
+
+    def render():
+        calls.append(1)
+        time.sleep(0.3)
+        return PNG
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_render("chart", {'a': 1}, 1, render)))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(set(results)) == 1 and results[0].endswith(".png")
+    assert cache.stats['renders'] == 1
+
+def test_failed_render_is_raised_to_every_waiter(tmp_path):
+    cache = ChartImageCache(str(tmp_path))
+    started = threading.Event()
+
+    def render():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def request():
+        try:
+            cache.get_or_render("chart", {}, 1, render)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    first = threading.Thread(target=request)
+    first.start()
+    started.wait()
+    second = threading.Thread(target=request)
+    second.start()
+    first.join()
+    second.join()
+    assert errors == ["boom", "boom"]
+    assert cache.get_or_render("chart", {}, 1, lambda: PNG).endswith(".png")
+
+def test_multi_image_manifest_is_not_a_png(tmp_path):
+    cache = ChartImageCache(str(tmp_path))
+    urls = cache.get_or_render("chart", {}, 1, lambda: [PNG, PNG])
+    key = urls[0].rsplit("/", 1)[1].split("-")[0]
+    assert sorted(os.listdir(tmp_path)) == [f"{key}-0.png", f"{key}-1.png", f"{key}.json"]
+    assert cache.get(key) is None
+    assert ChartImageCache(str(tmp_path)).get_or_render("chart", {}, 1, lambda: None) == urls
@@ -0,0 +1,113 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data_processing import data_to_db
+from app.data_processing.data_to_db import IMPORT_LOOKBACK_DAYS, _row_hashes, _upsert_frame, ensure_schema
+from app.data_processing.schema import apply_compact_dtypes
+from app.utils import TABLE_NAME
+
+
+def station_frame(station: str = "S1", days: int = 60) -> pd.DataFrame:
+    dates = pd.date_range("2020-01-01", periods=days, freq="D")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'STATION': station, 'DATE': dates, 'NAME': f"{station} STATION, XX US",
+        'LATITUDE': 40.77898, 'LONGITUDE': -73.96925, 'ELEVATION': 42.7,
+        'TMIN': np.round(rng.normal(50, 30, days), 1), 'TMAX': np.round(rng.normal(150, 30, days), 1),
+        'PRCP': np.round(rng.gamma(0.5, 20, days), 2), 'WT16': np.where(np.arange(days) % 3 == 0, 1.0, np.nan),
+    })
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    ensure_schema(cursor)
+    yield cursor
+    conn.close()
+
+def stored(cursor, station: str = "S1") -> pd.DataFrame:
+    return pd.read_sql_query(f"SELECT DATE, TMAX FROM {TABLE_NAME} WHERE STATION = ? ORDER BY DATE",
+                             cursor.connection, params=(station,))
+
+
+def test_reimport_skips_every_row(cursor):
+    df = station_frame()
+    assert _upsert_frame(cursor, df) == {'inserted': 60, 'updated': 0, 'skipped': 0}
+    changes = {}
+    assert _upsert_frame(cursor, df, changes) == {'inserted': 0, 'updated': 0, 'skipped': 60}
+    assert changes == {}
+    assert len(stored(cursor)) == 60
+
+def test_revised_row_in_lookback_window_is_updated(cursor):
+    df = station_frame()
+    _upsert_frame(cursor, df)
+    revised = df.copy()
+    inside, outside = len(df) - 5, len(df) - IMPORT_LOOKBACK_DAYS - 5
+    revised.loc[inside, 'TMAX'] += 10
+    revised.loc[outside, 'TMAX'] += 10
+    changes = {}
+    assert _upsert_frame(cursor, revised, changes) == {'inserted': 0, 'updated': 1, 'skipped': 59}
+    rows = stored(cursor)
+    assert rows['TMAX'].iloc[inside] == pytest.approx(revised.loc[inside, 'TMAX'])
+    # Rows older than the look-back window are never rewritten
+    assert rows['TMAX'].iloc[outside] == pytest.approx(df.loc[outside, 'TMAX'])
+    assert changes == {'S1': revised.loc[inside, 'DATE'].strftime('%Y-%m-%d')}
+
+def test_gap_rows_are_inserted(cursor):
+    df = station_frame()
+    gap = df.index[-10:-7]
+    _upsert_frame(cursor, df.drop(index=gap))
+    counts = _upsert_frame(cursor, df)
+    assert counts == {'inserted': 3, 'updated': 0, 'skipped': 57}
+    assert stored(cursor)['DATE'].tolist() == df['DATE'].dt.strftime('%Y-%m-%d').tolist()
+
+def test_new_station_and_newer_rows_are_appended(cursor):
+    df = station_frame()
+    _upsert_frame(cursor, df.iloc[:40])
+    assert _upsert_frame(cursor, pd.concat([df, station_frame("S2", 5)])) == \
+        {'inserted': 25, 'updated': 0, 'skipped': 40}
+
+
+def test_row_hash_ignores_float32_noise():
+    df = station_frame()
+    compact = apply_compact_dtypes(df.copy())
+    assert compact['TMAX'].dtype == 'float32'
+    prepared = data_to_db._prepare_frame(df)
+    prepared_compact = data_to_db._prepare_frame(compact)
+    assert prepared['ROW_HASH'].tolist() == prepared_compact['ROW_HASH'].tolist()
+
+def test_row_hash_rounds_to_four_decimals():
+    df = data_to_db._prepare_frame(station_frame(days=2)).drop(columns='ROW_HASH')
+    noisy = df.assign(TMAX=df['TMAX'] + 0.00001)
+    changed = df.assign(TMAX=df['TMAX'] + 0.001)
+    assert _row_hashes(df).tolist() == _row_hashes(noisy).tolist()
+    assert (_row_hashes(df) != _row_hashes(changed)).all()
+
+def test_compact_reimport_skips_every_row(cursor):
+    df = station_frame()
+    _upsert_frame(cursor, df)
+    assert _upsert_frame(cursor, apply_compact_dtypes(df.copy()))['skipped'] == 60
+
+
+def test_csv_import_goes_through_the_incremental_path(tmp_path):
+    path = tmp_path / "CSVIMPORT.csv"
+    station_frame("CSVIMPORT").assign(DATE=lambda df: df['DATE'].dt.strftime('%Y-%m-%d')).to_csv(path, index=False)
+    assert data_to_db.import_csv_to_db(str(path)) == (True, "Import complete: inserted 60, updated 0, skipped 0 rows.")
+    assert data_to_db.import_csv_to_db(str(path)) == (True, "Import complete: inserted 0, updated 0, skipped 60 rows.")
+
+def test_failing_frame_source_rolls_the_whole_import_back():
+    def frames():
+        yield station_frame("ROLLBACK")
+        raise ValueError("could not convert string to float: 'T'")
+
+    with sqlite3.connect(data_to_db.DB_PATH) as conn:
+        version = data_to_db.get_data_version(conn)
+    with pytest.raises(ValueError):
+        data_to_db.import_frames_to_db(frames(), source_name="rollback")
+    with sqlite3.connect(data_to_db.DB_PATH) as conn:
+        assert data_to_db.get_data_version(conn) == version
+        assert conn.execute(f"SELECT COUNT(*) FROM {TABLE_NAME} WHERE STATION = 'ROLLBACK'").fetchone() == (0,)
+    assert data_to_db.import_frames_to_db([station_frame("ROLLBACK")], source_name="retry")[0]
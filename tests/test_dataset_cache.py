@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data_processing import dataset_cache
+from app.data_processing.data_to_db import _upsert_frame, bump_data_version, ensure_schema
+from app.data_processing.dataset_cache import DatasetCache
+from app.utils import TABLE_NAME
+
+
+def station_frame(station: str, start: str = "2020-01-01", days: int = 90, shift: float = 0.0) -> pd.DataFrame:
+    dates = pd.date_range(start, periods=days, freq="D")
+    rng = np.random.default_rng(len(station))
+    return pd.DataFrame({
+        'STATION': station, 'DATE': dates, 'NAME': f"{station} STATION, XX US",
+        'LATITUDE': 40.5, 'LONGITUDE': -73.5, 'ELEVATION': 10.0,
+        'TMIN': np.round(rng.normal(50, 30, days), 1) + shift, 'TMAX': np.round(rng.normal(150, 30, days), 1) + shift,
+        'PRCP': np.round(rng.gamma(0.5, 20, days), 1),
+    })
+
+def import_frames(db_path, frames):
+    """Upsert frames and bump the data version, as import_frames_to_db does."""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        ensure_schema(cursor)
+        changes = {}
+        for df in frames:
+            _upsert_frame(cursor, df, changes)
+        if changes:
+            bump_data_version(cursor, changes)
+        conn.commit()
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "weather.db")
+    import_frames(path, [station_frame("A"), station_frame("B"), station_frame("C", days=30)])
+    return path
+
+def comparable(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(**{col: df[col].astype(str) for col in ['STATION', 'NAME']}).reset_index(drop=True)
+
+
+def test_concurrent_gets_during_a_version_bump_load_once(db_path, monkeypatch):
+    cache = DatasetCache(db_path, TABLE_NAME)
+    cache.get()
+    import_frames(db_path, [station_frame("A", start="2020-03-31", days=10)])
+
+    loads = []
+    real_load = dataset_cache.load_weather_frame
+
+    def slow_load(*args, **kwargs):
+        loads.append(kwargs.get('where', ''))
+        time.sleep(0.2)  # keeps the other threads waiting on the reload
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(dataset_cache, 'load_weather_frame', slow_load)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def reader():
+        barrier.wait()
+        results.append(cache.snapshot())
+
+    threads = [threading.Thread(target=reader) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert cache.stats['incremental_loads'] == 1
+    assert len({version for version, _ in results}) == 1
+    assert len({id(df) for _, df in results}) == 1
+
+def test_incremental_reload_equals_full_reload(db_path):
+    cache = DatasetCache(db_path, TABLE_NAME)
+    cache.get()
+    revised = station_frame("B", shift=5.0).iloc[-10:]
+    import_frames(db_path, [station_frame("A", start="2020-03-31", days=20), revised, station_frame("D", days=15)])
+
+    incremental = cache.get()
+    assert cache.stats['last_load'].startswith("incremental")
+    full = DatasetCache(db_path, TABLE_NAME).get()
+    pd.testing.assert_frame_equal(comparable(incremental), comparable(full))
+
+def test_reload_is_full_when_import_log_does_not_cover_the_gap(db_path):
+    cache = DatasetCache(db_path, TABLE_NAME)
+    cache.get()
+    import_frames(db_path, [station_frame("A", start="2020-03-31", days=5)])
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM import_log")
+    cache.get()
+    assert cache.stats['full_loads'] == 2
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from app.callbacks import visualization
+from app.data_processing import downsample
+from app.data_processing.downsample import downsample_line_traces, downsample_series, lttb_indices
+from app.session_data import SessionDataStore
+from benchmarks.bench_suite import _CallbackCollector
+from tests.test_dataset_cache import station_frame
+
+
+def daily_series(days: int = 5000, seed: int = 0):
+    dates = pd.date_range("1990-01-01", periods=days, freq="D")
+    rng = np.random.default_rng(seed)
+    values = 50 + 20 * np.sin(np.arange(days) * 2 * np.pi / 365.25) + rng.normal(0, 5, days)
+    return dates, values
+
+def with_gaps(values, gaps):
+    values = values.copy()
+    for start, stop in gaps:
+        values[start:stop] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 3), (1000, 100), (5000, 2000), (101, 100)])
+def test_lttb_keeps_first_and_last_and_n_out_points(n, n_out):
+    x = np.arange(n, dtype='float64')
+    y = np.random.default_rng(n).normal(size=n)
+    keep = lttb_indices(x, y, n_out)
+    assert len(keep) == n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+def test_lttb_keeps_the_peak():
+    y = np.zeros(1000)
+    y[437] = 100.0
+    assert 437 in lttb_indices(np.arange(1000.0), y, 50)
+
+@pytest.mark.parametrize("budget", [3, 100, 1999])
+def test_downsample_series_within_budget_keeps_the_ends(budget):
+    dates, values = daily_series()
+    x, y = downsample_series(dates, values, budget)
+    assert len(x) == len(y) <= budget
+    assert (x[0], y[0]) == (dates[0].to_datetime64(), values[0])
+    assert (x[-1], y[-1]) == (dates[-1].to_datetime64(), values[-1])
+
+@pytest.mark.parametrize("budget", [0, 5000, 8000])
+def test_downsample_series_under_budget_is_unchanged(budget):
+    dates, values = daily_series()
+    values = with_gaps(values, [(100, 130)])
+    x, y = downsample_series(dates, values, budget)
+    np.testing.assert_array_equal(x, dates.to_numpy())
+    np.testing.assert_array_equal(y, values)
+
+@pytest.mark.parametrize("budget", [10, 200, 2000])
+def test_downsample_series_keeps_nan_gaps(budget):
+    dates, values = daily_series()
+    gaps = [(400, 460), (2000, 2001), (3000, 3365)]
+    values = with_gaps(values, gaps)
+    x, y = downsample_series(dates, values, budget)
+    assert len(x) <= budget
+    assert np.all(np.diff(x) > np.timedelta64(0))
+    # Every stretch of present values is a run of the source without a gap inside it
+    runs = np.split(np.arange(len(y)), np.flatnonzero(np.isnan(y)))
+    gap_days = [dates[start:stop].to_numpy() for start, stop in gaps]
+    for run in runs:
+        run = run[~np.isnan(y[run])]
+        if len(run) > 1:
+            for missing in gap_days:
+                assert not ((x[run[0]] < missing[0]) and (x[run[-1]] > missing[-1]))
+    # Each gap is marked by a NaN dated inside it
+    breaks = x[np.isnan(y)]
+    for missing in gap_days:
+        assert ((breaks >= missing[0]) & (breaks <= missing[-1])).any()
+
+def test_downsample_line_traces_skips_bars_and_short_lines():
+    dates, values = daily_series()
+    fig = go.Figure([go.Scatter(x=dates, y=values, mode='lines'), go.Bar(x=dates, y=values),
+                     go.Scatter(x=dates[:50], y=values[:50], mode='lines')])
+    before, after = downsample_line_traces(fig, 500)
+    assert (before, after) == (len(dates) + 50, 500 + 50)
+    assert len(fig.data[1].x) == len(dates)
+    assert len(fig.data[2].x) == 50
+
+
+@pytest.fixture
+def resample(monkeypatch):
+    frame = station_frame("A", start="1990-01-01", days=8000)
+    frame.loc[3000:3100, 'TMAX'] = np.nan
+    store = SessionDataStore()
+    dataset = store.put("session", frame)
+    monkeypatch.setattr(visualization, 'session_data', store)
+    monkeypatch.setattr(downsample, 'LINE_POINT_BUDGET', 300)
+    collector = _CallbackCollector()
+    visualization.register_callbacks(collector)
+    return collector.callbacks['resample_visible_range'], dataset
+
+def patched_traces(patch) -> dict:
+    return {tuple(op['location']): op['params']['value'] for op in patch.to_plotly_json()['operations']
+            if op['location'][0] == 'data'}
+
+@pytest.mark.parametrize("days", [365, 4000, 8000])
+def test_resample_visible_range_sends_the_window_within_budget(resample, days):
+    callback, dataset = resample
+    station = dataset.meta['stations'][0]
+    date_to = pd.Timestamp("1990-01-01") + pd.Timedelta(7999, 'D')
+    date_from = date_to - pd.Timedelta(days - 1, 'D')
+    relayout = {'xaxis.range[0]': str(date_from), 'xaxis.range[1]': str(date_to)}
+    traces = patched_traces(callback(relayout, station, None, None, 'TMAX', dataset.meta, "session"))
+    _, frame = dataset.pyramid.window(station, date_from, date_to)
+    for index, col in enumerate(visualization.line_chart_columns('TMAX', frame)):
+        x, y = traces[('data', index, 'x')], traces[('data', index, 'y')]
+        assert len(x) == len(y) <= 300
+        assert x[0] == str(frame['DATE'].iloc[0].date()) and x[-1] == str(frame['DATE'].iloc[-1].date())
+        if len(frame) <= 300:
+            np.testing.assert_array_equal(y, frame[col].to_numpy(dtype='float64'))
+        if days == 8000 and col == 'TMAX':
+            assert np.isnan(y).any()
+
+def test_resample_visible_range_ignores_other_relayouts(resample):
+    callback, dataset = resample
+    with pytest.raises(visualization.dash.exceptions.PreventUpdate):
+        callback({'yaxis.range[0]': 0}, dataset.meta['stations'][0], None, None, 'TMAX', dataset.meta, "session")
+
+
+@pytest.mark.parametrize("budget, mode, trace_type", [
+    (None, 'svg', 'scatter'),       # the default budget keeps line charts under the WebGL threshold
+    (0, 'webgl', 'scattergl'),      # LTTB off: every daily point is drawn
+    (6000, 'webgl', 'scattergl'),   # budget x traces over the threshold
+])
+def test_line_chart_render_mode_counts_the_points_left_after_lttb(monkeypatch, budget, mode, trace_type):
+    frame = station_frame("A", start="1990-01-01", days=8000)
+    store = SessionDataStore()
+    dataset = store.put("session", frame)
+    monkeypatch.setattr(visualization, 'session_data', store)
+    if budget is not None:
+        monkeypatch.setattr(downsample, 'LINE_POINT_BUDGET', budget)
+    collector = _CallbackCollector()
+    visualization.register_callbacks(collector)
+    station = dataset.meta['stations'][0]
+    fig, _, _ = collector.callbacks['update_charts'](
+        station, "1990-01-01", "2011-11-25", 'TMAX', dataset.meta, "session", None)
+    assert fig.layout.meta['level'] == 'daily'
+    assert fig.layout.meta['render_mode'] == mode
+    assert {trace.type for trace in fig.data} == {trace_type}
+    assert fig.layout.meta['points'] == sum(len(trace.x) for trace in fig.data)
@@ -0,0 +1,46 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from app.data_processing.data_analysis import plot_temperature_anomalies
+from app.data_processing.normals import (NORMAL_COLS, NORMAL_STATS, NORMALS_TABLE, add_anomalies, normals_schema,
+                                         yearly_anomaly_summary)
+from tests.test_dataset_cache import station_frame
+
+
+def temperature_frame(days: int = 800) -> pd.DataFrame:
+    frame = station_frame("A", start="2021-01-01", days=days)
+    return frame.assign(TAVG=(frame['TMIN'] + frame['TMAX']) / 2)
+
+def empty_normals() -> pd.DataFrame:
+    """The normals table as read back from SQLite when no station has data in the normals period."""
+    with sqlite3.connect(":memory:") as conn:
+        conn.execute(normals_schema)
+        return pd.read_sql_query(f"SELECT * FROM {NORMALS_TABLE}", conn)
+
+def flat_normals(mean: float) -> pd.DataFrame:
+    normals = pd.DataFrame({'STATION': "A", 'DOY': np.arange(1, 367)})
+    for col in NORMAL_COLS:
+        for stat, value in zip(NORMAL_STATS, [mean, mean - 50, mean, mean + 50]):
+            normals[f"{col}_{stat}"] = value
+    return normals
+
+
+def test_empty_normals_give_nan_anomalies():
+    df = temperature_frame()
+    anomalies = add_anomalies(df, empty_normals(), ['TMAX', 'TMIN'])
+    assert anomalies['TMAX_ANOM'].dtype == 'float64'
+    assert anomalies[['TMAX_ANOM', 'TMIN_ANOM', 'TMAX_PCTL_BAND', 'TMIN_PCTL_BAND']].isna().all().all()
+
+def test_empty_normals_give_no_anomaly_chart():
+    summary = yearly_anomaly_summary(temperature_frame(), empty_normals())
+    assert summary.empty
+    assert plot_temperature_anomalies(summary) is None
+
+def test_anomalies_against_normals():
+    df = temperature_frame(10)
+    anomalies = add_anomalies(df, flat_normals(100.0), ['TMAX'])
+    np.testing.assert_allclose(anomalies['TMAX_ANOM'], df['TMAX'] - 100.0)
+    expected = np.where(df['TMAX'] > 150, 1, np.where(df['TMAX'] < 50, -1, 0))
+    np.testing.assert_array_equal(anomalies['TMAX_PCTL_BAND'], expected)
@@ -0,0 +1,43 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.io.json as pio_json
+
+from app.data_processing.schema import MEASUREMENT_COLS, apply_compact_dtypes, to_records
+
+PROCESSED_CSV = os.path.join(os.path.dirname(__file__), "..", "data", "processed", "USW00094728.csv")
+CSV = """STATION,DATE,NAME,LATITUDE,TMIN,TMAX,TAVG,PRCP,SNOW,WSFG,RHAV
+S1,2020-01-01,"A, XX US",40.77898,-12.6,42.7,15.05,0.33,,3.1,87.0
+S1,2020-01-02,"A, XX US",40.77898,191.5,272.0,231.75,1234.5,25.4,,
+"""
+
+
+def store_round_trip(df: pd.DataFrame) -> pd.DataFrame:
+    """Records as the browser gets them from the data-store (Dash serializes with plotly's JSON encoder)."""
+    return pd.DataFrame(json.loads(pio_json.to_json_plotly(to_records(df))))
+
+def assert_measurements_equal(source: pd.DataFrame, stored: pd.DataFrame):
+    for col in MEASUREMENT_COLS:
+        if col in source.columns:
+            expected = source[col].to_numpy(dtype='float64', na_value=np.nan)
+            actual = pd.to_numeric(stored[col]).to_numpy(dtype='float64', na_value=np.nan)
+            np.testing.assert_array_equal(actual, expected, err_msg=col)
+
+
+def test_store_keeps_csv_values():
+    source = pd.read_csv(io.StringIO(CSV))
+    compact = apply_compact_dtypes(source)
+    assert compact['TMAX'].dtype == 'float32'
+    assert_measurements_equal(source, store_round_trip(compact))
+
+def test_store_keeps_station_file_values():
+    source = pd.read_csv(PROCESSED_CSV)
+    assert_measurements_equal(source, store_round_trip(apply_compact_dtypes(source)))
+
+def test_records_keep_the_frame_compact():
+    compact = apply_compact_dtypes(pd.read_csv(io.StringIO(CSV)))
+    assert to_records(compact)[0]['TMAX'] == 42.7
+    assert compact['TMAX'].dtype == 'float32'
@@ -0,0 +1,68 @@
+import json
+
+import pandas as pd
+import plotly.io.json as pio_json
+
+from app.session_data import SessionDataStore, SessionDataset
+from app.utils import TABLE_NAME
+from tests.test_dataset_cache import import_frames, station_frame
+
+
+def browser_meta(dataset: SessionDataset) -> dict:
+    """data-meta as the callbacks receive it back from the browser."""
+    return json.loads(pio_json.to_json_plotly(dataset.meta))
+
+
+def test_missing_slot_is_reloaded_from_the_db(tmp_path):
+    db_path = str(tmp_path / "weather.db")
+    frames = [station_frame("A", days=60), station_frame("B", days=60), station_frame("C", days=60)]
+    import_frames(db_path, frames)
+    fetched = SessionDataset(frames[0].iloc[10:50])
+    meta = browser_meta(fetched)
+
+    store = SessionDataStore(db_path=db_path, table_name=TABLE_NAME)
+    dataset = store.get_or_load("session", meta)
+
+    assert dataset.key == meta['key']
+    assert dataset.meta['stations'] == meta['stations']
+    assert list(dataset.index.frame['DATE']) == list(fetched.index.frame['DATE'])
+    assert store.get_or_load("session", meta) is dataset
+    assert store.stats == {'hits': 1, 'builds': 1}
+
+def test_missing_slot_without_db_rows_is_none(tmp_path):
+    db_path = str(tmp_path / "weather.db")
+    import_frames(db_path, [station_frame("A", days=10)])
+    meta = browser_meta(SessionDataset(station_frame("Z", days=10)))
+    assert SessionDataStore(db_path=db_path).get_or_load("session", meta) is None
+
+def test_missing_slot_is_reloaded_from_the_fetch_cache_file(tmp_path):
+    db_path = str(tmp_path / "weather.db")
+    import_frames(db_path, [station_frame("A", days=60)])
+    fetched = pd.concat([station_frame("X", days=90), station_frame("Y", days=90)], ignore_index=True)
+    source = str(tmp_path / "fetched.csv")
+    fetched.to_csv(source, index=False)
+    # update_dashboard keeps the rows of the selected date range
+    shown = fetched[fetched['DATE'].between("2020-01-10", "2020-03-05")]
+    meta = browser_meta(SessionDataset(shown, source=source))
+
+    dataset = SessionDataStore(db_path=db_path).get_or_load("session", meta)
+
+    assert dataset.key == meta['key']
+    assert dataset.meta['stations'] == meta['stations']
+    assert len(dataset.index.frame) == len(shown)
+
+def test_rows_that_are_not_the_fetched_dataset_are_not_rekeyed(tmp_path):
+    db_path = str(tmp_path / "weather.db")
+    # The DB holds the station, but not the rows that were fetched (a shorter range)
+    import_frames(db_path, [station_frame("A", days=30)])
+    meta = browser_meta(SessionDataset(station_frame("A", days=60)))
+    store = SessionDataStore(db_path=db_path)
+    assert store.get_or_load("session", meta) is None
+    assert store.stats['builds'] == 0
+
+def test_missing_fetch_cache_file_falls_back_to_matching_db_rows(tmp_path):
+    db_path = str(tmp_path / "weather.db")
+    frame = station_frame("A", days=60)
+    import_frames(db_path, [frame])
+    meta = browser_meta(SessionDataset(frame, source=str(tmp_path / "expired.csv")))
+    assert SessionDataStore(db_path=db_path).get_or_load("session", meta).key == meta['key']
@@ -0,0 +1,117 @@
+import base64
+import json
+import os
+
+import dash
+import numpy as np
+import pandas as pd
+import plotly.io.json as pio_json
+import pytest
+
+from app.callbacks import visualization
+from app.session_data import SessionDataStore
+from benchmarks.bench_suite import _CallbackCollector
+
+PROCESSED_CSV = os.path.join(os.path.dirname(__file__), "..", "data", "processed", "USW00094728.csv")
+
+
+def jsonify(value):
+    return json.loads(pio_json.to_json_plotly(value))
+
+def apply(figure: dict, output) -> dict:
+    """The figure the browser holds after receiving an update_charts output."""
+    if output is dash.no_update:
+        return figure
+    if not isinstance(output, dash.Patch):
+        return jsonify(output)
+    for operation in jsonify(output.to_plotly_json())['operations']:
+        *path, last = operation['location']
+        target = figure
+        for key in path:
+            target = target.setdefault(key, {}) if isinstance(target, dict) else target[key]
+        if operation['operation'] == 'Assign':
+            target[last] = operation['params']['value']
+        elif operation['operation'] == 'Delete':
+            target.pop(last, None)
+        else:
+            raise AssertionError(f"Unexpected patch operation {operation}")
+    return figure
+
+def array(value) -> np.ndarray:
+    """A JSON trace array: a list or a plotly typed array ({dtype, bdata})."""
+    if isinstance(value, dict):
+        return np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype']).astype('float64')
+    return np.asarray(value if value is not None else [], dtype='float64')
+
+def shown_points(figure: dict) -> list:
+    """(type, mode, name, dates, values) of each trace within the x range the figure displays."""
+    xaxis = figure['layout'].get('xaxis', {})
+    fixed = xaxis.get('autorange') is False and xaxis.get('range')
+    traces = []
+    for trace in figure['data']:
+        dates = pd.to_datetime(pd.Series(trace.get('x') or [], dtype=object).astype(str).str[:10])
+        values = array(trace.get('y'))
+        if fixed:
+            inside = (dates >= pd.to_datetime(xaxis['range'][0])) & (dates <= pd.to_datetime(xaxis['range'][1]))
+            dates, values = dates[inside], values[inside.to_numpy()]
+        traces.append((trace['type'], trace.get('mode'), trace.get('name'), list(dates), values))
+    return traces
+
+def assert_same_chart(patched: dict, rebuilt: dict):
+    for got, expected in zip(shown_points(patched), shown_points(rebuilt), strict=True):
+        assert got[:4] == expected[:4]
+        np.testing.assert_allclose(got[4], expected[4], equal_nan=True)
+    layout, expected = patched['layout'], rebuilt['layout']
+    assert layout['title']['text'] == expected['title']['text']
+    assert layout.get('uirevision') == expected.get('uirevision')
+    for key in ('render_mode', 'level'):
+        assert (layout.get('meta') or {}).get(key) == (expected.get('meta') or {}).get(key)
+
+
+@pytest.fixture(scope="module")
+def charts():
+    store = SessionDataStore()
+    dataset = store.put("session", pd.read_csv(PROCESSED_CSV, low_memory=False))
+    session_data, visualization.session_data = visualization.session_data, store
+    collector = _CallbackCollector()
+    visualization.register_callbacks(collector)
+    meta = jsonify(dataset.meta)
+    station = meta['stations'][0]
+
+    def update(data_type, start, end, shown=None):
+        np.random.seed(0)  # the fog chart jitters its markers
+        return collector.callbacks['update_charts'](station, start, end, data_type, meta, "session", shown)
+    yield update
+    visualization.session_data = session_data
+
+
+def replay(update, steps):
+    """Apply each step's outputs to the previous figures and compare them with a full rebuild."""
+    weather = precip = state = None
+    sent = []
+    for data_type, start, end in steps:
+        weather_out, precip_out, state = update(data_type, start, end, state)
+        sent.append((type(weather_out).__name__, 'no_update' if precip_out is dash.no_update else type(precip_out).__name__))
+        weather, precip = apply(weather, weather_out), apply(precip, precip_out)
+        full_weather, full_precip, full_state = update(data_type, start, end)
+        assert_same_chart(weather, jsonify(full_weather))
+        assert_same_chart(precip, jsonify(full_precip))
+        assert {**state, 'weather': None, 'precip': None} == {**full_state, 'weather': None, 'precip': None}
+    return sent
+
+
+@pytest.mark.parametrize("data_type, ranges", [
+    ('TAVG', [('1950-01-01', '2024-12-31'), ('2010-01-01', '2024-12-31'), ('2024-01-01', '2024-12-31')]),
+    ('WT16', [('2005-01-01', '2010-12-31'), ('2008-03-01', '2008-06-30'), ('1970-01-01', '2012-12-31')]),
+    ('RHAV', [('2010-01-01', '2020-12-31'), ('2006-01-01', '2024-12-31')]),
+    ('Snow', [('2000-01-01', '2024-12-31'), ('2020-01-01', '2020-12-31')]),
+])
+def test_date_range_patches_equal_a_full_rebuild(charts, data_type, ranges):
+    sent = replay(charts, [(data_type, start, end) for start, end in ranges])
+    assert sent[0] == ('Figure', 'Figure')
+    assert ('Patch', 'Patch') in sent[1:]
+
+def test_data_type_patches_equal_a_full_rebuild(charts):
+    types = ['TAVG', 'PRCP', 'WT16', 'Snow', 'RHAV', 'WT01', 'TMAX', 'TAVG']
+    sent = replay(charts, [(data_type, '2006-01-01', '2012-12-31') for data_type in types])
+    assert all(weather == 'Patch' and precip == 'no_update' for weather, precip in sent[1:])